@@ -1,9 +1,21 @@
 from .models import Attendance
 from django.contrib import admin
+from django.utils.text import smart_split, unescape_string_literal
+from apps.auths.utils.user_search import user_search_condition
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ("uid", "user", "code", "is_nfc", "is_qr", "date")
     search_fields = ("user__full_name", "user__email")
     list_filter = ("code", "is_nfc", "is_qr", "date")
-    ordering = ("-date",)
\ No newline at end of file
+    ordering = ("-date",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields are all user columns: answer them from the user search index
+        terms = [
+            unescape_string_literal(bit) if bit[0] in {'"', "'"} and bit[-1] == bit[0] else bit
+            for bit in smart_split(search_term)
+        ]
+        if not terms:
+            return queryset, False
+        return queryset.filter(user_search_condition(terms, "user__")), False
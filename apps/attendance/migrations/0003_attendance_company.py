@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_company(apps, schema_editor):
+    """Copy each user's company onto their attendance, a batch of users per UPDATE"""
+    Attendance = apps.get_model("attendance", "Attendance")
+    User = apps.get_model("auths", "User")
+
+    users = User.objects.exclude(company=None).order_by("company_id").values_list("uid", "company_id")
+    batch, batch_company = [], None
+    for uid, company_id in users.iterator(chunk_size=BATCH_SIZE):
+        if batch and (company_id != batch_company or len(batch) >= BATCH_SIZE):
+            Attendance.objects.filter(user_id__in=batch).update(company_id=batch_company)
+            batch = []
+        batch.append(uid)
+        batch_company = company_id
+    if batch:
+        Attendance.objects.filter(user_id__in=batch).update(company_id=batch_company)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendance_indexes'),
+        ('auths', '0001_initial'),
+        ('companies', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='company',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendances', to='companies.company'),
+        ),
+        migrations.RunPython(backfill_company, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['company', '-date', '-created_at'], name='attendance_company_date_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+BATCH_SIZE = 500
+
+
+def build_rollups(apps, schema_editor):
+    """Aggregate the existing attendance into one rollup row per company and day"""
+    Attendance = apps.get_model("attendance", "Attendance")
+    AttendanceDailyRollup = apps.get_model("attendance", "AttendanceDailyRollup")
+
+    totals = (
+        Attendance.objects.exclude(company=None)
+        .values("company_id", "date")
+        .annotate(
+            present=Count("uid"),
+            nfc=Count("uid", filter=Q(is_nfc=True)),
+            qr=Count("uid", filter=Q(is_qr=True)),
+        )
+        .order_by()
+    )
+    AttendanceDailyRollup.objects.bulk_create(
+        (
+            AttendanceDailyRollup(
+                company_id=row["company_id"], date=row["date"],
+                present_count=row["present"], nfc_count=row["nfc"], qr_count=row["qr"],
+            )
+            for row in totals.iterator(chunk_size=BATCH_SIZE)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_company'),
+        ('companies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('nfc_count', models.PositiveIntegerField(default=0)),
+                ('qr_count', models.PositiveIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='companies.company')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('company', 'date'), name='attendance_rollup_company_date_uniq')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
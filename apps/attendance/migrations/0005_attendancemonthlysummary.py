@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import TruncMonth
+
+BATCH_SIZE = 500
+
+
+def build_summaries(apps, schema_editor):
+    """Aggregate the existing attendance into one summary row per employee and month"""
+    Attendance = apps.get_model("attendance", "Attendance")
+    AttendanceMonthlySummary = apps.get_model("attendance", "AttendanceMonthlySummary")
+
+    totals = (
+        Attendance.objects.annotate(month=TruncMonth("date"))
+        .values("user_id", "month")
+        .annotate(
+            days=Count("uid"),
+            nfc=Count("uid", filter=Q(code="NFC")),
+            qr=Count("uid", filter=Q(code="QR")),
+            first=Min("created_at"),
+            last=Max("created_at"),
+        )
+        .order_by()
+    )
+    AttendanceMonthlySummary.objects.bulk_create(
+        (
+            AttendanceMonthlySummary(
+                user_id=row["user_id"], month=row["month"], days_present=row["days"],
+                nfc_count=row["nfc"], qr_count=row["qr"],
+                first_check_in=row["first"], last_check_in=row["last"],
+            )
+            for row in totals.iterator(chunk_size=BATCH_SIZE)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendancedailyrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('days_present', models.PositiveIntegerField(default=0)),
+                ('nfc_count', models.PositiveIntegerField(default=0)),
+                ('qr_count', models.PositiveIntegerField(default=0)),
+                ('first_check_in', models.DateTimeField(blank=True, null=True)),
+                ('last_check_in', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='attendance_summary_user_month_uniq')],
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendancemonthlysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancedailyrollup',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendancemonthlysummary',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
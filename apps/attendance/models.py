@@ -1,5 +1,6 @@
 from django.db import models
 from apps.auths.models import User
+from apps.companies.models import Company
 import uuid
 
 class Attendance(models.Model):
@@ -9,7 +10,12 @@ class Attendance(models.Model):
     )
 
     uid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="attendances")
+    # user_id lookups are served by the (user, date) unique and composite indexes
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="attendances", db_index=False)
+    # copy of user.company so tenant-scoped queries avoid joining auths_user
+    company = models.ForeignKey(
+        Company, on_delete=models.SET_NULL, null=True, blank=True, related_name="attendances", db_index=False
+    )
     is_nfc = models.BooleanField(default=False)
     is_qr = models.BooleanField(default=False)
     code = models.CharField(max_length=3, choices=CODE_CHOICES)
@@ -19,5 +25,75 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ("user", "date")
         ordering = ["-date"]
+        indexes = [
+            # per-employee history and reports: user = ? ORDER BY date DESC, created_at DESC
+            models.Index(fields=["user", "-date", "-created_at"], name="attendance_user_date_idx"),
+            # date range scans and report/list ordering across employees
+            models.Index(fields=["-date", "-created_at"], name="attendance_date_created_idx"),
+            # company lists, exports and reports: company = ? AND date range ORDER BY date DESC
+            models.Index(fields=["company", "-date", "-created_at"], name="attendance_company_date_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Writes that bypass AttendanceService (admin, scripts) still get the company copy
+        if self.company_id is None and self.user_id is not None:
+            self.company_id = self.user.company_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username} - {self.date}"
+
+
+class AttendanceDailyRollup(models.Model):
+    """
+    Per-company, per-day check-in totals, kept up to date on every write so
+    dashboards and reports read one row per day instead of counting
+    attendance. Check-ins are unique per (user, date), so present_count is
+    also the number of distinct employees present.
+    `manage.py rebuild_attendance_rollups` recomputes a date range.
+    """
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="attendance_rollups")
+    date = models.DateField()
+    present_count = models.PositiveIntegerField(default=0)
+    nfc_count = models.PositiveIntegerField(default=0)
+    qr_count = models.PositiveIntegerField(default=0)
+    # bumped on every change to the day's attendance; keys cached company reports
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["company", "date"], name="attendance_rollup_company_date_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.company} - {self.date}: {self.present_count}"
+
+
+class AttendanceMonthlySummary(models.Model):
+    """
+    Per-employee, per-month check-in figures, kept current on every write
+    and reconciled nightly by `manage.py reconcile_attendance_summaries`.
+    NFC/QR are split by `code`, as the attendance reports count them.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="monthly_summaries")
+    # first day of the month
+    month = models.DateField()
+    days_present = models.PositiveIntegerField(default=0)
+    nfc_count = models.PositiveIntegerField(default=0)
+    qr_count = models.PositiveIntegerField(default=0)
+    first_check_in = models.DateTimeField(null=True, blank=True)
+    last_check_in = models.DateTimeField(null=True, blank=True)
+    # bumped on every change to the month's attendance; keys cached employee reports
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-month"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "month"], name="attendance_summary_user_month_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.month:%Y-%m}: {self.days_present}"
@@ -1,14 +1,188 @@
 from apps.attendance.models import Attendance
-from django.db import IntegrityError
+from apps.auths.models import User
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from common.pagination.counting import invalidate_counts
+from .rollup_repository import DailyRollupRepository
+from .summary_repository import MonthlySummaryRepository
 
 class AttendanceRepository:
 
+    @staticmethod
+    def _connection():
+        return connections[router.db_for_write(Attendance)]
+
+    @staticmethod
+    def _supports_insert_ignore(connection):
+        features = connection.features
+        return features.supports_update_conflicts_with_target and features.can_return_columns_from_insert
+
+    @staticmethod
+    def _insert_ignore(connection, records, keep_created_at=False):
+        """
+        INSERT ... ON CONFLICT (user, date) DO NOTHING RETURNING uid for `records`
+        in a single statement. Returns the uids that were written.
+        """
+        opts = Attendance._meta
+        quote = connection.ops.quote_name
+        fields = opts.concrete_fields
+        values = []
+        for record in records:
+            for field in fields:
+                if keep_created_at and field.attname == "created_at" and record.created_at:
+                    value = record.created_at
+                else:
+                    value = field.pre_save(record, add=True)
+                values.append(field.get_db_prep_save(value, connection))
+
+        row = "({})".format(", ".join(["%s"] * len(fields)))
+        sql = "INSERT INTO {table} ({columns}) VALUES {rows} ON CONFLICT ({target}) DO NOTHING RETURNING {pk}".format(
+            table=quote(opts.db_table),
+            columns=", ".join(quote(field.column) for field in fields),
+            rows=", ".join([row] * len(records)),
+            target=", ".join(quote(opts.get_field(name).column) for name in ("user", "date")),
+            pk=quote(opts.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+            written = {opts.pk.to_python(uid) for (uid,) in cursor.fetchall()}
+
+        for record in records:
+            if record.uid in written:
+                record._state.adding = False
+                record._state.db = connection.alias
+        AttendanceRepository._count_written([record for record in records if record.uid in written])
+        return written
+
+    @staticmethod
+    def _count_written(records):
+        """Fold rows inserted without save() into the rollups, summaries and list counts"""
+        if not records:
+            return
+        DailyRollupRepository.add(records)
+        MonthlySummaryRepository.add(records)
+        invalidate_counts(Attendance)
+
     @staticmethod
     def create_attendance(**data):
-        try:
-            return Attendance.objects.create(**data)
-        except IntegrityError:
-            return None
+        """
+        Insert-if-absent on (user, date). Returns the new attendance, or None
+        when the user already checked in for that date.
+        """
+        connection = AttendanceRepository._connection()
+        if not AttendanceRepository._supports_insert_ignore(connection):
+            try:
+                return Attendance.objects.create(**data)
+            except IntegrityError:
+                return None
+
+        # One round trip, and a duplicate scan comes back as an empty result
+        # instead of a failed INSERT and an IntegrityError
+        attendance = Attendance(**data)
+        with transaction.atomic(using=connection.alias, savepoint=False):
+            if not AttendanceRepository._insert_ignore(connection, [attendance]):
+                return None
+        return attendance
+
+    @staticmethod
+    def insert_journaled_attendance(records):
+        """
+        Write check-ins replayed from the write-behind journal, keeping their
+        original uid and created_at. Rows that were already written by an
+        earlier, interrupted flush conflict on (user, date) and are skipped,
+        so replaying a batch is idempotent. Returns the uids written.
+        """
+        connection = AttendanceRepository._connection()
+        batch_size = settings.ATTENDANCE_BULK_BATCH_SIZE
+        if not AttendanceRepository._supports_insert_ignore(connection):
+            with transaction.atomic(using=connection.alias):
+                # rows of a replayed batch are already stored under their uid and must not be counted again
+                uids = [record.uid for record in records]
+                stored = set()
+                for start in range(0, len(uids), batch_size):
+                    stored.update(
+                        Attendance.objects.filter(uid__in=uids[start:start + batch_size]).values_list("uid", flat=True)
+                    )
+                return AttendanceRepository.bulk_create_attendance(
+                    [record for record in records if record.uid not in stored], keep_created_at=True
+                )
+
+        written = set()
+        with transaction.atomic(using=connection.alias):
+            for start in range(0, len(records), batch_size):
+                written |= AttendanceRepository._insert_ignore(
+                    connection, records[start:start + batch_size], keep_created_at=True
+                )
+        return written
+
+    @staticmethod
+    def bulk_create_attendance(records, keep_created_at=False):
+        """
+        Insert records with set-based INSERTs, skipping (user, date) conflicts.
+        With `keep_created_at` the records' created_at is written instead of
+        the insert time. Returns the uids of the rows that were actually written.
+        """
+        batch_size = settings.ATTENDANCE_BULK_BATCH_SIZE
+        # bulk_create stamps auto_now_add fields on the records
+        created_at = {record.uid: record.created_at for record in records if keep_created_at and record.created_at}
+        Attendance.objects.bulk_create(records, batch_size=batch_size, ignore_conflicts=True)
+
+        created = set()
+        uids = [record.uid for record in records]
+        for start in range(0, len(uids), batch_size):
+            created.update(
+                Attendance.objects.filter(uid__in=uids[start:start + batch_size])
+                .values_list("uid", flat=True)
+            )
+        if created_at:
+            kept = [record for record in records if record.uid in created and record.uid in created_at]
+            for record in kept:
+                record.created_at = created_at[record.uid]
+            Attendance.objects.bulk_update(kept, ["created_at"], batch_size=batch_size)
+        AttendanceRepository._count_written([record for record in records if record.uid in created])
+        return created
+
+    @staticmethod
+    def get_existing_pairs(user_ids, dates):
+        return set(
+            Attendance.objects.filter(user_id__in=user_ids, date__in=dates)
+            .values_list("user_id", "date")
+        )
+
+    @staticmethod
+    def get_company_user_ids(company, user_ids):
+        return set(
+            User.objects.filter(company=company, uid__in=user_ids)
+            .values_list("uid", flat=True)
+        )
+
+    @staticmethod
+    def sync_company(user):
+        """Re-point a user's attendance at their current company"""
+        moved = Attendance.objects.filter(user=user).exclude(company_id=user.company_id)
+        with transaction.atomic():
+            rows = list(moved.only("uid", "company_id", "date", "is_nfc", "is_qr"))
+            updated = moved.update(company_id=user.company_id)
+            if updated:
+                DailyRollupRepository.remove(rows)
+                for row in rows:
+                    row.company_id = user.company_id
+                DailyRollupRepository.add(rows)
+                invalidate_counts(Attendance)
+        return updated
+
+    @staticmethod
+    def iter_export_rows(queryset, fields, chunk_size):
+        """
+        Stream `fields` tuples oldest first. iterator() keeps a single chunk in
+        memory (server-side cursor on PostgreSQL), and date/created_at ordering
+        is served by the company/date index read backwards.
+        """
+        return (
+            queryset.order_by("date", "created_at")
+            .values_list(*fields)
+            .iterator(chunk_size=chunk_size)
+        )
 
     @staticmethod
     def get_by_user(user):
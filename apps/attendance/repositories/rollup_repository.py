@@ -0,0 +1,177 @@
+from collections import defaultdict
+from apps.attendance.models import Attendance, AttendanceDailyRollup
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
+
+COUNTERS = ("present_count", "nfc_count", "qr_count")
+
+
+class DailyRollupRepository:
+
+    @staticmethod
+    def _deltas(records):
+        """{(company_id, date): [present, nfc, qr]} for attendance records"""
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for record in records:
+            if record.company_id is None:
+                continue
+            delta = deltas[(record.company_id, record.date)]
+            delta[0] += 1
+            delta[1] += int(bool(record.is_nfc))
+            delta[2] += int(bool(record.is_qr))
+        return deltas
+
+    @staticmethod
+    def _upsert(connection, deltas):
+        """
+        INSERT ... ON CONFLICT (company, date) DO UPDATE SET count = count + excluded.count
+        for every (company, date) in one statement, bumping the day's version.
+        """
+        opts = AttendanceDailyRollup._meta
+        quote = connection.ops.quote_name
+        company_field, date_field = opts.get_field("company"), opts.get_field("date")
+        table = quote(opts.db_table)
+        company = quote(company_field.column)
+        day = quote(date_field.column)
+
+        values = []
+        for (company_id, date), delta in deltas.items():
+            values += [
+                company_field.get_db_prep_save(company_id, connection),
+                date_field.get_db_prep_save(date, connection),
+                *delta,
+                1,
+            ]
+        row = "(%s, %s, %s, %s, %s, %s)"
+        sql = (
+            "INSERT INTO {table} ({company}, {day}, {counters}, {version}) VALUES {rows} "
+            "ON CONFLICT ({company}, {day}) DO UPDATE SET {updates}, {version} = {table}.{version} + 1"
+        ).format(
+            table=table,
+            company=company,
+            day=day,
+            counters=", ".join(quote(name) for name in COUNTERS),
+            version=quote("version"),
+            rows=", ".join([row] * len(deltas)),
+            updates=", ".join(
+                f"{quote(name)} = {table}.{quote(name)} + excluded.{quote(name)}" for name in COUNTERS
+            ),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+
+    @staticmethod
+    def _update_or_create(deltas, sign):
+        for (company_id, date), delta in deltas.items():
+            rollups = AttendanceDailyRollup.objects.filter(company_id=company_id, date=date)
+            changes = {
+                name: Greatest(F(name) + sign * amount, 0) for name, amount in zip(COUNTERS, delta)
+            }
+            changes["version"] = F("version") + 1
+            if rollups.update(**changes) or sign < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    AttendanceDailyRollup.objects.create(
+                        company_id=company_id, date=date, version=1, **dict(zip(COUNTERS, delta))
+                    )
+            except IntegrityError:
+                # a concurrent check-in created the row first
+                rollups.update(**changes)
+
+    @staticmethod
+    def add(records):
+        """Count newly written attendance records into their day's rollup"""
+        deltas = DailyRollupRepository._deltas(records)
+        if not deltas:
+            return
+        connection = connections[router.db_for_write(AttendanceDailyRollup)]
+        if connection.features.supports_update_conflicts_with_target:
+            DailyRollupRepository._upsert(connection, deltas)
+        else:
+            DailyRollupRepository._update_or_create(deltas, 1)
+
+    @staticmethod
+    def remove(records):
+        """Take deleted (or moved) attendance records out of their day's rollup"""
+        deltas = DailyRollupRepository._deltas(records)
+        if deltas:
+            DailyRollupRepository._update_or_create(deltas, -1)
+
+    @staticmethod
+    def touch(records):
+        """Bump the version of the days of edited attendance records"""
+        for company_id, date in {(record.company_id, record.date) for record in records if record.company_id}:
+            AttendanceDailyRollup.objects.filter(company_id=company_id, date=date).update(version=F("version") + 1)
+
+    @staticmethod
+    def rebuild(start=None, end=None, company=None):
+        """
+        Recompute rollups from attendance for a date range (inclusive, open
+        ends allowed) and optionally one company. Returns the rows written.
+        Rebuilt days keep their version, bumped, so cached reports expire.
+        """
+        attendance = Attendance.objects.exclude(company=None)
+        rollups = AttendanceDailyRollup.objects.all()
+        if start:
+            attendance, rollups = attendance.filter(date__gte=start), rollups.filter(date__gte=start)
+        if end:
+            attendance, rollups = attendance.filter(date__lte=end), rollups.filter(date__lte=end)
+        if company:
+            attendance, rollups = attendance.filter(company=company), rollups.filter(company=company)
+
+        totals = (
+            attendance.values("company_id", "date")
+            .annotate(
+                present=Count("uid"),
+                nfc=Count("uid", filter=Q(is_nfc=True)),
+                qr=Count("uid", filter=Q(is_qr=True)),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            versions = {
+                (company_id, date): version
+                for company_id, date, version in rollups.values_list("company_id", "date", "version")
+            }
+            rollups.delete()
+            created = AttendanceDailyRollup.objects.bulk_create(
+                [
+                    AttendanceDailyRollup(
+                        company_id=row["company_id"], date=row["date"],
+                        present_count=row["present"], nfc_count=row["nfc"], qr_count=row["qr"],
+                        version=versions.get((row["company_id"], row["date"]), 0) + 1,
+                    )
+                    for row in totals
+                ],
+                batch_size=500,
+            )
+        return len(created)
+
+    @staticmethod
+    def get_company_days(company, start=None, end=None):
+        rollups = AttendanceDailyRollup.objects.filter(company=company)
+        if start:
+            rollups = rollups.filter(date__gte=start)
+        if end:
+            rollups = rollups.filter(date__lte=end)
+        return rollups
+
+    @staticmethod
+    def get_version(rollups):
+        """Fingerprint of the attendance behind `rollups`: changes whenever any of it changes"""
+        return rollups.aggregate(
+            days=Count("id"),
+            present_count=Sum("present_count", default=0),
+            version=Sum("version", default=0),
+        )
+
+    @staticmethod
+    def get_totals(rollups):
+        return rollups.aggregate(
+            days=Count("id"),
+            present_count=Sum("present_count", default=0),
+            nfc_count=Sum("nfc_count", default=0),
+            qr_count=Sum("qr_count", default=0),
+        )
@@ -0,0 +1,193 @@
+from apps.attendance.models import Attendance, AttendanceMonthlySummary
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Max, Min, Q
+from django.db.models.functions import TruncMonth
+from ..utils.dates import month_start, next_month
+
+COUNTERS = ("days_present", "nfc_count", "qr_count")
+
+
+class MonthlySummaryRepository:
+
+    @staticmethod
+    def _deltas(records):
+        """{(user_id, month): [days, nfc, qr, first, last]} for attendance records"""
+        deltas = {}
+        for record in records:
+            key = (record.user_id, month_start(record.date))
+            delta = deltas.setdefault(key, [0, 0, 0, record.created_at, record.created_at])
+            delta[0] += 1
+            delta[1] += record.code == "NFC"
+            delta[2] += record.code == "QR"
+            delta[3] = min(delta[3], record.created_at)
+            delta[4] = max(delta[4], record.created_at)
+        return deltas
+
+    @staticmethod
+    def _upsert(connection, deltas):
+        """
+        INSERT ... ON CONFLICT (user, month) DO UPDATE adding the counters,
+        widening first/last check-in and bumping the version, for every
+        (user, month) in one statement.
+        """
+        opts = AttendanceMonthlySummary._meta
+        quote = connection.ops.quote_name
+        fields = [
+            opts.get_field(name)
+            for name in ("user", "month", *COUNTERS, "first_check_in", "last_check_in", "version")
+        ]
+        table = quote(opts.db_table)
+        user, month = quote(fields[0].column), quote(fields[1].column)
+        first, last = quote("first_check_in"), quote("last_check_in")
+
+        values = []
+        for (user_id, day), delta in deltas.items():
+            for field, value in zip(fields, (user_id, day, *delta, 1)):
+                values.append(field.get_db_prep_save(value, connection))
+        row = "({})".format(", ".join(["%s"] * len(fields)))
+        updates = [f"{quote(name)} = {table}.{quote(name)} + excluded.{quote(name)}" for name in COUNTERS]
+        updates += [
+            f"{first} = CASE WHEN {table}.{first} IS NULL OR excluded.{first} < {table}.{first} "
+            f"THEN excluded.{first} ELSE {table}.{first} END",
+            f"{last} = CASE WHEN {table}.{last} IS NULL OR excluded.{last} > {table}.{last} "
+            f"THEN excluded.{last} ELSE {table}.{last} END",
+            f"{quote('version')} = {table}.{quote('version')} + 1",
+        ]
+        sql = "INSERT INTO {table} ({columns}) VALUES {rows} ON CONFLICT ({user}, {month}) DO UPDATE SET {updates}".format(
+            table=table,
+            columns=", ".join(quote(field.column) for field in fields),
+            rows=", ".join([row] * len(deltas)),
+            user=user,
+            month=month,
+            updates=", ".join(updates),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+
+    @staticmethod
+    def _update_or_create(deltas):
+        for (user_id, month), (days, nfc, qr, first, last) in deltas.items():
+            summaries = AttendanceMonthlySummary.objects.filter(user_id=user_id, month=month)
+            summary = summaries.first()
+            if summary is None:
+                try:
+                    with transaction.atomic():
+                        AttendanceMonthlySummary.objects.create(
+                            user_id=user_id, month=month, days_present=days, nfc_count=nfc, qr_count=qr,
+                            first_check_in=first, last_check_in=last, version=1,
+                        )
+                    continue
+                except IntegrityError:
+                    # a concurrent check-in created the row first
+                    summary = summaries.get()
+            summaries.update(
+                days_present=F("days_present") + days,
+                nfc_count=F("nfc_count") + nfc,
+                qr_count=F("qr_count") + qr,
+                first_check_in=min(filter(None, (summary.first_check_in, first))),
+                last_check_in=max(filter(None, (summary.last_check_in, last))),
+                version=F("version") + 1,
+            )
+
+    @staticmethod
+    def add(records):
+        """Count newly written attendance records into their employee's month"""
+        deltas = MonthlySummaryRepository._deltas(records)
+        if not deltas:
+            return
+        connection = connections[router.db_for_write(AttendanceMonthlySummary)]
+        if connection.features.supports_update_conflicts_with_target:
+            MonthlySummaryRepository._upsert(connection, deltas)
+        else:
+            MonthlySummaryRepository._update_or_create(deltas)
+
+    @staticmethod
+    def recount(records):
+        """
+        Recompute the months of deleted or edited records from attendance:
+        first/last check-in cannot be taken back incrementally, and such
+        writes are rare. An edit may move a record into a month without a
+        summary yet.
+        """
+        for user_id, month in {(record.user_id, month_start(record.date)) for record in records}:
+            totals = next(iter(MonthlySummaryRepository._totals(
+                Attendance.objects.filter(user_id=user_id, date__gte=month, date__lt=next_month(month))
+            )), None)
+            summaries = AttendanceMonthlySummary.objects.filter(user_id=user_id, month=month)
+            if totals is None:
+                summaries.delete()
+                continue
+            fields = MonthlySummaryRepository._fields(totals)
+            if summaries.update(**fields, version=F("version") + 1):
+                continue
+            try:
+                with transaction.atomic():
+                    AttendanceMonthlySummary.objects.create(user_id=user_id, month=month, **fields, version=1)
+            except IntegrityError:
+                # a concurrent check-in created the row first
+                summaries.update(**fields, version=F("version") + 1)
+
+    @staticmethod
+    def touch(records):
+        """Bump the version of the months of edited attendance records"""
+        for user_id, month in {(record.user_id, month_start(record.date)) for record in records}:
+            AttendanceMonthlySummary.objects.filter(user_id=user_id, month=month).update(version=F("version") + 1)
+
+    @staticmethod
+    def _totals(attendance):
+        return (
+            attendance.annotate(summary_month=TruncMonth("date"))
+            .values("user_id", "summary_month")
+            .annotate(
+                days=Count("uid"),
+                nfc=Count("uid", filter=Q(code="NFC")),
+                qr=Count("uid", filter=Q(code="QR")),
+                first=Min("created_at"),
+                last=Max("created_at"),
+            )
+            .order_by()
+        )
+
+    @staticmethod
+    def _fields(totals):
+        return {
+            "days_present": totals["days"],
+            "nfc_count": totals["nfc"],
+            "qr_count": totals["qr"],
+            "first_check_in": totals["first"],
+            "last_check_in": totals["last"],
+        }
+
+    @staticmethod
+    def months():
+        """Every month with attendance or a summary, oldest first"""
+        attendance = Attendance.objects.annotate(summary_month=TruncMonth("date")).values_list("summary_month", flat=True)
+        summaries = AttendanceMonthlySummary.objects.values_list("month", flat=True)
+        return sorted(set(attendance.distinct().order_by()) | set(summaries.distinct().order_by()))
+
+    @staticmethod
+    def reconcile(month):
+        """
+        Rewrite every summary of `month` from attendance, dropping rows of
+        employees without check-ins. Returns the number of summaries written.
+        Rewritten summaries keep their version, bumped, so cached reports expire.
+        """
+        month = month_start(month)
+        totals = MonthlySummaryRepository._totals(
+            Attendance.objects.filter(date__gte=month, date__lt=next_month(month))
+        )
+        summaries = AttendanceMonthlySummary.objects.filter(month=month)
+        with transaction.atomic():
+            versions = dict(summaries.values_list("user_id", "version"))
+            summaries.delete()
+            created = AttendanceMonthlySummary.objects.bulk_create(
+                [
+                    AttendanceMonthlySummary(
+                        user_id=row["user_id"], month=month, **MonthlySummaryRepository._fields(row),
+                        version=versions.get(row["user_id"], 0) + 1,
+                    )
+                    for row in totals
+                ],
+                batch_size=500,
+            )
+        return len(created)
@@ -0,0 +1,19 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    """A single buffered scan uploaded by an NFC/QR terminal"""
+    employee = serializers.UUIDField()
+    is_nfc = serializers.BooleanField(default=False)
+    is_qr = serializers.BooleanField(default=False)
+    date = serializers.DateField()
+
+
+class AttendanceBulkCreateSerializer(serializers.Serializer):
+    """Envelope for a batch of check-ins; items are validated one by one by the service"""
+    check_ins = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.ATTENDANCE_BULK_MAX_ITEMS,
+    )
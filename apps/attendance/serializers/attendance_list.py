@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from common.api.values import ValuesSerializer
 from ..models import Attendance
 
 class EmployeeAttendanceListSerializer(serializers.ModelSerializer):
@@ -18,3 +19,36 @@ class AdminAttendanceListSerializer(serializers.ModelSerializer):
             "uid": obj.user.uid,
             "full_name": obj.user.full_name,
         }
+
+
+class EmployeeAttendanceListValuesSerializer(ValuesSerializer):
+    """Same output as EmployeeAttendanceListSerializer, built from .values() rows."""
+
+    values = ("uid", "is_nfc", "is_qr", "code", "date")
+
+    def to_representation(self, row):
+        return {
+            "uid": str(row["uid"]),
+            "is_nfc": row["is_nfc"],
+            "is_qr": row["is_qr"],
+            "code": row["code"],
+            "date": row["date"].isoformat(),
+        }
+
+
+class AdminAttendanceListValuesSerializer(ValuesSerializer):
+    """Same output as AdminAttendanceListSerializer, without loading users."""
+
+    values = ("uid", "is_nfc", "is_qr", "date", "user__uid", "user__full_name")
+
+    def to_representation(self, row):
+        return {
+            "uid": str(row["uid"]),
+            "is_nfc": row["is_nfc"],
+            "is_qr": row["is_qr"],
+            "date": row["date"].isoformat(),
+            "employee": {
+                "uid": str(row["user__uid"]),
+                "full_name": row["user__full_name"],
+            },
+        }
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    """Optional inclusive ?from_date=&to_date= range of a summary endpoint"""
+    from_date = serializers.DateField(required=False)
+    to_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("from_date") and attrs.get("to_date") and attrs["from_date"] > attrs["to_date"]:
+            raise serializers.ValidationError("from_date must be on or before to_date")
+        return attrs
+
+
+class DayQuerySerializer(serializers.Serializer):
+    """Optional ?date= of a per-day endpoint"""
+    date = serializers.DateField(required=False)
@@ -0,0 +1,94 @@
+from bisect import bisect_right
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Exists, F, OuterRef
+from django.utils import timezone
+from apps.auths.models import User
+from ..models import Attendance
+
+
+class AbsenceService:
+    """
+    Absences derived from presence: an active employee of the company is
+    expected every day from the day they joined, and absent on the days
+    without a check-in. Everything is computed from set-based queries,
+    never by loading attendance rows.
+    """
+
+    @staticmethod
+    def get_workforce(company):
+        return User.objects.filter(company=company, is_active=True)
+
+    @staticmethod
+    def get_present(company, start, end):
+        """Check-ins in the range by employees that count towards the workforce"""
+        return Attendance.objects.filter(
+            company=company,
+            date__range=(start, end),
+            user__company=company,
+            user__is_active=True,
+            user__date_joined__date__lte=F("date"),
+        )
+
+    @staticmethod
+    def absentees(company, day):
+        """Employees expected on `day` without a check-in, as one anti-join"""
+        checked_in = Attendance.objects.filter(user=OuterRef("pk"), date=day)
+        return list(
+            AbsenceService.get_workforce(company)
+            .filter(date_joined__date__lte=day)
+            .filter(~Exists(checked_in))
+            .order_by("full_name", "uid")
+            .values("uid", "full_name", "email")
+        )
+
+    @staticmethod
+    def summary(company, start, end):
+        """Expected/present/absent counts per day and per employee over a range"""
+        days = (end - start).days + 1
+        if days > settings.ATTENDANCE_ABSENCE_MAX_DAYS:
+            raise ValueError(f"Date range cannot exceed {settings.ATTENDANCE_ABSENCE_MAX_DAYS} days")
+
+        employees = [
+            {"uid": uid, "full_name": full_name, "joined": timezone.localdate(date_joined)}
+            for uid, full_name, date_joined in AbsenceService.get_workforce(company)
+            .order_by("full_name", "uid")
+            .values_list("uid", "full_name", "date_joined")
+        ]
+        present = AbsenceService.get_present(company, start, end)
+        present_by_day = dict(present.values_list("date").annotate(n=Count("uid")).order_by())
+        present_by_user = dict(present.values_list("user_id").annotate(n=Count("uid")).order_by())
+
+        # headcount of a day = employees who joined on or before it
+        joined = sorted(employee["joined"] for employee in employees)
+        per_day = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            expected = bisect_right(joined, day)
+            attended = present_by_day.get(day, 0)
+            per_day.append({"date": day, "expected": expected, "present": attended, "absent": expected - attended})
+
+        per_employee = []
+        for employee in employees:
+            expected = max((end - max(start, employee["joined"])).days + 1, 0)
+            attended = present_by_user.get(employee["uid"], 0)
+            per_employee.append({
+                "uid": employee["uid"],
+                "full_name": employee["full_name"],
+                "expected_days": expected,
+                "present_days": attended,
+                "absent_days": expected - attended,
+            })
+        per_employee.sort(key=lambda employee: -employee["absent_days"])
+
+        return {
+            "from_date": start,
+            "to_date": end,
+            "totals": {
+                "expected": sum(day["expected"] for day in per_day),
+                "present": sum(day["present"] for day in per_day),
+                "absent": sum(day["absent"] for day in per_day),
+            },
+            "days": per_day,
+            "employees": per_employee,
+        }
@@ -1,6 +1,21 @@
+from django.conf import settings
+from django.utils import timezone
+from ..models import Attendance
 from ..repositories.attendance_repository import AttendanceRepository
+from ..repositories.rollup_repository import DailyRollupRepository
+from ..serializers.attendance_bulk import AttendanceBulkItemSerializer
+from ..utils.attendance_export import EXPORT_FIELDS, iter_csv, iter_ndjson
+from ..utils.checkin_index import get_checkin_index
+from ..utils.checkin_journal import get_flusher, get_journal
 
 class AttendanceService:
+    EXPORT_FORMATS = {
+        "ndjson": ("application/x-ndjson", iter_ndjson),
+        "csv": ("text/csv", iter_csv),
+    }
+    ACCEPTED = "accepted"
+    DUPLICATE = "duplicate"
+    REJECTED = "rejected"
 
     @staticmethod
     def create_attendance(user, validated_data):
@@ -16,17 +31,183 @@ class AttendanceService:
 
         code = "QR" if is_qr else "NFC"
 
+        # Repeated badge taps are answered from the index without a DB write
+        index = get_checkin_index()
+        if index and index.contains(user.uid, validated_data.get("date")):
+            raise ValueError("Attendance already submitted for this date")
+
         attendance = AttendanceRepository.create_attendance(
             user=user,
+            company_id=user.company_id,
             code=code,
             **validated_data
         )
 
+        if index:
+            index.add(user.uid, validated_data.get("date"))
+
         if not attendance:
             raise ValueError("Attendance already submitted for this date")
 
         return attendance
 
+    @staticmethod
+    def write_behind_enabled():
+        return settings.ATTENDANCE_WRITE_BEHIND["ENABLED"]
+
+    @staticmethod
+    def enqueue_attendance(user, validated_data):
+        """
+        Write-behind variant of create_attendance: the check-in is validated,
+        appended to the local journal and persisted by the flusher within
+        MAX_FLUSH_LATENCY seconds. Duplicates known to the check-in index are
+        rejected here; any that slip through are dropped at flush time by the
+        (user, date) constraint. Returns the unsaved attendance.
+        """
+        is_nfc = validated_data.get("is_nfc")
+        is_qr = validated_data.get("is_qr")
+
+        if is_nfc == is_qr:
+            raise ValueError("Either NFC or QR must be true")
+
+        index = get_checkin_index()
+        if index and index.contains(user.uid, validated_data.get("date")):
+            raise ValueError("Attendance already submitted for this date")
+
+        attendance = Attendance(
+            user=user,
+            company_id=user.company_id,
+            code="QR" if is_qr else "NFC",
+            created_at=timezone.now(),
+            **validated_data
+        )
+        get_journal().append(attendance)
+
+        if index:
+            index.add(user.uid, validated_data.get("date"))
+        get_flusher(AttendanceService.flush_journal).notify()
+
+        return attendance
+
+    @staticmethod
+    def flush_journal():
+        """Drain the write-behind journal into Attendance. Returns the number of check-ins processed."""
+        journal = get_journal()
+        batch_size = settings.ATTENDANCE_WRITE_BEHIND["BATCH_SIZE"]
+        total = 0
+        while True:
+            flushed = journal.drain(
+                lambda rows: AttendanceRepository.insert_journaled_attendance([Attendance(**row) for row in rows]),
+                batch_size,
+            )
+            total += flushed
+            if flushed < batch_size:
+                return total
+
+    @staticmethod
+    def bulk_create_attendance(company, check_ins):
+        """
+        Ingest a batch of terminal scans for employees of `company`.
+        - Items are validated in a single pass; invalid ones are rejected
+        - (employee, date) pairs already stored or repeated in the batch are duplicates
+        - The remaining rows are written with set-based inserts
+        Returns one result per item, in input order.
+        """
+        results = [None] * len(check_ins)
+        candidates = []
+
+        for index, item in enumerate(check_ins):
+            serializer = AttendanceBulkItemSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {"index": index, "status": AttendanceService.REJECTED, "errors": serializer.errors}
+                continue
+
+            data = serializer.validated_data
+            if data["is_nfc"] == data["is_qr"]:
+                results[index] = {
+                    "index": index,
+                    "status": AttendanceService.REJECTED,
+                    "errors": {"non_field_errors": ["Either NFC or QR must be true"]},
+                }
+                continue
+            candidates.append((index, data))
+
+        employee_ids = AttendanceRepository.get_company_user_ids(
+            company, {data["employee"] for _, data in candidates}
+        )
+        existing = AttendanceRepository.get_existing_pairs(
+            employee_ids, {data["date"] for _, data in candidates}
+        )
+
+        pending = []
+        for index, data in candidates:
+            key = (data["employee"], data["date"])
+            if data["employee"] not in employee_ids:
+                results[index] = {
+                    "index": index,
+                    "status": AttendanceService.REJECTED,
+                    "errors": {"employee": ["Employee not found in your company"]},
+                }
+            elif key in existing:
+                results[index] = {"index": index, "status": AttendanceService.DUPLICATE}
+            else:
+                existing.add(key)
+                pending.append((index, Attendance(
+                    user_id=data["employee"],
+                    company=company,
+                    is_nfc=data["is_nfc"],
+                    is_qr=data["is_qr"],
+                    code="QR" if data["is_qr"] else "NFC",
+                    date=data["date"],
+                )))
+
+        created = AttendanceRepository.bulk_create_attendance([record for _, record in pending])
+
+        for index, record in pending:
+            if record.uid in created:
+                results[index] = {"index": index, "status": AttendanceService.ACCEPTED, "uid": record.uid}
+            else:
+                # Lost a race with a concurrent check-in for the same day
+                results[index] = {"index": index, "status": AttendanceService.DUPLICATE}
+
+        index = get_checkin_index()
+        if index:
+            today = timezone.localdate()
+            index.add_many([record.user_id for _, record in pending if record.date == today], today)
+
+        summary = {"received": len(check_ins)}
+        for status in (AttendanceService.ACCEPTED, AttendanceService.DUPLICATE, AttendanceService.REJECTED):
+            summary[status] = sum(1 for result in results if result["status"] == status)
+
+        return {"summary": summary, "results": results}
+
+    @staticmethod
+    def checkin_index_stats():
+        index = get_checkin_index()
+        if not index:
+            return {"backend": None, "hits": 0, "misses": 0, "hit_rate": 0.0}
+        return index.stats()
+
+    @staticmethod
+    def export_attendance(queryset, output):
+        """Returns (content_type, body iterator) streaming `queryset` as NDJSON or CSV"""
+        if output not in AttendanceService.EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format, use one of: {', '.join(AttendanceService.EXPORT_FORMATS)}")
+        content_type, encode = AttendanceService.EXPORT_FORMATS[output]
+        rows = AttendanceRepository.iter_export_rows(
+            queryset, EXPORT_FIELDS, settings.ATTENDANCE_EXPORT_CHUNK_SIZE
+        )
+        return content_type, encode(rows)
+
+    @staticmethod
+    def daily_summary(company, start=None, end=None):
+        """Per-day and overall check-in totals of a company, read from the daily rollups"""
+        rollups = DailyRollupRepository.get_company_days(company, start, end)
+        return {
+            "totals": DailyRollupRepository.get_totals(rollups),
+            "days": list(rollups.values("date", "present_count", "nfc_count", "qr_count")),
+        }
+
     @staticmethod
     def list_employee_attendance(user, date=None):
         qs = AttendanceRepository.get_by_user(user)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db.models import FilteredRelation, Q
+from apps.auths.models import User
+
+PRESENT = "1"
+ABSENT = "0"
+# per-cell check-in method in `methods`; "-" where absent
+METHOD_CODES = {"NFC": "N", "QR": "Q"}
+NO_METHOD = "-"
+
+
+class AttendanceMatrixService:
+    """Employees x days presence grid of a company, pivoted from a single query."""
+
+    @staticmethod
+    def get_rows(company, start, end):
+        """
+        One LEFT JOIN of the company's employees with their check-ins in the
+        range: a (uid, full_name, date, code) row per check-in, and one row
+        with date=None for employees without any.
+        """
+        return (
+            User.objects.filter(company=company, is_active=True)
+            .annotate(
+                check_in=FilteredRelation(
+                    "attendances",
+                    condition=Q(attendances__company=company, attendances__date__range=(start, end)),
+                )
+            )
+            .order_by("full_name", "uid")
+            .values_list("uid", "full_name", "check_in__date", "check_in__code")
+        )
+
+    @staticmethod
+    def build(company, start, end):
+        days = (end - start).days + 1
+        if days > settings.ATTENDANCE_MATRIX_MAX_DAYS:
+            raise ValueError(f"Date range cannot exceed {settings.ATTENDANCE_MATRIX_MAX_DAYS} days")
+
+        employees = []
+        daily_totals = [0] * days
+        current_uid, presence, methods = None, None, None
+        for uid, full_name, day, code in AttendanceMatrixService.get_rows(company, start, end).iterator():
+            if uid != current_uid:
+                current_uid = uid
+                presence, methods = [ABSENT] * days, [NO_METHOD] * days
+                employees.append({"uid": uid, "full_name": full_name, "presence": presence, "methods": methods})
+            if day is not None:
+                offset = (day - start).days
+                presence[offset] = PRESENT
+                methods[offset] = METHOD_CODES.get(code, NO_METHOD)
+                daily_totals[offset] += 1
+
+        for employee in employees:
+            employee["presence"] = "".join(employee["presence"])
+            employee["methods"] = "".join(employee["methods"])
+
+        return {
+            "from_date": start,
+            "to_date": end,
+            "days": days,
+            "daily_totals": daily_totals,
+            "employees": employees,
+        }
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.auths.models import User
+from apps.companies.models import Company
+from .models import Attendance
+from .repositories.attendance_repository import AttendanceRepository
+from .repositories.rollup_repository import DailyRollupRepository
+from .repositories.summary_repository import MonthlySummaryRepository
+from .utils.checkin_index import get_checkin_index
+from .utils.dates import month_start
+
+
+@receiver(post_delete, sender=Attendance)
+def forget_deleted_check_in(sender, instance, **kwargs):
+    index = get_checkin_index()
+    if index:
+        index.discard(instance.user_id, instance.date)
+    DailyRollupRepository.remove([instance])
+    MonthlySummaryRepository.recount([instance])
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_stored_check_in(sender, instance, raw=False, **kwargs):
+    # count_saved_check_in moves an edited check-in's counters out of the
+    # scope it was stored in, which the instance no longer knows
+    if raw or instance._state.adding:
+        return
+    instance._stored = Attendance.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Attendance)
+def count_saved_check_in(sender, instance, created, raw=False, **kwargs):
+    # Repository inserts bypass save() and update the rollups themselves; this
+    # covers Attendance.objects.create() and edits from the admin and scripts
+    if raw:
+        return
+    stored = instance.__dict__.pop("_stored", None)
+    _index_check_in(stored, instance)
+    if created:
+        DailyRollupRepository.add([instance])
+        MonthlySummaryRepository.add([instance])
+        return
+    with transaction.atomic():
+        if stored is not None and _rollup_scope(stored) != _rollup_scope(instance):
+            DailyRollupRepository.remove([stored])
+            DailyRollupRepository.add([instance])
+        else:
+            DailyRollupRepository.touch([instance])
+        if stored is not None and _summary_scope(stored) != _summary_scope(instance):
+            MonthlySummaryRepository.recount([stored, instance])
+        else:
+            MonthlySummaryRepository.touch([instance])
+
+
+def _index_check_in(stored, instance):
+    # An edit that moves a check-in off today must free the day, or the index
+    # would keep rejecting the user's real check-in
+    index = get_checkin_index()
+    if not index:
+        return
+    if stored is None:
+        index.add(instance.user_id, instance.date)
+    elif (stored.user_id, stored.date) != (instance.user_id, instance.date):
+        index.discard(stored.user_id, stored.date)
+        index.add(instance.user_id, instance.date)
+
+
+def _rollup_scope(attendance):
+    return attendance.company_id, attendance.date, bool(attendance.is_nfc), bool(attendance.is_qr)
+
+
+def _summary_scope(attendance):
+    return attendance.user_id, month_start(attendance.date), attendance.code, attendance.created_at
+
+
+@receiver(post_save, sender=User)
+def sync_attendance_company(sender, instance, created, update_fields=None, **kwargs):
+    # Saves limited to other fields (e.g. last_login on every login) cannot move the user
+    if created or (update_fields is not None and "company" not in update_fields):
+        return
+    AttendanceRepository.sync_company(instance)
+
+
+@receiver(post_save, sender=User)
+def bump_company_names_version(sender, instance, created, update_fields=None, **kwargs):
+    # Company reports list employee names, which their attendance versions do not cover
+    if created or instance.company_id is None or (update_fields is not None and "full_name" not in update_fields):
+        return
+    Company.objects.filter(pk=instance.company_id).update(names_version=F("names_version") + 1)
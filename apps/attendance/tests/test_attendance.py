@@ -1,10 +1,22 @@
 from django.test import TestCase
+from django.db import connection
 from django.db import IntegrityError
 from django.utils import timezone
 from apps.attendance.models import Attendance
+from apps.attendance.repositories.attendance_repository import AttendanceRepository
+from apps.attendance.services.attendance_service import AttendanceService
+from apps.attendance.utils.checkin_index import CacheCheckInIndex, LocalCheckInIndex, get_checkin_index
+from django.core.cache import cache
+from unittest.mock import patch
+from types import SimpleNamespace
+from apps.attendance.utils.attendanceFilter import AttendanceFilter
+from apps.attendance.views import AdminAttendanceListAPIView, EmployeeAttendanceListAPIView
+from apps.reports.repositories.attendance_repository import AttendanceRepository as ReportAttendanceRepository
+from apps.reports.services.attendance_report_service import AttendanceReportService
 from apps.auths.models import User, Role
 from apps.companies.models import Company
 from datetime import date, timedelta
+import tempfile
 import uuid
 
 
@@ -285,6 +297,223 @@ class AttendanceModelTest(TestCase):
         
         self.assertEqual(attendance.date, test_date)
         self.assertIsInstance(attendance.date, date)
-        
-        
-        
+
+
+class AttendanceRepositoryTest(TestCase):
+
+    def setUp(self):
+        """Set up a user to check in"""
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.user = User.objects.create_user(
+            email="repo@example.com",
+            full_name="Repo User",
+            password="testpass123",
+            company=self.company
+        )
+
+    def test_create_attendance_query_budget(self):
+        """Test that a check-in costs one INSERT plus the monthly summary upsert"""
+        with self.assertNumQueries(2):
+            attendance = AttendanceRepository.create_attendance(
+                user=self.user, code="NFC", is_nfc=True, date=date.today()
+            )
+        self.assertIsNotNone(attendance)
+        self.assertIsNotNone(attendance.created_at)
+        self.assertEqual(Attendance.objects.get(uid=attendance.uid).code, "NFC")
+
+    def test_create_attendance_duplicate_returns_none(self):
+        """Test that a second check-in on the same day is skipped without an error"""
+        AttendanceRepository.create_attendance(user=self.user, code="NFC", is_nfc=True, date=date.today())
+        with self.assertNumQueries(1):
+            duplicate = AttendanceRepository.create_attendance(
+                user=self.user, code="QR", is_qr=True, date=date.today()
+            )
+        self.assertIsNone(duplicate)
+        self.assertEqual(Attendance.objects.filter(user=self.user).count(), 1)
+
+
+class CheckInIndexTest(TestCase):
+
+    def setUp(self):
+        """Set up a user who already checked in today"""
+        cache.clear()
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.user = User.objects.create_user(
+            email="index@example.com",
+            full_name="Index User",
+            password="testpass123",
+            company=self.company
+        )
+        Attendance.objects.create(user=self.user, code="QR", is_qr=True, date=date.today())
+
+    def test_local_index_loads_today_lazily(self):
+        """Test that today's check-ins are loaded once and answered from memory"""
+        index = LocalCheckInIndex()
+        with self.assertNumQueries(1):
+            self.assertTrue(index.contains(self.user.uid, date.today()))
+            self.assertFalse(index.contains(uuid.uuid4(), date.today()))
+        self.assertEqual(index.stats(), {"backend": "local", "hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_index_ignores_other_days(self):
+        """Test that only today's date is indexed"""
+        index = LocalCheckInIndex()
+        with self.assertNumQueries(0):
+            self.assertFalse(index.contains(self.user.uid, date.today() - timedelta(days=1)))
+        self.assertEqual(index.stats()["hits"] + index.stats()["misses"], 0)
+
+    def test_index_rolls_over_to_a_new_day(self):
+        """Test that the set is rebuilt when the date changes"""
+        index = LocalCheckInIndex()
+        index.add(uuid.uuid4(), date.today())
+        index._day = date.today() - timedelta(days=1)
+        self.assertTrue(index.contains(self.user.uid, date.today()))
+        self.assertEqual(index._day, date.today())
+
+    def test_deleted_attendance_is_discarded(self):
+        """Test that deleting today's attendance lets the user check in again"""
+        index = LocalCheckInIndex()
+        with patch("apps.attendance.signals.get_checkin_index", return_value=index):
+            self.assertTrue(index.contains(self.user.uid, date.today()))
+            Attendance.objects.filter(user=self.user).delete()
+            self.assertFalse(index.contains(self.user.uid, date.today()))
+
+    def test_edits_move_the_entry(self):
+        """Test that moving today's attendance to another day frees today, and moving it back takes it again"""
+        index = LocalCheckInIndex()
+        attendance = Attendance.objects.get(user=self.user)
+        with patch("apps.attendance.signals.get_checkin_index", return_value=index):
+            self.assertTrue(index.contains(self.user.uid, date.today()))
+            attendance.date = date.today() - timedelta(days=1)
+            attendance.save()
+            self.assertFalse(index.contains(self.user.uid, date.today()))
+            attendance.date = date.today()
+            attendance.save()
+            self.assertTrue(index.contains(self.user.uid, date.today()))
+
+    def test_cache_index_is_shared(self):
+        """Test that separate cache-backed indexes see each other's writes and deletes"""
+        first, second = CacheCheckInIndex(), CacheCheckInIndex()
+        other = uuid.uuid4()
+        self.assertTrue(first.contains(self.user.uid, date.today()))
+        first.add(other, date.today())
+        self.assertTrue(second.contains(other, date.today()))
+        first.discard(self.user.uid, date.today())
+        self.assertFalse(second.contains(self.user.uid, date.today()))
+        # counters are kept per process, not in the cache
+        self.assertEqual(second.stats()["hits"], 1)
+
+    def test_cache_backend_needs_a_shared_cache(self):
+        """Test that the cache backend is turned off rather than kept per process"""
+        config = {"BACKEND": "cache", "CACHE_ALIAS": "default"}
+        file_cache = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                                  "LOCATION": tempfile.mkdtemp()}}
+        with patch("apps.attendance.utils.checkin_index._index", None), \
+                self.settings(ATTENDANCE_CHECKIN_INDEX=config):
+            self.assertIsNone(get_checkin_index())
+            with self.settings(CACHES=file_cache):
+                self.assertIsInstance(get_checkin_index(), CacheCheckInIndex)
+
+    def test_service_rejects_duplicate_without_queries(self):
+        """Test that a repeated tap is rejected from the index"""
+        index = LocalCheckInIndex()
+        with patch("apps.attendance.services.attendance_service.get_checkin_index", return_value=index):
+            index.contains(self.user.uid, date.today())
+            with self.assertNumQueries(0):
+                with self.assertRaises(ValueError):
+                    AttendanceService.create_attendance(self.user, {"is_nfc": True, "is_qr": False, "date": date.today()})
+
+
+class AttendanceIndexTest(TestCase):
+
+    def setUp(self):
+        """Set up data and make the planner prefer indexes whenever it can use one"""
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.user = User.objects.create_user(
+            email="plan@example.com",
+            full_name="Plan User",
+            password="testpass123",
+            company=self.company
+        )
+        for i in range(5):
+            Attendance.objects.create(user=self.user, code="QR", is_qr=True, date=date.today() - timedelta(days=i))
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        table = Attendance._meta.db_table
+        self.assertNotRegex(plan, rf"SCAN {table}(?! USING (COVERING )?INDEX)")
+        self.assertNotIn(f"Seq Scan on {table}", plan)
+        self.assertRegex(plan, rf"(USING (COVERING )?INDEX \w+|Index (Only )?Scan using \w+ on {table})")
+
+    def view_queryset(self, view_class):
+        view = view_class()
+        view.request = SimpleNamespace(user=self.user)
+        return view.get_queryset()
+
+    def test_employee_list_uses_index(self):
+        """Test that the my-attendance list reads the per-user date index"""
+        self.assertUsesIndex(self.view_queryset(EmployeeAttendanceListAPIView))
+
+    def test_admin_list_uses_index(self):
+        """Test that the company-wide admin list does not scan all attendance"""
+        self.assertUsesIndex(self.view_queryset(AdminAttendanceListAPIView))
+
+    def test_date_range_filter_uses_index(self):
+        """Test that AttendanceFilter date ranges are index range scans"""
+        data = {"from_date": date.today() - timedelta(days=3), "to_date": date.today()}
+        self.assertUsesIndex(AttendanceFilter(data, queryset=Attendance.objects.all()).qs)
+
+    def test_report_querysets_use_index(self):
+        """Test that report querysets ordered by date and created_at use an index"""
+        filters = {"start_date": date.today() - timedelta(days=3)}
+        self.assertUsesIndex(AttendanceReportService.apply_filters(
+            ReportAttendanceRepository.company_attendance(self.company), filters
+        ))
+        self.assertUsesIndex(AttendanceReportService.apply_filters(
+            ReportAttendanceRepository.employee_attendance(self.user), {}
+        ))
+
+
+class AttendanceCompanyTest(TestCase):
+
+    def setUp(self):
+        """Set up a user who moves between two companies"""
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.new_company = Company.objects.create(company_name="New Company", location="Sylhet")
+        self.user = User.objects.create_user(
+            email="mover@example.com",
+            full_name="Mover",
+            password="testpass123",
+            company=self.company
+        )
+
+    def test_company_set_on_check_in(self):
+        """Test that the service copies the user's company onto the attendance"""
+        attendance = AttendanceService.create_attendance(
+            self.user, {"is_nfc": True, "is_qr": False, "date": date.today() - timedelta(days=1)}
+        )
+        self.assertEqual(Attendance.objects.get(uid=attendance.uid).company, self.company)
+
+    def test_company_set_on_model_save(self):
+        """Test that ORM writes outside the service also get the company"""
+        attendance = Attendance.objects.create(user=self.user, code="QR", is_qr=True, date=date.today())
+        self.assertEqual(attendance.company, self.company)
+
+    def test_company_follows_user(self):
+        """Test that moving a user re-points their attendance"""
+        Attendance.objects.create(user=self.user, code="QR", is_qr=True, date=date.today())
+        self.user.company = self.new_company
+        self.user.save()
+        self.assertEqual(Attendance.objects.get(user=self.user).company, self.new_company)
+
+        self.user.company = None
+        self.user.save(update_fields=["company"])
+        self.assertIsNone(Attendance.objects.get(user=self.user).company)
+
+    def test_unrelated_user_save_skips_sync(self):
+        """Test that saving other fields (e.g. last_login) does not touch attendance"""
+        with self.assertNumQueries(1):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=["last_login"])
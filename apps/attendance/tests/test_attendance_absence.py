@@ -0,0 +1,94 @@
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+
+
+class AbsenceTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up a company over 2025-03-01..05: Alice always present, Bob twice, Carol joined on the 4th"""
+        self.start, self.end = date(2025, 3, 1), date(2025, 3, 5)
+        joined = timezone.make_aware(datetime(2025, 1, 1))
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role,
+            company=self.company, date_joined=joined, is_active=False
+        )
+        self.alice = User.objects.create_user(
+            email="alice@example.com", full_name="Alice", password="pass", company=self.company, date_joined=joined
+        )
+        self.bob = User.objects.create_user(
+            email="bob@example.com", full_name="Bob", password="pass", company=self.company, date_joined=joined
+        )
+        self.carol = User.objects.create_user(
+            email="carol@example.com", full_name="Carol", password="pass", company=self.company,
+            date_joined=timezone.make_aware(datetime(2025, 3, 4, 9))
+        )
+        for offset in range(5):
+            self.check_in(self.alice, self.start + timedelta(days=offset))
+        for offset in (0, 3):
+            self.check_in(self.bob, self.start + timedelta(days=offset))
+        other_company = Company.objects.create(company_name="OtherCorp", location="Sylhet")
+        outsider = User.objects.create_user(
+            email="out@example.com", full_name="Outsider", password="pass", company=other_company, date_joined=joined
+        )
+        self.check_in(outsider, self.start)
+        self.client.force_authenticate(self.admin)
+
+    def check_in(self, user, day):
+        Attendance.objects.create(user=user, code="QR", is_qr=True, date=day)
+
+    def test_absentees_of_a_day(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("attendance-absentees"), {"date": "2025-03-02"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["count"], 1)
+        self.assertEqual(response.data["data"]["absentees"][0]["full_name"], "Bob")
+
+        response = self.client.get(reverse("attendance-absentees"), {"date": "2025-03-05"})
+        self.assertEqual([row["full_name"] for row in response.data["data"]["absentees"]], ["Bob", "Carol"])
+
+    def test_summary_per_day_and_employee(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse("attendance-absence-summary"), {"from_date": "2025-03-01", "to_date": "2025-03-05"}
+            )
+        data = response.data["data"]
+        self.assertEqual([day["expected"] for day in data["days"]], [2, 2, 2, 3, 3])
+        self.assertEqual([day["absent"] for day in data["days"]], [0, 1, 1, 1, 2])
+        self.assertEqual(data["totals"], {"expected": 12, "present": 7, "absent": 5})
+        self.assertEqual(
+            [(row["full_name"], row["expected_days"], row["absent_days"]) for row in data["employees"]],
+            [("Bob", 5, 3), ("Carol", 2, 2), ("Alice", 5, 0)],
+        )
+
+    def test_summary_range_is_limited(self):
+        response = self.client.get(
+            reverse("attendance-absence-summary"), {"from_date": "2020-01-01", "to_date": "2025-01-01"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_company_pdf_can_include_absences(self):
+        self.admin.is_active = True
+        self.admin.save()
+        self.client.force_authenticate(self.admin)
+        url = "/api/v1/reports/pdf/company/"
+
+        response = self.client.get(url, {"include_absences": "true"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with patch("apps.reports.utils.pdf_generator.render_to_string", return_value="") as render, \
+                patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf",
+                      side_effect=lambda html_string, target, **options: target.write_bytes(b"%PDF")):
+            response = self.client.get(url, {"include_absences": "true", "start_date": "2025-03-01", "end_date": "2025-03-05"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        absences = render.call_args.args[1]["absences"]
+        # the administrator is active again, and never checked in
+        self.assertEqual(absences["totals"]["absent"], 10)
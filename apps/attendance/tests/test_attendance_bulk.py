@@ -0,0 +1,90 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from datetime import date, timedelta
+
+
+class AttendanceBulkCreateTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator, two employees and an outsider"""
+        self.admin_role = Role.objects.create(role_name="Administrator")
+        self.employee_role = Role.objects.create(role_name="Employee")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.other_company = Company.objects.create(company_name="OtherCorp", location="Sylhet")
+
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass",
+            role=self.admin_role, company=self.company
+        )
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Employee One", password="pass",
+            role=self.employee_role, company=self.company
+        )
+        self.employee2 = User.objects.create_user(
+            email="emp2@example.com", full_name="Employee Two", password="pass",
+            role=self.employee_role, company=self.company
+        )
+        self.outsider = User.objects.create_user(
+            email="out@example.com", full_name="Outsider", password="pass",
+            role=self.employee_role, company=self.other_company
+        )
+        self.url = reverse("attendance-bulk-create")
+        self.client.force_authenticate(self.admin)
+
+    def scan(self, user, day=None, nfc=True):
+        return {"employee": str(user.uid), "is_nfc": nfc, "is_qr": not nfc, "date": str(day or date.today())}
+
+    def test_bulk_create_reports_each_item(self):
+        """Accepted, duplicate and rejected items are reported in input order"""
+        Attendance.objects.create(user=self.employee2, code="QR", is_qr=True, date=date.today())
+        payload = {"check_ins": [
+            self.scan(self.employee),
+            self.scan(self.employee),  # repeated in the same batch
+            self.scan(self.employee2),  # already stored
+            self.scan(self.outsider),  # other company
+            {"employee": str(self.employee.uid), "is_nfc": True, "is_qr": True, "date": str(date.today())},
+            {"employee": "not-a-uuid", "date": "2025-01-01"},
+            self.scan(self.employee, date.today() - timedelta(days=1), nfc=False),
+        ]}
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data["data"]["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["accepted", "duplicate", "duplicate", "rejected", "rejected", "rejected", "accepted"],
+        )
+        self.assertEqual(
+            response.data["data"]["summary"],
+            {"received": 7, "accepted": 2, "duplicate": 2, "rejected": 3},
+        )
+        self.assertEqual(Attendance.objects.filter(user=self.employee).count(), 2)
+        self.assertEqual(Attendance.objects.get(uid=results[6]["uid"]).code, "QR")
+
+    def test_bulk_create_uses_set_based_queries(self):
+        """A batch costs a fixed number of queries regardless of its size"""
+        employees = [
+            User.objects.create_user(
+                email=f"bulk{i}@example.com", full_name=f"Bulk {i}", password="pass",
+                role=self.employee_role, company=self.company
+            ) for i in range(20)
+        ]
+        yesterday = date.today() - timedelta(days=1)
+        payload = {"check_ins": [self.scan(user, yesterday) for user in employees]}
+        # users, existing pairs, INSERT, written uids, daily rollup and monthly summary upserts
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.data["data"]["summary"]["accepted"], 20)
+
+    def test_bulk_create_requires_administrator(self):
+        self.client.force_authenticate(self.employee)
+        response = self.client.post(self.url, {"check_ins": [self.scan(self.employee)]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_rejects_empty_batch(self):
+        response = self.client.post(self.url, {"check_ins": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from datetime import date, timedelta
+
+
+class AttendanceExportTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator, 12 days of attendance in their company and one row elsewhere"""
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=self.company
+        )
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Employee, Jr.", password="pass", company=self.company
+        )
+        self.start = date.today() - timedelta(days=11)
+        for day in range(12):
+            Attendance.objects.create(
+                user=self.employee, code="NFC", is_nfc=True, date=self.start + timedelta(days=day)
+            )
+        other_company = Company.objects.create(company_name="OtherCorp", location="Dhaka")
+        outsider = User.objects.create_user(
+            email="out@example.com", full_name="Outsider", password="pass", company=other_company
+        )
+        Attendance.objects.create(user=outsider, code="QR", is_qr=True, date=self.start)
+        self.url = reverse("admin-attendance-export")
+        self.client.force_authenticate(self.admin)
+
+    def body(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_export_streams_company_rows_oldest_first(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0]["date"], self.start.isoformat())
+        self.assertEqual(rows[0]["employee_name"], "Employee, Jr.")
+        self.assertEqual(rows[0]["employee_uid"], str(self.employee.uid))
+        self.assertEqual([row["date"] for row in rows], sorted(row["date"] for row in rows))
+
+    def test_csv_export_has_header_and_quoted_rows(self):
+        response = self.client.get(self.url, {"output": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(self.body(response))))
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0]["employee_name"], "Employee, Jr.")
+        self.assertEqual(rows[0]["code"], "NFC")
+
+    def test_export_applies_attendance_filter(self):
+        response = self.client.get(self.url, {"from_date": (self.start + timedelta(days=10)).isoformat()})
+        self.assertEqual(len(self.body(response).splitlines()), 2)
+
+    def test_export_is_written_in_chunks(self):
+        with patch("apps.attendance.utils.attendance_export.ROWS_PER_WRITE", 5):
+            response = self.client.get(self.url, {"output": "csv"})
+            chunks = list(response.streaming_content)
+        # header + 5 + 5 + 2
+        self.assertEqual(len(chunks), 4)
+
+    def test_unknown_output_format(self):
+        response = self.client.get(self.url, {"output": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_filter(self):
+        response = self.client.get(self.url, {"from_date": "not-a-date"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
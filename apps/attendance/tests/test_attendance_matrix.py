@@ -0,0 +1,62 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from datetime import date, timedelta
+
+
+class AttendanceMatrixTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator, two employees with a few check-ins, and an outsider"""
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=self.company
+        )
+        self.alice = User.objects.create_user(
+            email="alice@example.com", full_name="Alice", password="pass", company=self.company
+        )
+        self.bob = User.objects.create_user(
+            email="bob@example.com", full_name="Bob", password="pass", company=self.company
+        )
+        other_company = Company.objects.create(company_name="OtherCorp", location="Sylhet")
+        outsider = User.objects.create_user(
+            email="out@example.com", full_name="Outsider", password="pass", company=other_company
+        )
+        self.start = date(2025, 3, 1)
+        for offset, code in ((0, "NFC"), (2, "QR"), (6, "NFC")):
+            Attendance.objects.create(
+                user=self.alice, code=code, is_nfc=code == "NFC", is_qr=code == "QR",
+                date=self.start + timedelta(days=offset),
+            )
+        Attendance.objects.create(user=self.bob, code="QR", is_qr=True, date=self.start + timedelta(days=2))
+        # outside the range and outside the company
+        Attendance.objects.create(user=self.bob, code="QR", is_qr=True, date=self.start - timedelta(days=1))
+        Attendance.objects.create(user=outsider, code="QR", is_qr=True, date=self.start)
+        self.url = reverse("attendance-matrix")
+        self.client.force_authenticate(self.admin)
+
+    def test_matrix_is_pivoted_from_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"from_date": "2025-03-01", "to_date": "2025-03-07"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["data"]
+        self.assertEqual(data["days"], 7)
+        self.assertEqual(data["daily_totals"], [1, 0, 2, 0, 0, 0, 1])
+        self.assertEqual(data["employees"], [
+            {"uid": self.admin.uid, "full_name": "Admin", "presence": "0000000", "methods": "-------"},
+            {"uid": self.alice.uid, "full_name": "Alice", "presence": "1010001", "methods": "N-Q---N"},
+            {"uid": self.bob.uid, "full_name": "Bob", "presence": "0010000", "methods": "--Q----"},
+        ])
+
+    def test_matrix_defaults_to_the_month_of_from_date(self):
+        response = self.client.get(self.url, {"from_date": "2025-03-01"})
+        self.assertEqual(response.data["data"]["days"], 31)
+        self.assertEqual(len(response.data["data"]["employees"][1]["presence"]), 31)
+
+    def test_matrix_range_is_limited(self):
+        response = self.client.get(self.url, {"from_date": "2025-01-01", "to_date": "2025-12-31"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,203 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest.mock import patch
+from common.pagination.counting import resolve_count
+from common.pagination.cursor_pagination import KeysetPagination
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from datetime import date, timedelta
+import tempfile
+import uuid
+
+
+class AttendanceKeysetPaginationTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator and 25 attendance rows across employees"""
+        self.admin_role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass",
+            role=self.admin_role, company=self.company
+        )
+        self.employees = [
+            User.objects.create_user(
+                email=f"emp{i}@example.com", full_name=f"Employee {i}", password="pass",
+                role=self.admin_role, company=self.company
+            ) for i in range(5)
+        ]
+        for day in range(5):
+            for employee in self.employees:
+                Attendance.objects.create(
+                    user=employee, code="NFC", is_nfc=True, date=date.today() - timedelta(days=day)
+                )
+        self.url = reverse("admin-attendance-list")
+        self.client.force_authenticate(self.admin)
+
+    def test_cursor_pages_cover_all_rows_in_order(self):
+        """Following `next` visits every row exactly once, newest first"""
+        seen = []
+        response = self.client.get(self.url, {"pagination": "cursor", "limit": 10})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("total", response.data["meta"])
+            seen.extend(response.data["data"])
+            if not response.data["meta"]["next"]:
+                break
+            response = self.client.get(self.url, {"cursor": response.data["meta"]["cursor"], "limit": 10})
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len({row["uid"] for row in seen}), 25)
+        keys = [(row["date"], row["uid"]) for row in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_cursor_page_does_not_count(self):
+        """Cursor pages run the page query only, no COUNT(*)"""
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"pagination": "cursor"})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_invalid_values(self):
+        """A well-formed cursor whose values do not fit the ordering fields is rejected, not a server error"""
+        pagination = KeysetPagination()
+        for position in (["garbage", str(uuid.uuid4())], [str(date.today()), "not-a-uuid"], [str(date.today()), None]):
+            response = self.client.get(self.url, {"cursor": pagination.encode_cursor(position)})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["meta"]["total"], 25)
+        self.assertEqual(response.data["meta"]["page"], 1)
+
+
+COUNTS = {
+    "CACHE_ALIAS": "default",
+    "MODELS": ["attendance.Attendance", "auths.User"],
+    "CACHE_THRESHOLD": 20,
+    "CACHE_TIMEOUT": 300,
+    "ESTIMATE_THRESHOLD": 1000,
+}
+# a file cache is shared between the workers of a host, unlike the default LocMem cache
+SHARED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tempfile.mkdtemp(),
+    }
+}
+
+
+@override_settings(PAGINATION_COUNTS=COUNTS, CACHES=SHARED_CACHES)
+class AttendanceCountStrategyTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an employee with 25 attendance rows"""
+        cache.clear()
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Employee", password="pass", company=self.company
+        )
+        for day in range(25):
+            Attendance.objects.create(
+                user=self.employee, code="QR", is_qr=True, date=date.today() - timedelta(days=day + 1)
+            )
+        self.url = reverse("employee-attendance-list")
+        self.client.force_authenticate(self.employee)
+
+    @override_settings(PAGINATION_COUNTS={**COUNTS, "CACHE_THRESHOLD": 100})
+    def test_small_results_are_counted_exactly(self):
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.data["meta"]["countStrategy"], "exact")
+            self.assertEqual(response.data["meta"]["total"], 25)
+
+    def test_large_results_are_cached_until_a_write(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["meta"]["countStrategy"], "exact")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["meta"]["countStrategy"], "cached")
+        self.assertEqual(response.data["meta"]["total"], 25)
+
+        self.client.post(
+            reverse("attendance-create"), {"is_nfc": True, "is_qr": False, "date": str(date.today())}, format="json"
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["meta"]["countStrategy"], "exact")
+        self.assertEqual(response.data["meta"]["total"], 26)
+
+    def test_per_process_caches_are_not_used(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            for _ in range(2):
+                response = self.client.get(self.url)
+                self.assertEqual(response.data["meta"]["countStrategy"], "exact")
+
+    def test_only_counted_models_are_cached(self):
+        companies = Company.objects.all()
+        with override_settings(PAGINATION_COUNTS={**COUNTS, "CACHE_THRESHOLD": 1}):
+            self.assertEqual(resolve_count(companies), ("exact", 1))
+            self.assertEqual(resolve_count(companies), ("exact", 1))
+            users = User.objects.all()
+            self.assertEqual(resolve_count(users), ("exact", 1))
+            self.assertEqual(resolve_count(users), ("cached", 1))
+
+    def test_unfiltered_large_tables_are_estimated(self):
+        with patch("common.pagination.counting.get_fast_count", return_value=500000):
+            self.assertEqual(resolve_count(Attendance.objects.all()), ("estimated", 500000))
+            self.assertEqual(resolve_count(Attendance.objects.filter(user=self.employee)), ("exact", 25))
+
+
+class AttendanceValuesListTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator and an employee with a few attendance rows"""
+        cache.clear()
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=self.company
+        )
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Employee Ünïcode", password="pass", role=role, company=self.company
+        )
+        for day in range(12):
+            Attendance.objects.create(
+                user=self.employee, code="NFC" if day % 2 else "QR", is_nfc=bool(day % 2),
+                is_qr=not day % 2, date=date.today() - timedelta(days=day)
+            )
+
+    def assertSameAsModelSerializer(self, view_class, user, url, params):
+        self.client.force_authenticate(user)
+        fast = self.client.get(url, params)
+        with patch.object(view_class, "values_serializer_class", None):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_employee_list_is_byte_identical(self):
+        from apps.attendance.views import EmployeeAttendanceListAPIView
+        url = reverse("employee-attendance-list")
+        for params in ({}, {"page": 2}, {"pagination": "cursor", "limit": 5}):
+            self.assertSameAsModelSerializer(EmployeeAttendanceListAPIView, self.employee, url, params)
+
+    def test_admin_list_is_byte_identical(self):
+        from apps.attendance.views import AdminAttendanceListAPIView
+        url = reverse("admin-attendance-list")
+        for params in ({}, {"limit": 100}, {"pagination": "cursor", "limit": 5}):
+            self.assertSameAsModelSerializer(AdminAttendanceListAPIView, self.admin, url, params)
+
+    def test_admin_list_does_not_load_users(self):
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("admin-attendance-list"), {"limit": 100})
+        page_query = queries.captured_queries[-1]["sql"]
+        self.assertNotIn('"auths_user"."password"', page_query)
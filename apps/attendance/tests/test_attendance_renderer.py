@@ -0,0 +1,67 @@
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from common.api.renderers import ORJSONRenderer
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+
+
+class ORJSONRendererTestCase(APITestCase):
+
+    def setUp(self):
+        self.stock = JSONRenderer()
+        self.fast = ORJSONRenderer()
+
+    def assertRendersLikeStock(self, data):
+        self.assertEqual(self.fast.render(data), self.stock.render(data))
+
+    def test_serialized_payloads_match_stock_renderer(self):
+        self.assertRendersLikeStock({
+            "success": True,
+            "statusCode": 200,
+            "message": "Ünïcode \u2028 line separator",
+            "data": [{"uid": str(uuid.uuid4()), "date": "2025-12-19", "total": 1.5, "code": None}],
+        })
+
+    def test_uuid_date_and_fallback_types_match_stock_renderer(self):
+        self.assertRendersLikeStock({
+            "uid": uuid.uuid4(),
+            "date": date(2025, 12, 19),
+            "amount": Decimal("1.25"),
+            "codes": ("NFC", "QR"),
+        })
+
+    def test_datetimes_match_datetime_field(self):
+        value = datetime(2025, 12, 19, 9, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            self.fast.render({"created_at": value}),
+            ('{"created_at":"%s"}' % serializers.DateTimeField().to_representation(value)).encode(),
+        )
+
+    def test_unsupported_payloads_fall_back_to_stock_renderer(self):
+        self.assertRendersLikeStock({1: "non-string key", "big": 2 ** 70})
+
+    def test_indented_output_uses_stock_renderer(self):
+        data = {"uid": str(uuid.uuid4())}
+        self.assertEqual(
+            self.fast.render(data, "application/json; indent=4"),
+            self.stock.render(data, "application/json; indent=4"),
+        )
+
+    def test_api_responses_use_orjson_renderer(self):
+        role = Role.objects.create(role_name="Administrator")
+        company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=company
+        )
+        Attendance.objects.create(user=admin, code="NFC", is_nfc=True, date=date.today())
+        self.client.force_authenticate(admin)
+
+        response = self.client.get(reverse("admin-attendance-list"), HTTP_ACCEPT="application/json")
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, self.stock.render(response.data))
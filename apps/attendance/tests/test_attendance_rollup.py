@@ -0,0 +1,254 @@
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance, AttendanceDailyRollup, AttendanceMonthlySummary
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from apps.attendance.utils.dates import month_start
+from datetime import date, timedelta
+
+
+class AttendanceDailyRollupTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator and two employees of one company, and another company"""
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.other_company = Company.objects.create(company_name="OtherCorp", location="Sylhet")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=self.company
+        )
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Employee One", password="pass", company=self.company
+        )
+        self.employee2 = User.objects.create_user(
+            email="emp2@example.com", full_name="Employee Two", password="pass", company=self.company
+        )
+        self.yesterday = date.today() - timedelta(days=1)
+
+    def rollup(self, company=None, day=None):
+        row = AttendanceDailyRollup.objects.filter(company=company or self.company, date=day or self.yesterday).first()
+        return (row.present_count, row.nfc_count, row.qr_count) if row else None
+
+    def check_in(self, user, nfc=True, day=None):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            reverse("attendance-create"),
+            {"is_nfc": nfc, "is_qr": not nfc, "date": str(day or self.yesterday)},
+            format="json",
+        )
+
+    def test_check_ins_update_the_rollup(self):
+        self.check_in(self.employee, nfc=True)
+        self.assertEqual(self.rollup(), (1, 1, 0))
+        self.check_in(self.employee2, nfc=False)
+        self.assertEqual(self.rollup(), (2, 1, 1))
+
+    def test_duplicate_check_in_is_not_counted(self):
+        self.check_in(self.employee)
+        response = self.check_in(self.employee)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.rollup(), (1, 1, 0))
+
+    def test_bulk_check_ins_update_the_rollup(self):
+        self.client.force_authenticate(self.admin)
+        self.client.post(reverse("attendance-bulk-create"), {"check_ins": [
+            {"employee": str(user.uid), "is_nfc": False, "is_qr": True, "date": str(self.yesterday)}
+            for user in (self.employee, self.employee2)
+        ]}, format="json")
+        self.assertEqual(self.rollup(), (2, 0, 2))
+
+    def test_orm_creates_and_deletes_update_the_rollup(self):
+        attendance = Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=self.yesterday)
+        Attendance.objects.create(user=self.employee2, code="QR", is_qr=True, date=self.yesterday)
+        self.assertEqual(self.rollup(), (2, 1, 1))
+        attendance.delete()
+        self.assertEqual(self.rollup(), (1, 0, 1))
+
+    def test_company_move_moves_the_counts(self):
+        Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=self.yesterday)
+        self.employee.company = self.other_company
+        self.employee.save()
+        self.assertEqual(self.rollup(), (0, 0, 0))
+        self.assertEqual(self.rollup(self.other_company), (1, 1, 0))
+
+    def test_edits_move_the_counts(self):
+        attendance = Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=self.yesterday)
+        today = self.yesterday + timedelta(days=1)
+        attendance.date = today
+        attendance.code, attendance.is_nfc, attendance.is_qr = "QR", False, True
+        attendance.save()
+        self.assertEqual(self.rollup(), (0, 0, 0))
+        self.assertEqual(self.rollup(day=today), (1, 0, 1))
+        versions = AttendanceDailyRollup.objects.order_by("date").values_list("version", flat=True)
+        self.assertEqual(list(versions), [2, 1])
+
+    def test_rebuild_command_recomputes_range(self):
+        for day in range(3):
+            Attendance.objects.create(
+                user=self.employee, code="NFC", is_nfc=True, date=self.yesterday - timedelta(days=day)
+            )
+        AttendanceDailyRollup.objects.update(present_count=99)
+
+        out = StringIO()
+        call_command("rebuild_attendance_rollups", "--from-date", str(self.yesterday - timedelta(days=1)), stdout=out)
+        self.assertIn("Rebuilt 2 daily rollups", out.getvalue())
+        self.assertEqual(self.rollup(), (1, 1, 0))
+        self.assertEqual(self.rollup(day=self.yesterday - timedelta(days=2))[0], 99)
+
+    def test_every_change_bumps_the_version(self):
+        def version():
+            return AttendanceDailyRollup.objects.get(company=self.company, date=self.yesterday).version
+
+        attendance = Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=self.yesterday)
+        self.check_in(self.employee2)
+        self.assertEqual(version(), 2)
+        attendance.code = "QR"
+        attendance.save()
+        self.assertEqual(version(), 3)
+        attendance.delete()
+        self.assertEqual(version(), 4)
+        call_command("rebuild_attendance_rollups", stdout=StringIO())
+        self.assertEqual(version(), 5)
+
+    def test_daily_summary_reads_rollups(self):
+        for day in range(3):
+            for user, nfc in ((self.employee, True), (self.employee2, False)):
+                Attendance.objects.create(
+                    user=user, code="NFC" if nfc else "QR", is_nfc=nfc, is_qr=not nfc,
+                    date=self.yesterday - timedelta(days=day),
+                )
+        self.client.force_authenticate(self.admin)
+        url = reverse("attendance-daily-summary")
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"from_date": str(self.yesterday - timedelta(days=1))})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["data"]
+        self.assertEqual(data["totals"], {"days": 2, "present_count": 4, "nfc_count": 2, "qr_count": 2})
+        self.assertEqual([day["date"] for day in data["days"]], [self.yesterday, self.yesterday - timedelta(days=1)])
+
+    def test_daily_summary_rejects_inverted_range(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse("attendance-daily-summary"), {
+            "from_date": str(self.yesterday), "to_date": str(self.yesterday - timedelta(days=5)),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AttendanceMonthlySummaryTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an employee with three check-ins last month and one this month"""
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Employee One", password="pass", company=self.company
+        )
+        self.this_month = date.today().replace(day=1)
+        self.last_month = (self.this_month - timedelta(days=1)).replace(day=1)
+        self.rows = [
+            Attendance.objects.create(
+                user=self.employee, code="NFC" if day else "QR", is_nfc=bool(day), is_qr=not day,
+                date=self.last_month + timedelta(days=day),
+            )
+            for day in range(3)
+        ]
+        Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=self.this_month)
+
+    def summary(self, month=None):
+        return AttendanceMonthlySummary.objects.get(user=self.employee, month=month or self.last_month)
+
+    def test_writes_keep_the_month_current(self):
+        summary = self.summary()
+        self.assertEqual((summary.days_present, summary.nfc_count, summary.qr_count), (3, 2, 1))
+        self.assertEqual(summary.first_check_in, self.rows[0].created_at)
+        self.assertEqual(summary.last_check_in, self.rows[2].created_at)
+        self.assertEqual(self.summary(self.this_month).days_present, 1)
+
+    def test_check_in_through_the_api_is_summarized(self):
+        day = self.last_month + timedelta(days=5)
+        self.client.force_authenticate(self.employee)
+        self.client.post(reverse("attendance-create"), {"is_nfc": False, "is_qr": True, "date": str(day)}, format="json")
+        summary = self.summary()
+        self.assertEqual((summary.days_present, summary.qr_count), (4, 2))
+        self.assertEqual(summary.last_check_in, Attendance.objects.get(user=self.employee, date=day).created_at)
+
+    def test_delete_recomputes_the_month(self):
+        self.rows[2].delete()
+        summary = self.summary()
+        self.assertEqual((summary.days_present, summary.nfc_count, summary.last_check_in), (2, 1, self.rows[1].created_at))
+        for row in self.rows[:2]:
+            row.delete()
+        self.assertFalse(AttendanceMonthlySummary.objects.filter(user=self.employee, month=self.last_month).exists())
+
+    def test_edits_recount_both_months(self):
+        row = self.rows[2]
+        row.date = self.this_month + timedelta(days=1)
+        row.code, row.is_nfc, row.is_qr = "QR", False, True
+        row.save()
+        summary = self.summary()
+        self.assertEqual((summary.days_present, summary.nfc_count, summary.qr_count), (2, 1, 1))
+        self.assertEqual(summary.last_check_in, self.rows[1].created_at)
+        summary = self.summary(self.this_month)
+        self.assertEqual((summary.days_present, summary.nfc_count, summary.qr_count), (2, 1, 1))
+
+        # moved into a month that had no summary yet
+        row.date = self.last_month - timedelta(days=1)
+        row.save()
+        self.assertEqual(self.summary(month_start(row.date)).days_present, 1)
+
+    def test_reconcile_command_repairs_every_month(self):
+        older = self.last_month - timedelta(days=40)
+        Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=older)
+        AttendanceMonthlySummary.objects.update(days_present=0)
+        out = StringIO()
+        call_command("reconcile_attendance_summaries", "--all", stdout=out)
+        self.assertIn("Reconciled 3 month(s)", out.getvalue())
+        self.assertEqual(self.summary(month_start(older)).days_present, 1)
+        self.assertEqual(self.summary().days_present, 3)
+
+    def test_reconcile_command_repairs_drift(self):
+        AttendanceMonthlySummary.objects.update(days_present=0, first_check_in=None)
+        out = StringIO()
+        call_command("reconcile_attendance_summaries", stdout=out)
+        self.assertIn("Reconciled 2 month(s)", out.getvalue())
+        self.assertEqual(self.summary().days_present, 3)
+        self.assertEqual(self.summary().first_check_in, self.rows[0].created_at)
+
+    def test_every_change_bumps_the_version(self):
+        self.assertEqual(self.summary().version, 3)
+        self.rows[0].code = "NFC"
+        self.rows[0].save()
+        self.rows[1].delete()
+        self.assertEqual(self.summary().version, 5)
+        call_command("reconcile_attendance_summaries", stdout=StringIO())
+        self.assertEqual(self.summary().version, 6)
+
+    def test_employee_pdf_header_reads_summaries_for_whole_months(self):
+        from unittest.mock import patch
+        from apps.reports.services.attendance_report_service import AttendanceReportService
+        from apps.reports.utils.pdf_files import temp_pdf
+
+        totals = AttendanceReportService.employee_totals(self.employee, {})
+        self.assertEqual((totals["total_records"], totals["nfc_count"], totals["qr_count"]), (4, 3, 1))
+
+        last_day = self.this_month - timedelta(days=1)
+        totals = AttendanceReportService.employee_totals(
+            self.employee, {"start_date": self.last_month, "end_date": last_day}
+        )
+        self.assertEqual(totals["total_records"], 3)
+        self.assertIsNone(AttendanceReportService.employee_totals(
+            self.employee, {"start_date": self.last_month + timedelta(days=1)}
+        ))
+
+        with patch("apps.reports.utils.pdf_generator.render_to_string", return_value="") as render, \
+                patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf"), \
+                temp_pdf() as target:
+            AttendanceReportService.generate_employee_pdf(
+                self.employee, {"start_date": self.last_month, "end_date": last_day}, target
+            )
+        context = render.call_args.args[1]
+        self.assertEqual((context["total_records"], context["nfc_count"], context["qr_count"]), (3, 2, 1))
+        self.assertEqual(context["first_check_in"], self.rows[0].created_at)
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.auths.repositories.user_repository import UserRepository
+from apps.companies.models import Company
+from datetime import date, timedelta
+
+
+class UserSearchTestCase(APITestCase):
+
+    def setUp(self):
+        """Set up an administrator and three employees with two attendance rows each"""
+        self.admin_role = Role.objects.create(role_name="Administrator")
+        self.main_admin_role = Role.objects.create(role_name="Admin")
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass",
+            role=self.admin_role, company=self.company
+        )
+        self.alice = self.employee("Alice Rahman", "alice@corp.example")
+        self.bob = self.employee("Bob Karim", "bob@corp.example")
+        self.carol = self.employee("Carol Rahim", "carol@other.example")
+        self.url = reverse("admin-attendance-list")
+        self.client.force_authenticate(self.admin)
+
+    def employee(self, full_name, email):
+        user = User.objects.create_user(email=email, full_name=full_name, password="pass", company=self.company)
+        for day in range(2):
+            Attendance.objects.create(user=user, code="QR", is_qr=True, date=date.today() - timedelta(days=day))
+        return user
+
+    def search(self, term, url=None):
+        response = self.client.get(url or self.url, {"search": term, "limit": 100})
+        return {row["employee"]["full_name"] for row in response.data["data"]}
+
+    def test_search_uses_fts_index(self):
+        if not UserRepository.search_index_available():
+            self.skipTest("SQLite FTS5 trigram tokenizer not available")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search("rahman"), {"Alice Rahman"})
+        self.assertTrue(any("auths_user_search" in query["sql"] for query in queries.captured_queries))
+
+    def test_search_matches_names_and_emails_case_insensitively(self):
+        self.assertEqual(self.search("RAHMAN"), {"Alice Rahman"})
+        self.assertEqual(self.search("corp.example"), {"Alice Rahman", "Bob Karim"})
+        self.assertEqual(self.search("rah corp"), {"Alice Rahman"})
+
+    def test_short_terms_fall_back_to_icontains(self):
+        self.assertEqual(self.search("ra"), {"Alice Rahman", "Carol Rahim"})
+
+    def test_index_follows_user_updates_and_deletes(self):
+        self.bob.full_name = "Robert Karim"
+        self.bob.save()
+        self.assertEqual(self.search("robert"), {"Robert Karim"})
+        self.assertEqual(self.search("bob karim"), {"Robert Karim"})
+
+        self.carol.delete()
+        self.assertEqual(self.search("carol"), set())
+
+    def test_attendance_uid_is_still_searchable(self):
+        attendance = Attendance.objects.filter(user=self.bob).first()
+        response = self.client.get(self.url, {"search": str(attendance.uid)[:8]})
+        self.assertEqual([row["uid"] for row in response.data["data"]], [str(attendance.uid)])
+
+    def test_user_list_search(self):
+        main_admin = User.objects.create_user(
+            email="root@example.com", full_name="Root", password="pass", role=self.main_admin_role
+        )
+        self.client.force_authenticate(main_admin)
+        response = self.client.get(reverse("all-employee-list"), {"search": "rahim"})
+        self.assertEqual([row["full_name"] for row in response.data["data"]], ["Carol Rahim"])
@@ -0,0 +1,150 @@
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.attendance.models import Attendance, AttendanceDailyRollup
+from apps.attendance.repositories.attendance_repository import AttendanceRepository
+from apps.attendance.services.attendance_service import AttendanceService
+from apps.attendance.utils.checkin_journal import CheckInJournal
+from apps.attendance.utils.checkin_index import LocalCheckInIndex
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from datetime import date, timedelta
+from django.utils import timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import sqlite3
+import tempfile
+
+
+@override_settings(ATTENDANCE_WRITE_BEHIND={
+    "ENABLED": True, "JOURNAL_PATH": None, "BATCH_SIZE": 2, "MAX_FLUSH_LATENCY": 1.0,
+})
+class AttendanceWriteBehindTestCase(APITestCase):
+
+    def setUp(self):
+        """Point the service at a throw-away journal and keep the flusher thread out of the test"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.journal = CheckInJournal(Path(tmp.name) / "journal.sqlite3")
+        for target, value in (
+            ("get_journal", self.journal),
+            ("get_flusher", MagicMock()),
+            ("get_checkin_index", LocalCheckInIndex()),
+        ):
+            patcher = patch(f"apps.attendance.services.attendance_service.{target}", return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+        self.role = Role.objects.create(role_name="Employee")
+        self.user = User.objects.create_user(
+            email="queued@example.com", full_name="Queued User", password="pass",
+            role=self.role, company=self.company
+        )
+        self.client.force_authenticate(self.user)
+
+    def check_in(self, day):
+        return self.client.post(
+            reverse("attendance-create"), {"is_nfc": True, "is_qr": False, "date": str(day)}, format="json"
+        )
+
+    def test_check_in_is_acknowledged_before_persisting(self):
+        response = self.check_in(date.today())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(self.journal.pending_count(), 1)
+
+        self.assertEqual(AttendanceService.flush_journal(), 1)
+        attendance = Attendance.objects.get()
+        self.assertEqual(str(attendance.uid), response.data["data"]["uid"])
+        self.assertEqual(self.journal.pending_count(), 0)
+
+    def test_duplicate_tap_rejected_at_enqueue(self):
+        self.check_in(date.today())
+        response = self.check_in(date.today())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.journal.pending_count(), 1)
+
+    def test_flush_drops_duplicates_and_keeps_check_in_time(self):
+        yesterday = date.today() - timedelta(days=1)
+        Attendance.objects.create(user=self.user, code="QR", is_qr=True, date=yesterday)
+        for offset in (1, 2, 3):
+            self.check_in(date.today() - timedelta(days=offset))
+        queued_at = self.journal._connect().execute("SELECT created_at FROM pending WHERE seq = 2").fetchone()[0]
+
+        self.assertEqual(AttendanceService.flush_journal(), 3)
+        self.assertEqual(Attendance.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(
+            Attendance.objects.get(date=date.today() - timedelta(days=2)).created_at.isoformat(), queued_at
+        )
+
+    def test_replaying_a_flushed_batch_is_idempotent(self):
+        self.check_in(date.today())
+        rows = []
+        self.journal.drain(rows.extend, 10)  # "crash": rows taken but never written
+        records = [Attendance(**row) for row in rows]
+        self.assertEqual(len(AttendanceRepository.insert_journaled_attendance(records)), 1)
+        self.assertEqual(len(AttendanceRepository.insert_journaled_attendance([Attendance(**row) for row in rows])), 0)
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_journal_is_not_locked_while_flushing(self):
+        self.check_in(date.today())
+
+        def handler(rows):
+            # another worker appending to the journal does not wait for the flush
+            other = sqlite3.connect(self.journal.path, timeout=0, isolation_level=None)
+            other.execute("BEGIN IMMEDIATE")
+            other.execute("ROLLBACK")
+            other.close()
+
+        self.assertEqual(self.journal.drain(handler, 10), 1)
+        self.assertEqual(self.journal.pending_count(), 0)
+
+    def test_fallback_keeps_check_in_time_and_replays_idempotently(self):
+        day = date.today() - timedelta(days=1)
+        self.check_in(day)
+        rows = []
+        self.journal.drain(rows.extend, 10)
+
+        def replay():
+            return len(AttendanceRepository.insert_journaled_attendance([Attendance(**row) for row in rows]))
+
+        with patch.object(AttendanceRepository, "_supports_insert_ignore", return_value=False):
+            self.assertEqual(replay(), 1)
+            self.assertEqual(replay(), 0)
+        self.assertEqual(Attendance.objects.get().created_at, rows[0]["created_at"])
+        self.assertEqual(AttendanceDailyRollup.objects.get(date=day).present_count, 1)
+
+
+@override_settings(ATTENDANCE_WRITE_BEHIND={
+    "ENABLED": True, "JOURNAL_PATH": None, "BATCH_SIZE": 10, "MAX_FLUSH_LATENCY": 1.0,
+})
+class AttendanceJournalDeadLetterTestCase(TransactionTestCase):
+    """Foreign keys are checked at commit, so the flush must run outside a test transaction"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.journal = CheckInJournal(Path(tmp.name) / "journal.sqlite3")
+        patcher = patch("apps.attendance.services.attendance_service.get_journal", return_value=self.journal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.company = Company.objects.create(company_name="TestCorp", location="Dhaka")
+
+    def queue(self, email):
+        user = User.objects.create_user(email=email, full_name=email, password="pass", company=self.company)
+        self.journal.append(Attendance(
+            user=user, company=self.company, code="NFC", is_nfc=True, date=date.today(), created_at=timezone.now()
+        ))
+        return user
+
+    def test_vanished_user_does_not_block_the_journal(self):
+        first = self.queue("first@example.com")
+        User.objects.filter(pk=self.queue("gone@example.com").pk).delete()
+        last = self.queue("last@example.com")
+
+        self.assertEqual(AttendanceService.flush_journal(), 3)
+        self.assertEqual(set(Attendance.objects.values_list("user", flat=True)), {first.pk, last.pk})
+        self.assertEqual(self.journal.pending_count(), 0)
+        self.assertEqual(self.journal.dead_letter_count(), 1)
@@ -1,8 +1,15 @@
 from django.urls import path
 from .views import (
     AdminAttendanceDetailAPIView,
+    AdminAttendanceExportAPIView,
+    AttendanceDailySummaryAPIView,
+    AttendanceMatrixAPIView,
+    AbsenteesAPIView,
+    AbsenceSummaryAPIView,
     AdminAttendanceListAPIView,
     AttendanceCreateAPIView,
+    AttendanceBulkCreateAPIView,
+    CheckInIndexStatsAPIView,
     EmployeeAttendanceListAPIView,
     UserDetailsRetrieveAPIView,
     AllUsersListAPIView,
@@ -13,7 +20,14 @@ urlpatterns = [
     path("my-attendance/", EmployeeAttendanceListAPIView.as_view(), name="employee-attendance-list"),
     path("my-attendance/<str:uid>/", EmployeeAttendanceDetailAPIView.as_view(), name="employee-attendance-detail"),
     path("admin/", AdminAttendanceListAPIView.as_view(), name="admin-attendance-list"),
+    path("admin/export/", AdminAttendanceExportAPIView.as_view(), name="admin-attendance-export"),
+    path("admin/daily-summary/", AttendanceDailySummaryAPIView.as_view(), name="attendance-daily-summary"),
+    path("admin/matrix/", AttendanceMatrixAPIView.as_view(), name="attendance-matrix"),
+    path("admin/absences/", AbsenteesAPIView.as_view(), name="attendance-absentees"),
+    path("admin/absences/summary/", AbsenceSummaryAPIView.as_view(), name="attendance-absence-summary"),
     path("create/", AttendanceCreateAPIView.as_view(), name="attendance-create"),
+    path("bulk/", AttendanceBulkCreateAPIView.as_view(), name="attendance-bulk-create"),
+    path("checkin-index/stats/", CheckInIndexStatsAPIView.as_view(), name="checkin-index-stats"),
     path( "employee/<str:uid>/info/",  UserDetailsRetrieveAPIView.as_view(), name="employee-details", ),
     path("all-users/", AllUsersListAPIView.as_view(), name="all-employee-list"),
     path("<str:uid>/",AdminAttendanceDetailAPIView.as_view(),name="admin-attendance-detail",),
@@ -0,0 +1,66 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# (output column, queryset lookup) in export order
+EXPORT_COLUMNS = (
+    ("uid", "uid"),
+    ("date", "date"),
+    ("code", "code"),
+    ("is_nfc", "is_nfc"),
+    ("is_qr", "is_qr"),
+    ("employee_uid", "user__uid"),
+    ("employee_name", "user__full_name"),
+    ("created_at", "created_at"),
+)
+EXPORT_FIELDS = tuple(lookup for _, lookup in EXPORT_COLUMNS)
+EXPORT_HEADER = tuple(column for column, _ in EXPORT_COLUMNS)
+
+# Rows joined into one chunk of the streamed body, so the server writes a few
+# KB at a time instead of one syscall per row
+ROWS_PER_WRITE = 500
+
+
+class Echo:
+    """File-like object whose write() hands back the line csv.writer produced."""
+
+    def write(self, value):
+        return value
+
+
+def _ndjson_line(row):
+    record = dict(zip(EXPORT_HEADER, row))
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_UTC_Z)
+    return (json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n").encode()
+
+
+def iter_ndjson(rows):
+    """One JSON object per line for tuples in EXPORT_FIELDS order"""
+    buffer = []
+    for row in rows:
+        buffer.append(_ndjson_line(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_csv(rows):
+    """CSV with a header line for tuples in EXPORT_FIELDS order"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER).encode()
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield "".join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode()
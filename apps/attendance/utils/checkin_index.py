@@ -0,0 +1,165 @@
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from common.utils.cache import is_shared_cache
+from ..models import Attendance
+
+
+class CheckInIndex:
+    """
+    Membership index of users who already checked in today, consulted before
+    writing so duplicate badge taps are rejected without a database round
+    trip. Only today's date is indexed; other dates always fall through to
+    the insert, whose (user, date) conflict rejects them.
+
+    Deletes and edits of check-ins update the index through the Attendance
+    signals. Hits and misses are counted per process, without touching the
+    index's storage.
+    """
+
+    name = None
+
+    def __init__(self):
+        self._counter_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def contains(self, user_id, day):
+        if day != timezone.localdate():
+            return False
+        found = self._contains(user_id, day)
+        with self._counter_lock:
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return found
+
+    def add(self, user_id, day):
+        self.add_many([user_id], day)
+
+    def add_many(self, user_ids, day):
+        if day == timezone.localdate():
+            self._add_many(user_ids, day)
+
+    def discard(self, user_id, day):
+        if day == timezone.localdate():
+            self._discard(user_id, day)
+
+    def stats(self):
+        """Hits (duplicates rejected without a write) and misses of this process"""
+        hits, misses = self._hits, self._misses
+        lookups = hits + misses
+        return {
+            "backend": self.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _load(day):
+        return set(Attendance.objects.filter(date=day).values_list("user_id", flat=True))
+
+
+class LocalCheckInIndex(CheckInIndex):
+    """
+    Per-process set of today's user uids, rebuilt lazily when the day rolls
+    over. Deletes and edits only reach the set of the process that made them,
+    so this backend suits single-process deployments.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._day = None
+        self._members = set()
+
+    def _today(self, day):
+        # caller holds the lock
+        if self._day != day:
+            self._members = self._load(day)
+            self._day = day
+        return self._members
+
+    def _contains(self, user_id, day):
+        with self._lock:
+            return user_id in self._today(day)
+
+    def _add_many(self, user_ids, day):
+        with self._lock:
+            self._today(day).update(user_ids)
+
+    def _discard(self, user_id, day):
+        with self._lock:
+            self._today(day).discard(user_id)
+
+
+class CacheCheckInIndex(CheckInIndex):
+    """
+    Index stored in a Django cache so every worker sees the same state,
+    including the entries dropped by deletes and edits made elsewhere. Needs a
+    shared backend (Redis, Memcached, file or database cache).
+    """
+
+    name = "cache"
+    timeout = 2 * 24 * 60 * 60  # keys embed the date, so they only need to outlive the day
+    prefix = "attendance:checkin"
+
+    def __init__(self, alias="default"):
+        super().__init__()
+        self.cache = caches[alias]
+        self._loaded_day = None
+
+    def _key(self, user_id, day):
+        return f"{self.prefix}:{day.isoformat()}:{user_id}"
+
+    def _ensure_loaded(self, day):
+        if self._loaded_day == day:
+            return
+        marker = f"{self.prefix}:{day.isoformat()}:loaded"
+        if self.cache.get(marker) is None:
+            self.cache.set_many({self._key(user_id, day): 1 for user_id in self._load(day)}, self.timeout)
+            self.cache.set(marker, 1, self.timeout)
+        self._loaded_day = day
+
+    def _contains(self, user_id, day):
+        self._ensure_loaded(day)
+        return self.cache.get(self._key(user_id, day)) is not None
+
+    def _add_many(self, user_ids, day):
+        self._ensure_loaded(day)
+        self.cache.set_many({self._key(user_id, day): 1 for user_id in user_ids}, self.timeout)
+
+    def _discard(self, user_id, day):
+        self.cache.delete(self._key(user_id, day))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_checkin_index():
+    """
+    Return the configured index, or None when ATTENDANCE_CHECKIN_INDEX is
+    disabled or asks for the "cache" backend on a cache that is not shared
+    (the workers' indexes would go stale on each other's deletes and edits).
+    """
+    global _index
+    config = settings.ATTENDANCE_CHECKIN_INDEX
+    if not config or not config.get("BACKEND"):
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if config["BACKEND"] == "cache":
+                    alias = config.get("CACHE_ALIAS", "default")
+                    if not is_shared_cache(caches[alias]):
+                        return None
+                    _index = CacheCheckInIndex(alias)
+                else:
+                    _index = LocalCheckInIndex()
+    return _index
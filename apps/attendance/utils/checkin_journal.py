@@ -0,0 +1,208 @@
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class CheckInJournal:
+    """
+    Durable append-only queue of validated check-ins, stored in a local SQLite
+    file so it survives worker crashes and restarts.
+
+    Rows are removed only after the batch they belong to has been committed to
+    the main database. A crash in between (or a concurrent drain) replays the
+    batch, which is harmless because the replayed rows keep their uid and
+    conflict on (user, date). Rows the database refuses for any other reason
+    (e.g. the user was deleted before the flush) are moved to the
+    `dead_letter` table so they cannot block the rows queued behind them.
+    """
+
+    COLUMNS = "uid, user_id, company_id, code, is_nfc, is_qr, date, created_at"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " uid TEXT NOT NULL,"
+                " user_id TEXT NOT NULL,"
+                " company_id TEXT,"
+                " code TEXT NOT NULL,"
+                " is_nfc INTEGER NOT NULL,"
+                " is_qr INTEGER NOT NULL,"
+                " date TEXT NOT NULL,"
+                " created_at TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letter ("
+                " seq INTEGER PRIMARY KEY,"
+                " uid TEXT NOT NULL,"
+                " user_id TEXT NOT NULL,"
+                " company_id TEXT,"
+                " code TEXT NOT NULL,"
+                " is_nfc INTEGER NOT NULL,"
+                " is_qr INTEGER NOT NULL,"
+                " date TEXT NOT NULL,"
+                " created_at TEXT NOT NULL,"
+                " error TEXT NOT NULL,"
+                " failed_at TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, attendance):
+        self._connect().execute(
+            "INSERT INTO pending (uid, user_id, company_id, code, is_nfc, is_qr, date, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(attendance.uid),
+                str(attendance.user_id),
+                str(attendance.company_id) if attendance.company_id else None,
+                attendance.code,
+                int(attendance.is_nfc),
+                int(attendance.is_qr),
+                attendance.date.isoformat(),
+                attendance.created_at.isoformat(),
+            ),
+        )
+
+    def pending_count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def dead_letter_count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    @staticmethod
+    def _decode(row):
+        _, uid, user_id, company_id, code, is_nfc, is_qr, day, created_at = row
+        return {
+            "uid": uuid.UUID(uid),
+            "user_id": uuid.UUID(user_id),
+            "company_id": uuid.UUID(company_id) if company_id else None,
+            "code": code,
+            "is_nfc": bool(is_nfc),
+            "is_qr": bool(is_qr),
+            "date": date.fromisoformat(day),
+            "created_at": datetime.fromisoformat(created_at),
+        }
+
+    def drain(self, handler, batch_size):
+        """
+        Pass the oldest `batch_size` check-ins to `handler` and drop them from
+        the journal once it returns. No journal lock is held while the handler
+        writes to the main database, so appends never wait on a flush; a drain
+        running concurrently in another worker may hand the same rows over
+        twice, which the idempotent replay absorbs. When the handler raises
+        IntegrityError the batch is retried row by row, and rows refused again
+        go to the dead letters instead of blocking the journal.
+        Returns the number of check-ins handled.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT seq, {self.COLUMNS} FROM pending ORDER BY seq LIMIT ?", (batch_size,)
+        ).fetchall()
+        if not rows:
+            return 0
+
+        failed = []
+        try:
+            handler([self._decode(row) for row in rows])
+        except IntegrityError:
+            # one refused row fails the whole batch: retry row by row and set aside the rows refused again
+            for row in rows:
+                try:
+                    handler([self._decode(row)])
+                except IntegrityError as e:
+                    logger.warning("Check-in %s moved to the journal's dead letters: %s", row[1], e)
+                    failed.append((row[0], str(e)))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for seq, error in failed:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO dead_letter (seq, {self.COLUMNS}, error, failed_at)"
+                    f" SELECT seq, {self.COLUMNS}, ?, ? FROM pending WHERE seq = ?",
+                    (error, datetime.now().isoformat(), seq),
+                )
+            # later appends get higher seqs, so this removes exactly the batch
+            conn.execute("DELETE FROM pending WHERE seq <= ?", (rows[-1][0],))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+
+class JournalFlusher(threading.Thread):
+    """
+    Background thread that calls `flush` to drain the journal into Attendance.
+    It wakes up at least every `max_latency` seconds, and immediately once a
+    full batch has been queued by this process.
+    """
+
+    def __init__(self, flush, batch_size, max_latency):
+        super().__init__(name="checkin-journal-flusher", daemon=True)
+        self.flush = flush
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.wakeup = threading.Event()
+        self.queued = 0
+
+    def notify(self):
+        self.queued += 1
+        if self.queued >= self.batch_size:
+            self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.max_latency)
+            self.wakeup.clear()
+            self.queued = 0
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                # Rows stay in the journal and are retried on the next tick
+                logger.exception("Check-in journal flush failed")
+
+
+_journal = None
+_flusher = None
+_lock = threading.Lock()
+
+
+def get_journal():
+    global _journal
+    if _journal is None:
+        with _lock:
+            if _journal is None:
+                _journal = CheckInJournal(settings.ATTENDANCE_WRITE_BEHIND["JOURNAL_PATH"])
+    return _journal
+
+
+def get_flusher(flush):
+    """Return this process' flusher, starting it on first use"""
+    global _flusher
+    if _flusher is None:
+        with _lock:
+            if _flusher is None:
+                config = settings.ATTENDANCE_WRITE_BEHIND
+                _flusher = JournalFlusher(flush, config["BATCH_SIZE"], config["MAX_FLUSH_LATENCY"])
+                _flusher.start()
+    return _flusher
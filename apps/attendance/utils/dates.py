@@ -0,0 +1,10 @@
+from datetime import timedelta
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    """First day of the month after `month`'s"""
+    return (month.replace(day=1) + timedelta(days=32)).replace(day=1)
@@ -1,22 +1,34 @@
 from rest_framework.views import APIView
 from rest_framework import status
 from .serializers.attendance_create import AttendanceCreateSerializer
+from .serializers.attendance_bulk import AttendanceBulkCreateSerializer
+from .serializers.attendance_summary import DateRangeQuerySerializer, DayQuerySerializer
 from .serializers.attendance_list import (
     EmployeeAttendanceListSerializer,
     AdminAttendanceListSerializer,
+    EmployeeAttendanceListValuesSerializer,
+    AdminAttendanceListValuesSerializer,
 )
 from .serializers.employ_details import EmployeeDetailsSerializer
 from .models import Attendance
 from .services.attendance_service import AttendanceService
+from .services.matrix_service import AttendanceMatrixService
+from .services.absence_service import AbsenceService
+from .utils.dates import month_start, next_month
 from common.utils.permissions import IsAdministrator,IsAdmin
 from common.pagination.pagination import CustomPagination
+from common.pagination.cursor_pagination import KeysetPagination
 from common.utils.response import success_response, error_response
 from common.api.getApi import BaseListAPIView, BaseRetrieveAPIView
 from apps.auths.models import User
 from rest_framework.permissions import IsAuthenticated
 from .utils.attendanceFilter import AttendanceFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
+from rest_framework.filters import OrderingFilter, SearchFilter
+from apps.auths.utils.user_search import UserSearchFilter
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from datetime import timedelta
 
 
 class AttendanceCreateAPIView(APIView):
@@ -27,6 +39,16 @@ class AttendanceCreateAPIView(APIView):
         serializer.is_valid(raise_exception=True)
 
         try:
+            if AttendanceService.write_behind_enabled():
+                attendance = AttendanceService.enqueue_attendance(
+                    user=request.user, validated_data=serializer.validated_data
+                )
+                return success_response(
+                    "Attendance queued successfully",
+                    AttendanceCreateSerializer(attendance).data,
+                    status=status.HTTP_202_ACCEPTED,
+                )
+
             attendance = AttendanceService.create_attendance(
                 user=request.user, validated_data=serializer.validated_data
             )
@@ -41,11 +63,52 @@ class AttendanceCreateAPIView(APIView):
             return error_response(str(e), status=status.HTTP_400_BAD_REQUEST)
 
 
+class AttendanceBulkCreateAPIView(APIView):
+    """
+    Bulk check-in ingestion for NFC/QR terminals. Accepts a batch of buffered scans for employees of the Administrator's company and reports accepted/duplicate/rejected per item.
+    """
+
+    permission_classes = [IsAdministrator]
+
+    def post(self, request):
+        company = request.user.company
+        if not company:
+            return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+
+        serializer = AttendanceBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = AttendanceService.bulk_create_attendance(
+            company=company, check_ins=serializer.validated_data["check_ins"]
+        )
+        return success_response(
+            "Bulk attendance processed successfully",
+            result,
+            status=status.HTTP_200_OK,
+        )
+
+
+class CheckInIndexStatsAPIView(APIView):
+    """Hit/miss counters of the "already checked in today" index in the answering worker (main admin only)."""
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return success_response(
+            "Check-in index stats fetched successfully",
+            AttendanceService.checkin_index_stats(),
+            status=status.HTTP_200_OK,
+        )
+
+
 class EmployeeAttendanceListAPIView(BaseListAPIView):
     """List all attendance records for the authenticated employee."""
 
     serializer_class = EmployeeAttendanceListSerializer
+    values_serializer_class = EmployeeAttendanceListValuesSerializer
     pagination_class = CustomPagination
+    cursor_pagination_class = KeysetPagination
+    cursor_ordering = ("-date", "-uid")
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_class = AttendanceFilter
     search_fields = ["uid"]
@@ -76,21 +139,159 @@ class AdminAttendanceListAPIView(BaseListAPIView):
 
     permission_classes = [IsAdministrator]
     serializer_class = AdminAttendanceListSerializer
+    values_serializer_class = AdminAttendanceListValuesSerializer
     pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    cursor_pagination_class = KeysetPagination
+    cursor_ordering = ("-date", "-uid")
+    filter_backends = [DjangoFilterBackend, UserSearchFilter]
     filterset_class = AttendanceFilter
-    search_fields = ["uid", "user__full_name"]
+    search_fields = ["uid"]
+    user_search_field = "user"
 
     def get_queryset(self):
         # Only show attendance of users in the same company as admin
         admin_company = self.request.user.company
         return (
-            Attendance.objects.select_related("user", "user__company")
-            .filter(user__company=admin_company)
+            Attendance.objects.select_related("user")
+            .filter(company=admin_company)
             .order_by("-date")
         )
 
 
+class AdminAttendanceExportAPIView(APIView):
+    """
+    Stream the Administrator's company attendance as NDJSON (default) or CSV,
+    e.g. ?output=csv&from_date=2025-01-01. Accepts the AttendanceFilter params
+    of the admin list; rows are never paged or counted.
+    """
+
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        company = request.user.company
+        if not company:
+            return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+
+        filterset = AttendanceFilter(
+            request.query_params, queryset=Attendance.objects.filter(company=company)
+        )
+        if not filterset.is_valid():
+            return error_response("Invalid filters", filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        output = request.query_params.get("output", "ndjson")
+        try:
+            content_type, body = AttendanceService.export_attendance(filterset.qs, output)
+        except ValueError as e:
+            return error_response(str(e), status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(body, content_type=content_type)
+        filename = f"attendance-{timezone.localdate().isoformat()}.{output}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class AttendanceDailySummaryAPIView(APIView):
+    """
+    Daily present/NFC/QR totals of the Administrator's company, optionally
+    limited with ?from_date=&to_date=. Reads one rollup row per day.
+    """
+
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        company = request.user.company
+        if not company:
+            return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+
+        serializer = DateRangeQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        summary = AttendanceService.daily_summary(
+            company,
+            start=serializer.validated_data.get("from_date"),
+            end=serializer.validated_data.get("to_date"),
+        )
+        return success_response("Daily attendance summary fetched successfully", summary, status=status.HTTP_200_OK)
+
+
+class AttendanceMatrixAPIView(APIView):
+    """
+    Employees x days presence grid of the Administrator's company for
+    ?from_date=&to_date= (default: the month of from_date, or the current
+    month). Each employee carries
+    a `presence` bitstring ("1" = checked in) and a `methods` string
+    (N/Q/-) with one character per day from from_date.
+    """
+
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        company = request.user.company
+        if not company:
+            return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+
+        serializer = DateRangeQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        start = serializer.validated_data.get("from_date") or month_start(timezone.localdate())
+        end = serializer.validated_data.get("to_date") or next_month(start) - timedelta(days=1)
+        if start > end:
+            return error_response("from_date must be on or before to_date", status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            matrix = AttendanceMatrixService.build(company, start, end)
+        except ValueError as e:
+            return error_response(str(e), status=status.HTTP_400_BAD_REQUEST)
+        return success_response("Attendance matrix fetched successfully", matrix, status=status.HTTP_200_OK)
+
+
+class AbsenteesAPIView(APIView):
+    """Employees of the Administrator's company without a check-in on ?date= (default: today)."""
+
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        company = request.user.company
+        if not company:
+            return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+
+        serializer = DayQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        day = serializer.validated_data.get("date") or timezone.localdate()
+
+        absentees = AbsenceService.absentees(company, day)
+        return success_response(
+            "Absentees fetched successfully",
+            {"date": day, "count": len(absentees), "absentees": absentees},
+            status=status.HTTP_200_OK,
+        )
+
+
+class AbsenceSummaryAPIView(APIView):
+    """
+    Expected/present/absent counts per day and per employee of the
+    Administrator's company for ?from_date=&to_date= (default: this month so far).
+    """
+
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        company = request.user.company
+        if not company:
+            return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+
+        serializer = DateRangeQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        today = timezone.localdate()
+        start = serializer.validated_data.get("from_date") or month_start(today)
+        end = serializer.validated_data.get("to_date") or max(today, start)
+
+        try:
+            summary = AbsenceService.summary(company, start, end)
+        except ValueError as e:
+            return error_response(str(e), status=status.HTTP_400_BAD_REQUEST)
+        return success_response("Absence summary fetched successfully", summary, status=status.HTTP_200_OK)
+
+
 class AdminAttendanceDetailAPIView(APIView):
     """
     Allows an Administrator to retrieve details of a single employee only if the employee belongs to the same company.
@@ -101,8 +302,8 @@ class AdminAttendanceDetailAPIView(APIView):
     def get(self, request, uid):
         try:
             admin_company = request.user.company
-            attendance = Attendance.objects.select_related("user", "user__company")(
-                uid=uid, user__company=admin_company
+            attendance = Attendance.objects.select_related("user").get(
+                uid=uid, company=admin_company
             )
             serializer = AdminAttendanceListSerializer(attendance)
             return success_response(
@@ -132,4 +333,7 @@ class AllUsersListAPIView(BaseListAPIView):
     permission_classes = [IsAdmin]
     serializer_class = EmployeeDetailsSerializer
     pagination_class = CustomPagination
+    cursor_pagination_class = KeysetPagination
+    cursor_ordering = ("full_name", "uid")
+    filter_backends = [DjangoFilterBackend, UserSearchFilter, OrderingFilter]
     queryset = User.objects.select_related("company", "role").all().order_by("full_name")
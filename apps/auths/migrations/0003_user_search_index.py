@@ -0,0 +1,90 @@
+from django.db import migrations
+
+# SQLite: an FTS5 trigram table mirroring auths_user.full_name/email, kept in
+# sync by triggers so every save (and bulk/queryset write) updates it.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE auths_user_search USING fts5(
+        uid UNINDEXED, full_name, email, tokenize = 'trigram'
+    )
+    """,
+    """
+    INSERT INTO auths_user_search (uid, full_name, email)
+    SELECT uid, full_name, email FROM auths_user
+    """,
+    """
+    CREATE TRIGGER auths_user_search_insert AFTER INSERT ON auths_user BEGIN
+        INSERT INTO auths_user_search (uid, full_name, email)
+        VALUES (new.uid, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER auths_user_search_update AFTER UPDATE OF uid, full_name, email ON auths_user
+    WHEN old.uid IS NOT new.uid OR old.full_name IS NOT new.full_name OR old.email IS NOT new.email
+    BEGIN
+        DELETE FROM auths_user_search WHERE uid = old.uid;
+        INSERT INTO auths_user_search (uid, full_name, email)
+        VALUES (new.uid, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER auths_user_search_delete AFTER DELETE ON auths_user BEGIN
+        DELETE FROM auths_user_search WHERE uid = old.uid;
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS auths_user_search_delete",
+    "DROP TRIGGER IF EXISTS auths_user_search_update",
+    "DROP TRIGGER IF EXISTS auths_user_search_insert",
+    "DROP TABLE IF EXISTS auths_user_search",
+]
+
+# PostgreSQL: trigram GIN indexes on the expressions icontains compiles to
+# (UPPER(col::text) LIKE UPPER('%term%')), so the plain ORM lookups use them.
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS auths_user_full_name_trgm ON auths_user USING gin (UPPER(full_name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS auths_user_email_trgm ON auths_user USING gin (UPPER(email::text) gin_trgm_ops)",
+]
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS auths_user_email_trgm",
+    "DROP INDEX IF EXISTS auths_user_full_name_trgm",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor not in statements:
+            return
+        if vendor == "sqlite" and not fts5_trigram_available(schema_editor.connection):
+            return
+        for sql in statements[vendor]:
+            schema_editor.execute(sql)
+    return apply
+
+
+def fts5_trigram_available(connection):
+    # The trigram tokenizer needs SQLite 3.34+ built with FTS5
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize = 'trigram')")
+        except Exception:
+            return False
+        cursor.execute("DROP TABLE temp.fts5_probe")
+    return True
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auths', '0002_user_full_name_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}),
+            run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -28,6 +28,13 @@ class User(AbstractUser):
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["full_name"]
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # name-ordered user lists, including keyset pages on (full_name, uid)
+            models.Index(fields=["full_name", "uid"], name="user_full_name_idx"),
+        ]
+
     @property
     def id(self):
         return self.uid
@@ -1,5 +1,10 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.expressions import RawSQL
 from ..models import User, Role, Company
 
+# Per-alias memo of whether the SQLite FTS5 user search table exists
+_search_index_tables = {}
+
 class UserRepository:
     @staticmethod
     def get_role_by_name(role_name: str):
@@ -23,3 +28,22 @@ class UserRepository:
     @staticmethod
     def get_user_by_email(email):
         return User.objects.filter(email=email).first()
+
+    @staticmethod
+    def search_index_available(using=DEFAULT_DB_ALIAS):
+        """True when the auths_user_search FTS5 table (SQLite only) is installed"""
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return False
+        if using not in _search_index_tables:
+            _search_index_tables[using] = "auths_user_search" in connection.introspection.table_names()
+        return _search_index_tables[using]
+
+    @staticmethod
+    def match_search_index(terms):
+        """
+        Subquery of user uids whose name or email contains every term (3+
+        characters each, case-insensitive), answered by the trigram index.
+        """
+        phrase = " AND ".join('"%s"' % term.replace('"', '""') for term in terms)
+        return RawSQL("SELECT uid FROM auths_user_search WHERE auths_user_search MATCH %s", (phrase,))
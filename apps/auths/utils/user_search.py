@@ -0,0 +1,60 @@
+import operator
+from functools import reduce
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import Q
+from rest_framework.filters import SearchFilter
+from ..repositories.user_repository import UserRepository
+
+# Shortest term the trigram index can answer
+MIN_INDEXED_TERM_LENGTH = 3
+USER_SEARCH_LOOKUPS = ("full_name", "email")
+
+
+def user_search_condition(terms, prefix="", using=DEFAULT_DB_ALIAS):
+    """
+    Q matching rows whose user (reached through `prefix`, e.g. "user__") has
+    every term in their name or email.
+    """
+    if UserRepository.search_index_available(using) and all(
+        len(term) >= MIN_INDEXED_TERM_LENGTH for term in terms
+    ):
+        return Q(**{f"{prefix}uid__in": UserRepository.match_search_index(terms)})
+
+    # PostgreSQL's trigram indexes serve these icontains lookups directly;
+    # elsewhere (or for 1-2 character terms) this is the plain LIKE scan
+    return reduce(operator.and_, (
+        reduce(operator.or_, (
+            Q(**{f"{prefix}{field}__icontains": term}) for field in USER_SEARCH_LOOKUPS
+        ))
+        for term in terms
+    ))
+
+
+class UserSearchFilter(SearchFilter):
+    """
+    Drop-in SearchFilter that matches employee names and emails through the
+    user search index (SQLite FTS5 trigram table, pg_trgm indexes on
+    PostgreSQL) instead of LIKE '%term%' over a join.
+
+    Views set `user_search_field` to the path from their model to User
+    ("user" for attendance, "" for User itself). A row matches when its user's
+    name/email contains every term, or when every term matches the view's own
+    `search_fields` (e.g. uid) as SearchFilter would.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        prefix = getattr(view, "user_search_field", "")
+        prefix = f"{prefix}__" if prefix else ""
+
+        condition = user_search_condition(terms, prefix, router.db_for_read(queryset.model))
+        search_fields = self.get_search_fields(view, request)
+        if search_fields:
+            lookups = [self.construct_search(str(field), queryset) for field in search_fields]
+            condition |= reduce(operator.and_, (
+                reduce(operator.or_, (Q(**{lookup: term}) for lookup in lookups)) for term in terms
+            ))
+        return queryset.filter(condition)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='names_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
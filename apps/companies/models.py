@@ -6,6 +6,8 @@ class Company(models.Model):
     company_name = models.CharField(max_length=255)
     location = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # bumped when an employee's name changes; keys cached company reports
+    names_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.company_name
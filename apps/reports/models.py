@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import models
+from apps.auths.models import User
+from apps.companies.models import Company
+import uuid
+
+
+class ReportJob(models.Model):
+    """
+    A PDF report generated in the background. Jobs are claimed from the
+    database by the report runner of any worker, so they survive restarts;
+    the finished PDF is kept under REPORT_JOBS["STORAGE_DIR"] until
+    `manage.py cleanup_report_jobs` expires it.
+    """
+
+    TYPE_COMPANY = "company"
+    TYPE_EMPLOYEE = "employee"
+    TYPE_CHOICES = (
+        (TYPE_COMPANY, "Company"),
+        (TYPE_EMPLOYEE, "Employee"),
+    )
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    uid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="report_jobs")
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True, related_name="report_jobs")
+    # subject of employee reports
+    employee = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    report_type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    # AttendanceReportSerializer representation of the filters
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # refreshed while running; a stale heartbeat means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # runner: status = 'pending' ORDER BY created_at
+            models.Index(fields=["status", "created_at"], name="report_job_status_created_idx"),
+        ]
+
+    @property
+    def file_path(self):
+        return settings.REPORT_JOBS["STORAGE_DIR"] / f"{self.uid}.pdf"
+
+    def __str__(self):
+        return f"{self.report_type} report {self.uid} ({self.status})"
@@ -1,16 +1,59 @@
 
-from apps.attendance.models import Attendance
+from django.db.models import Count, Max, Min, Sum
+from apps.attendance.models import Attendance, AttendanceMonthlySummary
+from apps.attendance.repositories.rollup_repository import DailyRollupRepository
+from apps.companies.models import Company
 
 class AttendanceRepository:
 
     @staticmethod
     def company_attendance(company):
         return Attendance.objects.filter(
-            user__company=company
-        ).select_related("user", "user__company")
+            company=company
+        ).select_related("user")
 
     @staticmethod
     def employee_attendance(employee):
         return Attendance.objects.filter(
             user=employee
         ).select_related("user", "user__company")
+
+    @staticmethod
+    def employee_monthly_totals(employee, first_month=None, last_month=None):
+        """Report header figures summed from the employee's monthly summaries"""
+        summaries = AttendanceMonthlySummary.objects.filter(user=employee)
+        if first_month:
+            summaries = summaries.filter(month__gte=first_month)
+        if last_month:
+            summaries = summaries.filter(month__lte=last_month)
+        return summaries.aggregate(
+            total_records=Sum("days_present", default=0),
+            nfc_count=Sum("nfc_count", default=0),
+            qr_count=Sum("qr_count", default=0),
+            first_check_in=Min("first_check_in"),
+            last_check_in=Max("last_check_in"),
+        )
+
+    @staticmethod
+    def company_data_version(company, start=None, end=None):
+        """Version of the company's attendance between two dates, from the daily rollups"""
+        return DailyRollupRepository.get_version(DailyRollupRepository.get_company_days(company, start, end))
+
+    @staticmethod
+    def company_names_version(company):
+        """Version of the company's employee names, read fresh rather than from a cached instance"""
+        return Company.objects.filter(pk=company.pk).values_list("names_version", flat=True).first()
+
+    @staticmethod
+    def employee_data_version(employee, first_month=None, last_month=None):
+        """Version of the employee's attendance over a month range, from the monthly summaries"""
+        summaries = AttendanceMonthlySummary.objects.filter(user=employee)
+        if first_month:
+            summaries = summaries.filter(month__gte=first_month)
+        if last_month:
+            summaries = summaries.filter(month__lte=last_month)
+        return summaries.aggregate(
+            months=Count("id"),
+            days_present=Sum("days_present", default=0),
+            version=Sum("version", default=0),
+        )
@@ -0,0 +1,82 @@
+from django.utils import timezone
+from ..models import ReportJob
+
+# attempts at claiming a pending job before giving way to other runners
+CLAIM_ATTEMPTS = 3
+
+
+class ReportJobRepository:
+
+    @staticmethod
+    def create_job(**fields):
+        return ReportJob.objects.create(**fields)
+
+    @staticmethod
+    def get_user_job(uid, user):
+        return ReportJob.objects.get(uid=uid, requested_by=user)
+
+    @staticmethod
+    def get_user_jobs(user):
+        return ReportJob.objects.filter(requested_by=user)
+
+    @staticmethod
+    def claim_next():
+        """
+        Mark the oldest pending job as running and return it, or None. The
+        conditional UPDATE makes the claim safe between workers: only one
+        of them moves a given job out of pending.
+        """
+        pending = ReportJob.objects.filter(status=ReportJob.STATUS_PENDING)
+        for _ in range(CLAIM_ATTEMPTS):
+            uid = pending.order_by("created_at").values_list("uid", flat=True).first()
+            if uid is None:
+                return None
+            now = timezone.now()
+            claimed = pending.filter(uid=uid).update(
+                status=ReportJob.STATUS_RUNNING, progress=10, started_at=now, heartbeat_at=now
+            )
+            if claimed:
+                return ReportJob.objects.select_related("company", "employee", "employee__company").get(uid=uid)
+        return None
+
+    @staticmethod
+    def heartbeat(job, progress=None):
+        fields = {"heartbeat_at": timezone.now()}
+        if progress is not None:
+            fields["progress"] = job.progress = progress
+        ReportJob.objects.filter(uid=job.uid, status=ReportJob.STATUS_RUNNING).update(**fields)
+
+    @staticmethod
+    def finish(job, file_name, file_size):
+        ReportJob.objects.filter(uid=job.uid).update(
+            status=ReportJob.STATUS_DONE, progress=100, file_name=file_name, file_size=file_size,
+            finished_at=timezone.now(),
+        )
+
+    @staticmethod
+    def fail(job, error):
+        ReportJob.objects.filter(uid=job.uid).update(
+            status=ReportJob.STATUS_FAILED, error=error, finished_at=timezone.now()
+        )
+
+    @staticmethod
+    def release(job):
+        """Put a claimed job back in the queue, e.g. when the render pool is full"""
+        ReportJob.objects.filter(uid=job.uid).update(
+            status=ReportJob.STATUS_PENDING, progress=0, started_at=None, heartbeat_at=None
+        )
+
+    @staticmethod
+    def requeue_stale(stale_before):
+        """Requeue running jobs whose worker stopped heartbeating (crash, restart)"""
+        return ReportJob.objects.filter(
+            status=ReportJob.STATUS_RUNNING, heartbeat_at__lt=stale_before
+        ).update(status=ReportJob.STATUS_PENDING, progress=0, started_at=None, heartbeat_at=None)
+
+    @staticmethod
+    def get_expired(created_before):
+        return ReportJob.objects.filter(created_at__lt=created_before).exclude(status=ReportJob.STATUS_RUNNING)
+
+    @staticmethod
+    def existing_uids(uids):
+        return {str(uid) for uid in ReportJob.objects.filter(uid__in=uids).values_list("uid", flat=True)}
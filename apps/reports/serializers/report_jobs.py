@@ -0,0 +1,45 @@
+from django.urls import reverse
+from rest_framework import serializers
+from ..models import ReportJob
+from .reports import AttendanceReportSerializer
+
+
+class ReportJobCreateSerializer(AttendanceReportSerializer):
+    """Report filters plus what to report on: the company, an employee (by `employee`) or the caller"""
+    REPORT_CHOICES = ("company", "employee", "my")
+
+    report_type = serializers.ChoiceField(choices=REPORT_CHOICES)
+    employee = serializers.UUIDField(required=False)
+
+    def validate(self, data):
+        data = super().validate(data)
+        if data["report_type"] == "employee" and not data.get("employee"):
+            raise serializers.ValidationError("employee is required for employee reports.")
+        return data
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            "uid",
+            "report_type",
+            "filters",
+            "status",
+            "progress",
+            "error",
+            "file_size",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "download_url",
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != ReportJob.STATUS_DONE:
+            return None
+        path = reverse("report-job-download", args=[obj.uid])
+        request = self.context.get("request")
+        return request.build_absolute_uri(path) if request else path
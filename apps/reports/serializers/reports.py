@@ -1,10 +1,16 @@
+from django.conf import settings
 from rest_framework import serializers
 
+RENDERERS = ("html", "fast")
+
 class AttendanceReportSerializer(serializers.Serializer):
     """Serializer for PDF report generation parameters"""
     start_date = serializers.DateField(required=False)
     end_date = serializers.DateField(required=False)
     employee_id = serializers.UUIDField(required=False)
+    include_absences = serializers.BooleanField(required=False, default=False)
+    # "fast" draws the table directly instead of laying out the HTML template
+    renderer = serializers.ChoiceField(choices=RENDERERS, required=False, default="html")
     
     def validate(self, data):
         """Validate date range"""
@@ -16,5 +22,15 @@ class AttendanceReportSerializer(serializers.Serializer):
                 raise serializers.ValidationError(
                     "Start date cannot be greater than end date."
                 )
+
+        if data.get('include_absences'):
+            if not (start_date and end_date):
+                raise serializers.ValidationError(
+                    "include_absences requires start_date and end_date."
+                )
+            if (end_date - start_date).days + 1 > settings.ATTENDANCE_ABSENCE_MAX_DAYS:
+                raise serializers.ValidationError(
+                    f"Absences can be included for at most {settings.ATTENDANCE_ABSENCE_MAX_DAYS} days."
+                )
         
         return data
\ No newline at end of file
@@ -1,6 +1,13 @@
+from datetime import date, timedelta
+from django.conf import settings
 from apps.auths.models import User
+from apps.attendance.services.absence_service import AbsenceService
+from apps.attendance.utils.dates import month_start
 from ..repositories.attendance_repository import AttendanceRepository
+from ..serializers.reports import AttendanceReportSerializer
+from ..utils.pdf_engines import get_engine_selector
 from ..utils.pdf_generator import AttendancePDFGenerator
+from ..utils.report_cache import ReportCache, get_report_cache
 
 
 class AttendanceReportService:
@@ -13,27 +20,110 @@ class AttendanceReportService:
             queryset = queryset.filter(date__lte=filters["end_date"])
 
         if filters.get("employee_id"):
-            queryset = queryset.filter(user__uid=filters["employee_id"])
+            queryset = queryset.filter(user_id=filters["employee_id"])
 
         return queryset.order_by("-date", "-created_at")
 
     @staticmethod
-    def generate_company_pdf(company, filters):
+    def generate_company_pdf(company, filters, target, render_timeout=None):
         queryset = AttendanceRepository.company_attendance(company)
         queryset = AttendanceReportService.apply_filters(queryset, filters)
+        absences = None
+        if filters.get("include_absences"):
+            absences = AbsenceService.summary(company, filters["start_date"], filters["end_date"])
         return AttendancePDFGenerator.generate_report(
-            attendances=queryset, company=company, filters=filters
+            attendances=queryset, company=company, target=target, filters=filters, absences=absences,
+            render_timeout=render_timeout, renderer=filters.get("renderer", "html"),
         )
 
     @staticmethod
-    def generate_employee_pdf(employee, filters):
+    def employee_totals(employee, filters):
+        """
+        Header figures from the monthly summaries when the period is made of
+        whole months (or unbounded); None when the rows have to be counted.
+        """
+        start, end = filters.get("start_date"), filters.get("end_date")
+        if filters.get("employee_id") and filters["employee_id"] != employee.uid:
+            return None
+        if start and start.day != 1:
+            return None
+        if end and (end + timedelta(days=1)).day != 1:
+            return None
+        return AttendanceRepository.employee_monthly_totals(
+            employee,
+            first_month=start,
+            last_month=end.replace(day=1) if end else None,
+        )
+
+    @staticmethod
+    def generate_employee_pdf(employee, filters, target, render_timeout=None):
         queryset = AttendanceRepository.employee_attendance(employee)
         queryset = AttendanceReportService.apply_filters(queryset, filters)
 
         return AttendancePDFGenerator.generate_employee_report(
-            attendances=queryset, employee=employee, filters=filters
+            attendances=queryset,
+            employee=employee,
+            target=target,
+            filters=filters,
+            totals=AttendanceReportService.employee_totals(employee, filters),
+            render_timeout=render_timeout,
+            renderer=filters.get("renderer", "html"),
         )
 
     @staticmethod
     def get_employee(employee_id, company):
-        return User.objects.get(uid=employee_id, company=company)
+        return User.objects.select_related("company").get(uid=employee_id, company=company)
+
+    @staticmethod
+    def report_key(report_type, subject, filters):
+        """
+        Cache key of a company or employee report: the subject, normalized
+        filters, the version of the attendance in scope (and of employee
+        names for company reports) and today's date, which the report
+        prints. None when the report is not cached (cache disabled, or
+        absences, which depend on the workforce rather than attendance).
+        """
+        if get_report_cache() is None or filters.get("include_absences"):
+            return None
+        start, end = filters.get("start_date"), filters.get("end_date")
+        if report_type == "company":
+            labels = (subject.company_name, subject.location)
+            version = {
+                **AttendanceRepository.company_data_version(subject, start, end),
+                "names": AttendanceRepository.company_names_version(subject),
+            }
+        else:
+            company = subject.company
+            labels = (subject.full_name, company.company_name if company else None, company.location if company else None)
+            version = AttendanceRepository.employee_data_version(
+                subject,
+                first_month=month_start(start) if start else None,
+                last_month=month_start(end) if end else None,
+            )
+        return ReportCache.make_key(
+            report_type=report_type,
+            subject=subject.pk,
+            labels=labels,
+            filters=AttendanceReportSerializer(filters).data,
+            data_version=version,
+            # as printed by AttendancePDFGenerator
+            report_date=date.today(),
+            format=settings.REPORT_CACHE["FORMAT_VERSION"],
+        )
+
+    @staticmethod
+    def cached_pdf(key, generate):
+        """
+        The cached PDF of `key` opened for reading; on a miss `generate(path)`
+        renders it into the cache.
+        """
+        cache = get_report_cache()
+        handle = cache.open(key)
+        if handle is None:
+            handle = cache.put(key, generate)
+        return handle
+
+    @staticmethod
+    def engine_stats():
+        """Circuit state and timings of the PDF engines as seen by this worker"""
+        return get_engine_selector().stats()
@@ -0,0 +1,155 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.utils import timezone
+from ..models import ReportJob
+from ..repositories.report_job_repository import ReportJobRepository
+from ..serializers.reports import AttendanceReportSerializer
+from ..utils.pdf_files import remove_stale_temp_files
+from ..utils.render_pool import PDFRenderBusy
+from ..utils.report_job_runner import Heartbeat, get_job_runner
+from .attendance_report_service import AttendanceReportService
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobService:
+
+    @staticmethod
+    def submit(requested_by, report_type, filters, company=None, employee=None):
+        """Queue a report; `filters` are AttendanceReportSerializer validated data"""
+        job = ReportJobRepository.create_job(
+            requested_by=requested_by,
+            report_type=report_type,
+            company=company,
+            employee=employee,
+            filters=AttendanceReportSerializer(filters).data,
+        )
+        ReportJobService.wake_runner()
+        return job
+
+    @staticmethod
+    def wake_runner():
+        if settings.REPORT_JOBS["IN_PROCESS_RUNNER"]:
+            get_job_runner(ReportJobService.process_next, ReportJobService.cleanup).notify()
+
+    @staticmethod
+    def get_job(uid, user):
+        try:
+            return ReportJobRepository.get_user_job(uid, user)
+        except ReportJob.DoesNotExist:
+            raise ValueError("Report job not found")
+
+    @staticmethod
+    def get_jobs(user):
+        return ReportJobRepository.get_user_jobs(user)
+
+    @staticmethod
+    def get_file(job):
+        """Path of a finished job's PDF"""
+        if job.status != ReportJob.STATUS_DONE:
+            raise ValueError(f"Report is {job.status}")
+        if not job.file_path.exists():
+            raise FileNotFoundError("Report file has expired")
+        return job.file_path
+
+    @staticmethod
+    def file_name(job):
+        stamp = f"{timezone.localtime(job.created_at):%Y%m%d_%H%M%S}"
+        if job.report_type == ReportJob.TYPE_COMPANY:
+            return f"attendance_report_{stamp}.pdf"
+        return f"attendance_{job.employee.full_name.replace(' ', '_')}_{stamp}.pdf"
+
+    @staticmethod
+    def render(job, target):
+        serializer = AttendanceReportSerializer(data=job.filters)
+        serializer.is_valid(raise_exception=True)
+        timeout = settings.REPORT_JOBS["RENDER_TIMEOUT"]
+        if job.report_type == ReportJob.TYPE_COMPANY:
+            return AttendanceReportService.generate_company_pdf(
+                job.company, serializer.validated_data, target, render_timeout=timeout
+            )
+        return AttendanceReportService.generate_employee_pdf(
+            job.employee, serializer.validated_data, target, render_timeout=timeout
+        )
+
+    @staticmethod
+    def run(job):
+        """
+        Generate a claimed job's PDF next to its final name and rename it
+        into place (readers never see partial files), recording the outcome
+        on the job. Returns False when the job was put back in the queue.
+        """
+        path = job.file_path
+        partial = path.with_suffix(".part")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with Heartbeat(lambda: ReportJobRepository.heartbeat(job), settings.REPORT_JOBS["HEARTBEAT_INTERVAL"]):
+                ReportJobService.render(job, partial)
+            ReportJobRepository.heartbeat(job, progress=90)
+            os.replace(partial, path)
+            size = path.stat().st_size
+        except PDFRenderBusy:
+            partial.unlink(missing_ok=True)
+            # the render pool is saturated by interactive reports; try again later
+            ReportJobRepository.release(job)
+            return False
+        except Exception as e:
+            partial.unlink(missing_ok=True)
+            logger.exception("Report job %s failed", job.uid)
+            ReportJobRepository.fail(job, str(e))
+            return True
+        ReportJobRepository.finish(job, ReportJobService.file_name(job), size)
+        return True
+
+    @staticmethod
+    def process_next():
+        """
+        Run the oldest pending job and return it; None when the queue is
+        empty or the job had to wait for the render pool.
+        """
+        stale_before = timezone.now() - timedelta(seconds=settings.REPORT_JOBS["STALE_AFTER"])
+        requeued = ReportJobRepository.requeue_stale(stale_before)
+        if requeued:
+            logger.warning("Requeued %s report jobs abandoned by their worker", requeued)
+        job = ReportJobRepository.claim_next()
+        if job is not None and ReportJobService.run(job):
+            return job
+        return None
+
+    @staticmethod
+    def cleanup(now=None):
+        """
+        Delete jobs older than RETENTION_HOURS with their PDFs, files in the
+        storage directory that no job refers to, and render leftovers in
+        PDF_DELIVERY["TEMP_DIR"]. Returns the number of jobs deleted.
+        """
+        now = now or timezone.now()
+        cutoff = now - timedelta(hours=settings.REPORT_JOBS["RETENTION_HOURS"])
+        expired = ReportJobRepository.get_expired(cutoff)
+        uids = list(expired.values_list("uid", flat=True))
+        for uid in uids:
+            ReportJob(uid=uid).file_path.unlink(missing_ok=True)
+        deleted, _ = expired.filter(uid__in=uids).delete()
+
+        storage = settings.REPORT_JOBS["STORAGE_DIR"]
+        if storage.is_dir():
+            files = [path for path in storage.iterdir() if path.suffix in (".pdf", ".part")]
+            known = ReportJobRepository.existing_uids([path.stem for path in files if _is_uuid(path.stem)])
+            for path in files:
+                if path.stem in known:
+                    continue
+                if datetime.fromtimestamp(path.stat().st_mtime, tz=now.tzinfo) < cutoff:
+                    path.unlink(missing_ok=True)
+        remove_stale_temp_files(settings.REPORT_JOBS["RETENTION_HOURS"] * 3600)
+        return deleted
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
@@ -1,3 +1,746 @@
-from django.test import TestCase
+import os
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from pypdf import PdfReader
+from rest_framework.test import APITestCase
+from apps.attendance.models import Attendance
+from apps.auths.models import Role, User
+from apps.companies.models import Company
+from .models import ReportJob
+from .services.attendance_report_service import AttendanceReportService
+from .services.report_job_service import ReportJobService
+from .utils.pdf_assets import report_css, sample_report_html
+from .utils.pdf_engines import ENGINES, PREPARE, EngineSelector, PDFEnginesFailed, render_with, warm_up
+from .utils.pdf_generator import AttendancePDFGenerator
+from .utils.render_pool import PDFRenderBusy, PDFRenderTimeout, PDFRenderTooLarge, RenderPool, _Job
+from .utils.report_cache import ReportCache
 
-# Write your tests here.
+
+def writes_pdf(content):
+    """side_effect for a patched _render_pdf: write `content` to the target it is given"""
+    def render(html_string, target, *args, **kwargs):
+        Path(target).write_bytes(content)
+        return target
+    return render
+
+
+def temp_dir(test):
+    """A directory removed after the test"""
+    directory = Path(tempfile.mkdtemp())
+    test.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+
+@patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf", side_effect=writes_pdf(b"%PDF"))
+class ReportQueryCountTest(TestCase):
+
+    def setUp(self):
+        """Set up a company with three employees and ten days of mixed check-ins"""
+        self.target = temp_dir(self) / "report.pdf"
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.employees = [
+            User.objects.create_user(
+                email=f"emp{i}@example.com", full_name=f"Employee {i}", password="pass", company=self.company
+            )
+            for i in range(3)
+        ]
+        self.start = date.today() - timedelta(days=9)
+        for day in range(10):
+            for i, employee in enumerate(self.employees):
+                nfc = (day + i) % 2 == 0
+                Attendance.objects.create(
+                    user=employee, code="NFC" if nfc else "QR", is_nfc=nfc, is_qr=not nfc,
+                    date=self.start + timedelta(days=day),
+                )
+
+    def rendered_html(self, render):
+        return render.call_args.args[0]
+
+    def test_company_report_runs_one_aggregate_and_one_fetch(self, render):
+        with self.assertNumQueries(2):
+            AttendanceReportService.generate_company_pdf(
+                self.company, {"start_date": self.start + timedelta(days=5)}, self.target
+            )
+        html = self.rendered_html(render)
+        self.assertEqual(html.count("<tr>") - 3, 15)  # info, stats and table header rows
+        self.assertIn('<div class="stat-number">15</div>', html)
+
+    def test_employee_report_counted_range_runs_one_aggregate_and_one_fetch(self, render):
+        employee = self.employees[0]
+        with self.assertNumQueries(2):
+            AttendanceReportService.generate_employee_pdf(
+                employee, {"start_date": self.start + timedelta(days=1)}, self.target
+            )
+        self.assertIn('<div class="stat-number">9</div>', self.rendered_html(render))
+
+    def test_employee_report_whole_months_reads_the_summary(self, render):
+        employee = self.employees[0]
+        with self.assertNumQueries(2):
+            AttendanceReportService.generate_employee_pdf(employee, {}, self.target)
+        html = self.rendered_html(render)
+        self.assertIn('<div class="stat-number">10</div>', html)
+        self.assertIn('<div class="stat-number">5</div>', html)
+
+    def test_empty_report_skips_the_row_fetch(self, render):
+        with self.assertNumQueries(1):
+            AttendanceReportService.generate_company_pdf(
+                self.company, {"start_date": date.today() + timedelta(days=1)}, self.target
+            )
+        self.assertIn("No attendance records found.", self.rendered_html(render))
+
+
+def sleep_ignoring_deadline(seconds):
+    """A render job stuck where SIGALRM cannot reach it"""
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+
+
+class RenderPoolTest(SimpleTestCase):
+
+    def make_pool(self, **options):
+        options = {"workers": 1, "max_queue": 0, "timeout": 30, "retry_after": 15, **options}
+        pool = RenderPool(**options)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_inline_without_workers(self):
+        pool = self.make_pool(workers=0)
+        self.assertEqual(pool.run(pow, 2, 10), 1024)
+        self.assertIsNone(pool._pool)
+
+    def test_runs_in_a_worker_process(self):
+        pool = self.make_pool()
+        self.assertEqual(pool.run(pow, 2, 10), 1024)
+        self.assertIsNotNone(pool._pool)
+
+    def test_start_brings_up_every_worker(self):
+        pool = self.make_pool(workers=2)
+        pool.start()
+        self.assertEqual(len(pool._pool._pool), 2)
+
+        with patch("apps.reports.utils.pdf_engines.warm_up") as warm_up:
+            self.make_pool(workers=0).start()
+        warm_up.assert_called_once()
+
+    def test_job_past_its_deadline_is_aborted(self):
+        pool = self.make_pool(timeout=1)
+        started = time.monotonic()
+        with self.assertRaises(PDFRenderTimeout):
+            pool.run(time.sleep, 30)
+        self.assertLess(time.monotonic() - started, 5)
+        # the worker survived and takes the next job
+        self.assertEqual(pool.run(pow, 3, 2), 9)
+
+    def test_deadline_starts_when_the_job_leaves_the_queue(self):
+        pool = self.make_pool(timeout=1, max_queue=3)
+        pool.start()
+        with patch("apps.reports.utils.render_pool.DEADLINE_GRACE", 0.5), ThreadPoolExecutor(4) as threads:
+            results = list(threads.map(lambda seconds: pool.run(time.sleep, seconds), [0.6] * 4))
+        self.assertEqual(results, [None] * 4)
+
+    def test_stuck_job_is_killed_without_disturbing_the_queue(self):
+        pool = self.make_pool(timeout=1, max_queue=1)
+        pool.start()
+        with patch("apps.reports.utils.render_pool.DEADLINE_GRACE", 0.5), ThreadPoolExecutor(2) as threads:
+            stuck = threads.submit(pool.run, sleep_ignoring_deadline, 30)
+            time.sleep(0.2)
+            queued = threads.submit(pool.run, pow, 2, 10)
+            with self.assertRaises(PDFRenderTimeout):
+                stuck.result(timeout=10)
+            self.assertEqual(queued.result(timeout=30), 1024)
+
+    def test_jobs_only_signal_the_pools_own_processes(self):
+        # the worker was reaped and its pid reused, here by the test process itself
+        job = _Job(0, 1, Mock(_pool=[]))
+        job.begin(os.getpid())
+        with patch("os.kill") as kill:
+            self.assertFalse(job.alive())
+            job.kill()
+        kill.assert_not_called()
+
+    def test_run_all_renders_in_parallel_and_keeps_order(self):
+        pool = self.make_pool(workers=2)
+        self.assertEqual(pool.run_all(pow, ((2, n) for n in range(6))), [1, 2, 4, 8, 16, 32])
+        self.assertEqual(self.make_pool(workers=0).run_all(pow, [(3, 2)]), [9])
+
+    def test_run_all_pulls_a_job_only_when_a_worker_is_free(self):
+        pool = self.make_pool(workers=2)
+        in_flight = []
+
+        def jobs():
+            for _ in range(6):
+                in_flight.append(len(pool._jobs))
+                yield (0.1,)
+
+        self.assertEqual(pool.run_all(time.sleep, jobs()), [None] * 6)
+        self.assertEqual(max(in_flight), 1)
+
+    def test_job_past_its_memory_limit_fails(self):
+        pool = self.make_pool()
+        with self.assertRaises(PDFRenderTooLarge):
+            pool.run(bytearray, 4 * 1024 ** 3, memory_limit_mb=1024)
+        self.assertEqual(pool.run(pow, 3, 2), 9)
+
+    def test_refuses_when_workers_and_queue_are_full(self):
+        pool = self.make_pool(max_queue=1)
+        pool._slots.acquire()
+        pool._slots.acquire()
+        with self.assertRaises(PDFRenderBusy) as busy:
+            pool.run(pow, 2, 10)
+        self.assertEqual(busy.exception.retry_after, 15)
+
+
+class ReportBackPressureTest(APITestCase):
+
+    def setUp(self):
+        role = Role.objects.create(role_name="Administrator")
+        company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=company
+        )
+        self.client.force_authenticate(admin)
+
+    def test_busy_pool_answers_503_with_retry_after(self):
+        with patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf", side_effect=PDFRenderBusy(30)):
+            response = self.client.get("/api/v1/reports/pdf/company/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "30")
+
+    def test_timed_out_render_answers_503(self):
+        with patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf", side_effect=PDFRenderTimeout(120)):
+            response = self.client.get("/api/v1/reports/pdf/my/")
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn("Retry-After", response)
+
+
+@patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf", side_effect=writes_pdf(b"%PDF-job"))
+class ReportJobTest(APITestCase):
+
+    def setUp(self):
+        storage = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, storage, ignore_errors=True)
+        override = self.settings(REPORT_JOBS={**settings.REPORT_JOBS, "IN_PROCESS_RUNNER": False, "STORAGE_DIR": storage})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.storage = storage
+
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=self.company
+        )
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Jane Doe", password="pass",
+            role=Role.objects.create(role_name="Employee"), company=self.company,
+        )
+        self.url = "/api/v1/reports/jobs/"
+
+    def submit(self, user, **data):
+        self.client.force_authenticate(user)
+        return self.client.post(self.url, data, format="json")
+
+    def test_company_report_job_lifecycle(self, render):
+        response = self.submit(self.admin, report_type="company", start_date="2025-01-01", end_date="2025-12-31")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data["data"]["uid"]
+        self.assertEqual(response.data["data"]["status"], "pending")
+        self.assertEqual(response.data["data"]["filters"]["start_date"], "2025-01-01")
+
+        download = f"{self.url}{job_id}/download/"
+        self.assertEqual(self.client.get(download).status_code, 409)
+
+        self.assertEqual(str(ReportJobService.process_next().uid), job_id)
+        self.assertIsNone(ReportJobService.process_next())
+        filters = render.call_args.kwargs
+        self.assertEqual(filters["timeout"], settings.REPORT_JOBS["RENDER_TIMEOUT"])
+
+        response = self.client.get(f"{self.url}{job_id}/")
+        self.assertEqual(response.data["data"]["status"], "done")
+        self.assertEqual(response.data["data"]["progress"], 100)
+        self.assertEqual(response.data["data"]["file_size"], 8)
+        self.assertTrue(response.data["data"]["download_url"].endswith(download))
+
+        response = self.client.get(download)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-job")
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        self.assertEqual(len(self.client.get(self.url).data["data"]), 1)
+
+    def test_employees_queue_only_their_own_report(self, render):
+        self.assertEqual(self.submit(self.employee, report_type="company").status_code, 403)
+        response = self.submit(self.employee, report_type="my")
+        self.assertEqual(response.status_code, 202)
+        job = ReportJob.objects.get(uid=response.data["data"]["uid"])
+        self.assertEqual(job.employee, self.employee)
+        ReportJobService.process_next()
+        job.refresh_from_db()
+        self.assertTrue(job.file_name.startswith("attendance_Jane_Doe_"))
+
+        # jobs are private to whoever queued them
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get(f"{self.url}{job.uid}/").status_code, 404)
+
+    def test_employee_report_needs_an_employee_of_the_company(self, render):
+        self.assertEqual(self.submit(self.admin, report_type="employee").status_code, 400)
+        outsider = User.objects.create_user(email="out@example.com", full_name="Out", password="pass")
+        self.assertEqual(self.submit(self.admin, report_type="employee", employee=str(outsider.uid)).status_code, 404)
+        self.assertEqual(self.submit(self.admin, report_type="employee", employee=str(self.employee.uid)).status_code, 202)
+
+    def test_busy_render_pool_puts_the_job_back(self, render):
+        render.side_effect = PDFRenderBusy(30)
+        job_id = self.submit(self.admin, report_type="company").data["data"]["uid"]
+        self.assertIsNone(ReportJobService.process_next())
+        job = ReportJob.objects.get(uid=job_id)
+        self.assertEqual((job.status, job.progress, job.started_at), (ReportJob.STATUS_PENDING, 0, None))
+
+    def test_failed_render_is_recorded(self, render):
+        render.side_effect = PDFRenderTimeout(900)
+        job_id = self.submit(self.admin, report_type="company").data["data"]["uid"]
+        ReportJobService.process_next()
+        job = ReportJob.objects.get(uid=job_id)
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+        self.assertIn("900 seconds", job.error)
+        self.assertEqual(list(self.storage.iterdir()), [])
+
+    def test_jobs_abandoned_by_a_dead_worker_are_requeued(self, render):
+        job_id = self.submit(self.admin, report_type="company").data["data"]["uid"]
+        ReportJob.objects.filter(uid=job_id).update(
+            status=ReportJob.STATUS_RUNNING, heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(str(ReportJobService.process_next().uid), job_id)
+        self.assertEqual(ReportJob.objects.get(uid=job_id).status, ReportJob.STATUS_DONE)
+
+    def test_cleanup_removes_expired_jobs_and_stray_files(self, render):
+        old_id = self.submit(self.admin, report_type="company").data["data"]["uid"]
+        ReportJobService.process_next()
+        new_id = self.submit(self.admin, report_type="company").data["data"]["uid"]
+        ReportJobService.process_next()
+        ReportJob.objects.filter(uid=old_id).update(created_at=timezone.now() - timedelta(days=2))
+        stray = self.storage / "leftover.part"
+        stray.write_bytes(b"")
+        ancient = time.time() - 3 * 86400
+        os.utime(stray, (ancient, ancient))
+
+        self.assertEqual(ReportJobService.cleanup(), 1)
+        self.assertFalse(ReportJob.objects.filter(uid=old_id).exists())
+        self.assertFalse((self.storage / f"{old_id}.pdf").exists())
+        self.assertTrue((self.storage / f"{new_id}.pdf").exists())
+        self.assertFalse(stray.exists())
+
+
+class ReportCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_key_ignores_argument_order(self):
+        self.assertEqual(
+            ReportCache.make_key(a=1, filters={"x": 1, "y": 2}),
+            ReportCache.make_key(filters={"y": 2, "x": 1}, a=1),
+        )
+        self.assertNotEqual(ReportCache.make_key(a=1), ReportCache.make_key(a=2))
+
+    def test_put_then_open(self):
+        cache = ReportCache(self.directory, 1024)
+        self.assertIsNone(cache.open("k"))
+        with cache.put("k", lambda path: path.write_bytes(b"%PDF-1")) as handle:
+            self.assertEqual(handle.read(), b"%PDF-1")
+        with cache.open("k") as handle:
+            self.assertEqual(handle.read(), b"%PDF-1")
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["k.pdf"])
+
+    def test_evicts_least_recently_used(self):
+        cache = ReportCache(self.directory, 25)
+        for number, key in enumerate(("a", "b")):
+            cache.put(key, lambda path: path.write_bytes(b"x" * 10)).close()
+            os.utime(cache.path(key), (1000 + number, 1000 + number))
+        # reading "a" makes "b" the least recently used
+        cache.open("a").close()
+        cache.put("c", lambda path: path.write_bytes(b"x" * 10)).close()
+        self.assertEqual(sorted(path.stem for path in self.directory.glob("*.pdf")), ["a", "c"])
+
+    def test_failed_write_leaves_nothing_behind(self):
+        def write(path):
+            path.write_bytes(b"%PDF-half")
+            raise PDFRenderTimeout(5)
+
+        cache = ReportCache(self.directory, 1024)
+        with self.assertRaises(PDFRenderTimeout):
+            cache.put("k", write)
+        self.assertEqual(list(self.directory.iterdir()), [])
+        self.assertIsNone(cache.open("k"))
+
+
+@patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf", side_effect=writes_pdf(b"%PDF-cached"))
+class CachedReportViewTest(APITestCase):
+
+    def setUp(self):
+        self.directory = temp_dir(self)
+        self.temp = temp_dir(self)
+        override = self.settings(
+            REPORT_CACHE={**settings.REPORT_CACHE, "DIR": self.directory},
+            PDF_DELIVERY={**settings.PDF_DELIVERY, "TEMP_DIR": self.temp},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        role = Role.objects.create(role_name="Administrator")
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin", password="pass", role=role, company=self.company
+        )
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Jane Doe", password="pass", company=self.company
+        )
+        self.day = date(2025, 3, 10)
+        Attendance.objects.create(user=self.employee, code="NFC", is_nfc=True, date=self.day)
+        self.client.force_authenticate(self.admin)
+        self.march = {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+
+    def get(self, url, params=None, headers=None):
+        response = self.client.get(url, params or self.march, headers=headers)
+        if response.status_code == 200:
+            self.assertEqual(b"".join(response.streaming_content), b"%PDF-cached")
+        return response
+
+    def test_repeated_download_is_served_from_cache(self, render):
+        first = self.get("/api/v1/reports/pdf/company/")
+        second = self.get("/api/v1/reports/pdf/company/")
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("attachment", second["Content-Disposition"])
+
+        # the same filters spelled differently share the entry
+        self.get("/api/v1/reports/pdf/company/", {"end_date": "2025-03-31", "start_date": "2025-03-01", "include_absences": "false"})
+        self.assertEqual(render.call_count, 1)
+
+    def test_renderer_is_part_of_the_key(self, render):
+        html = self.get("/api/v1/reports/pdf/company/")["ETag"]
+        with patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_tabular",
+                   side_effect=lambda context, attendances, target, *args: target.write_bytes(b"%PDF-cached")) as tabular:
+            fast = self.get("/api/v1/reports/pdf/company/", {**self.march, "renderer": "fast"})["ETag"]
+            self.get("/api/v1/reports/pdf/company/", {**self.march, "renderer": "fast"})
+        self.assertNotEqual(html, fast)
+        self.assertEqual((render.call_count, tabular.call_count), (1, 1))
+
+    def test_if_none_match_answers_304_without_rendering(self, render):
+        etag = self.get("/api/v1/reports/pdf/company/")["ETag"]
+        response = self.get("/api/v1/reports/pdf/company/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(render.call_count, 1)
+
+    def test_attendance_changes_in_scope_change_the_version(self, render):
+        etag = self.get("/api/v1/reports/pdf/company/")["ETag"]
+
+        # outside the range: still cached
+        Attendance.objects.create(user=self.admin, code="QR", is_qr=True, date=date(2025, 4, 2))
+        self.assertEqual(self.get("/api/v1/reports/pdf/company/")["ETag"], etag)
+        self.assertEqual(render.call_count, 1)
+
+        attendance = Attendance.objects.get(user=self.employee, date=self.day)
+        attendance.code = "QR"
+        attendance.save()
+        changed = self.get("/api/v1/reports/pdf/company/")["ETag"]
+        self.assertNotEqual(changed, etag)
+        self.assertEqual(render.call_count, 2)
+
+        attendance.delete()
+        self.assertNotEqual(self.get("/api/v1/reports/pdf/company/")["ETag"], changed)
+        self.assertEqual(render.call_count, 3)
+
+    def test_employee_reports_follow_their_own_attendance(self, render):
+        url = f"/api/v1/reports/pdf/employee/{self.employee.uid}/"
+        etag = self.get(url)["ETag"]
+        Attendance.objects.create(user=self.admin, code="QR", is_qr=True, date=self.day)
+        self.assertEqual(self.get(url)["ETag"], etag)
+        Attendance.objects.create(user=self.employee, code="QR", is_qr=True, date=self.day + timedelta(days=1))
+        self.assertNotEqual(self.get(url)["ETag"], etag)
+        self.assertEqual(render.call_count, 2)
+
+        # the caller's own report is a different subject
+        self.get("/api/v1/reports/pdf/my/")
+        self.assertEqual(render.call_count, 3)
+
+    def test_moving_a_check_in_out_of_range_changes_the_version(self, render):
+        url = f"/api/v1/reports/pdf/employee/{self.employee.uid}/"
+        company, employee = self.get("/api/v1/reports/pdf/company/")["ETag"], self.get(url)["ETag"]
+        attendance = Attendance.objects.get(user=self.employee, date=self.day)
+        attendance.date = date(2025, 4, 2)
+        attendance.save()
+        self.assertNotEqual(self.get("/api/v1/reports/pdf/company/")["ETag"], company)
+        self.assertNotEqual(self.get(url)["ETag"], employee)
+        self.assertEqual(render.call_count, 4)
+
+    def test_employee_renames_change_company_reports(self, render):
+        etag = self.get("/api/v1/reports/pdf/company/")["ETag"]
+        self.employee.save(update_fields=["last_login"])
+        self.assertEqual(self.get("/api/v1/reports/pdf/company/")["ETag"], etag)
+        self.employee.full_name = "Jane Smith"
+        self.employee.save()
+        self.assertNotEqual(self.get("/api/v1/reports/pdf/company/")["ETag"], etag)
+        self.assertEqual(render.call_count, 2)
+
+    def test_reports_are_not_served_past_the_day_they_print(self, render):
+        etag = self.get("/api/v1/reports/pdf/company/")["ETag"]
+        with patch("apps.reports.services.attendance_report_service.date") as today:
+            today.today.return_value = date.today() + timedelta(days=1)
+            self.assertNotEqual(self.get("/api/v1/reports/pdf/company/")["ETag"], etag)
+        self.assertEqual(render.call_count, 2)
+
+    def test_absence_reports_are_not_cached(self, render):
+        params = {**self.march, "include_absences": "true"}
+        self.client.get("/api/v1/reports/pdf/company/", params)
+        response = self.client.get("/api/v1/reports/pdf/company/", params)
+        self.assertEqual(render.call_count, 2)
+        self.assertNotIn("ETag", response)
+
+    def test_uncached_reports_stream_from_a_file_that_is_already_gone(self, render):
+        response = self.get("/api/v1/reports/pdf/company/", {**self.march, "include_absences": "true"})
+        self.assertEqual(response["Content-Length"], str(len(b"%PDF-cached")))
+        self.assertEqual(list(self.temp.iterdir()), [])
+
+    def test_front_proxy_downloads_keep_employee_names_in_the_filename(self, render):
+        delivery = {
+            **settings.PDF_DELIVERY, "TEMP_DIR": self.temp,
+            "SENDFILE": "x-accel-redirect", "ACCEL_LOCATIONS": {self.directory: "/protected/report_cache/"},
+        }
+        url = f"/api/v1/reports/pdf/employee/{self.employee.uid}/"
+        with self.settings(PDF_DELIVERY=delivery):
+            for name, expected in (
+                ("রহিম উদ্দিন", "filename*=utf-8''attendance_%E0%A6%B0"),
+                ('Jane O"Brien', 'O\\"Brien'),
+            ):
+                self.employee.full_name = name
+                self.employee.save()
+                disposition = self.client.get(url, self.march)["Content-Disposition"]
+                self.assertTrue(disposition.startswith("attachment; filename"), disposition)
+                self.assertIn(expected, disposition)
+
+    def test_pdf_downloads_are_not_gzipped(self, render):
+        response = self.get("/api/v1/reports/pdf/company/", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Content-Length"], str(len(b"%PDF-cached")))
+
+    def test_front_proxy_sends_cached_files(self, render):
+        delivery = {
+            **settings.PDF_DELIVERY, "TEMP_DIR": self.temp,
+            "SENDFILE": "x-accel-redirect", "ACCEL_LOCATIONS": {self.directory: "/protected/report_cache/"},
+        }
+        with self.settings(PDF_DELIVERY=delivery):
+            response = self.client.get("/api/v1/reports/pdf/company/", self.march)
+            key = response["ETag"].strip('"')
+            self.assertEqual(response["X-Accel-Redirect"], f"/protected/report_cache/{key}.pdf")
+            self.assertEqual(response["Content-Length"], str(len(b"%PDF-cached")))
+            self.assertIn("attachment", response["Content-Disposition"])
+            self.assertEqual(response.content, b"")
+
+            # a temporary file has no lasting location to hand over
+            response = self.get("/api/v1/reports/pdf/company/", {**self.march, "include_absences": "true"})
+            self.assertNotIn("X-Accel-Redirect", response)
+
+        with self.settings(PDF_DELIVERY={**delivery, "SENDFILE": "x-sendfile"}):
+            response = self.client.get("/api/v1/reports/pdf/company/", self.march)
+        self.assertEqual(response["X-Sendfile"], str((self.directory / f"{key}.pdf").resolve()))
+        self.assertEqual(render.call_count, 2)
+
+
+def blank_pdf(html_string, target, engines=None):
+    from reportlab.pdfgen import canvas
+    pdf = canvas.Canvas(str(target))
+    pdf.drawString(100, 700, "chunk")
+    pdf.showPage()
+    pdf.save()
+    return [("xhtml2pdf", True, 0.01, None)]
+
+
+class ChunkedReportTest(TestCase):
+
+    def setUp(self):
+        self.target = temp_dir(self) / "report.pdf"
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        start = date(2025, 1, 1)
+        for i in range(5):
+            employee = User.objects.create_user(
+                email=f"emp{i}@example.com", full_name=f"Employee {i}", password="pass", company=self.company
+            )
+            for day in range(5):
+                Attendance.objects.create(user=employee, code="NFC", is_nfc=True, date=start + timedelta(days=day))
+
+    @patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf_from_html", side_effect=blank_pdf)
+    def test_large_report_is_rendered_in_chunks_and_joined(self, render):
+        temp = temp_dir(self)
+        with self.settings(PDF_RENDERING={**settings.PDF_RENDERING, "WORKERS": 0, "CHUNK_ROWS": 10},
+                           PDF_DELIVERY={**settings.PDF_DELIVERY, "TEMP_DIR": temp}):
+            AttendanceReportService.generate_company_pdf(self.company, {}, self.target)
+
+        chunks = [call.args[0] for call in render.call_args_list]
+        self.assertEqual(len(chunks), 3)
+        self.assertIn('class="stat-number"', chunks[0])
+        self.assertNotIn('class="stat-number"', chunks[1])
+        self.assertNotIn("Generated on", chunks[1])
+        self.assertIn("Generated on", chunks[2])
+        # rows are numbered across chunks
+        self.assertIn("<td>11</td>", chunks[1])
+        self.assertIn("<td>25</td>", chunks[2])
+
+        pages = PdfReader(self.target).pages
+        self.assertEqual(len(pages), 3)
+        self.assertIn("Page 3 of 3", pages[2].extract_text())
+        # the chunk files are gone once joined
+        self.assertEqual(list(temp.iterdir()), [])
+
+    @patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf", side_effect=writes_pdf(b"%PDF"))
+    def test_small_report_is_rendered_in_one_piece(self, render):
+        with self.settings(PDF_RENDERING={**settings.PDF_RENDERING, "CHUNK_ROWS": 25}):
+            AttendanceReportService.generate_company_pdf(self.company, {}, self.target)
+        self.assertEqual(self.target.read_bytes(), b"%PDF")
+        self.assertEqual(render.call_count, 1)
+
+
+def broken_engine(html_string, target):
+    raise OSError("cannot load library 'libpango-1.0-0'")
+
+
+def fake_engine(html_string, target):
+    Path(target).write_bytes(b"%PDF-" + html_string.encode())
+
+
+class PDFEngineTest(SimpleTestCase):
+
+    def setUp(self):
+        engines = patch.dict(ENGINES, {"broken": broken_engine, "fake": fake_engine})
+        engines.start()
+        self.addCleanup(engines.stop)
+        self.target = temp_dir(self) / "report.pdf"
+
+    def make_selector(self, cooldown=300, **preference):
+        return EngineSelector({"default": ["broken", "fake"], **preference}, threshold=1, cooldown=cooldown)
+
+    def test_render_with_falls_back_and_reports_attempts(self):
+        attempts = render_with(["broken", "fake"], "x", self.target)
+        self.assertEqual(self.target.read_bytes(), b"%PDF-x")
+        self.assertEqual([(name, ok) for name, ok, _, _ in attempts], [("broken", False), ("fake", True)])
+        self.assertIn("libpango", attempts[0][3])
+
+        with self.assertRaises(PDFEnginesFailed) as failed:
+            render_with(["broken"], "x", self.target)
+        self.assertIn("broken error", str(failed.exception))
+        self.assertEqual(len(failed.exception.attempts), 1)
+
+    def test_render_limits_are_not_engine_failures(self):
+        with patch.dict(ENGINES, {"slow": Mock(side_effect=PDFRenderTimeout(5))}):
+            with self.assertRaises(PDFRenderTimeout):
+                render_with(["slow", "fake"], "x", self.target)
+
+    def test_failed_engine_is_skipped_until_cooldown(self):
+        selector = self.make_selector()
+        attempts = render_with(selector.order(), "x", self.target)
+        selector.record(attempts)
+        self.assertEqual(selector.order(), ["fake"])
+        stats = selector.stats()
+        self.assertEqual(stats["broken"]["circuit"], "open")
+        self.assertEqual(stats["broken"]["skipped"], 1)
+        self.assertEqual(stats["fake"]["renders"], 1)
+
+        selector.health["broken"].opened_at -= 300
+        self.assertEqual(selector.order(), ["broken", "fake"])
+        selector.record([("broken", True, 0.1, None)])
+        self.assertEqual(selector.stats()["broken"]["circuit"], "closed")
+
+    def test_all_open_circuits_still_try_every_engine(self):
+        selector = self.make_selector()
+        selector.record([("broken", False, 0.1, "down"), ("fake", False, 0.1, "down")])
+        self.assertEqual(selector.order(), ["broken", "fake"])
+
+    def test_preference_per_report_type(self):
+        selector = self.make_selector(company=["fake"])
+        self.assertEqual(selector.order("company"), ["fake"])
+        self.assertEqual(selector.order("employee"), ["broken", "fake"])
+
+    def test_warm_up_prepares_and_times_each_engine(self):
+        prepare = Mock()
+        with patch.dict(PREPARE, {"fake": prepare}):
+            timings = warm_up(["broken", "fake"])
+        prepare.assert_called_once()
+        self.assertIn("libpango", timings["broken"]["error"])
+        self.assertEqual(set(timings["fake"]), {"prepare_ms", "first_render_ms"})
+
+    def test_stylesheet_is_applied_by_the_engine_not_the_template(self):
+        self.assertIn("@page", report_css())
+        html = sample_report_html(3)
+        self.assertNotIn("<style", html)
+        self.assertIn("Employee 2", html)
+
+    def test_report_renders_remember_a_broken_engine(self):
+        calls = Mock(side_effect=broken_engine)
+        engines = {"default": ["broken", "fake"]}
+        with patch.dict(ENGINES, {"broken": calls}), \
+                self.settings(PDF_ENGINES={**settings.PDF_ENGINES, "PREFERENCE": engines}):
+            AttendancePDFGenerator._render_pdf("a", self.target)
+            self.assertEqual(self.target.read_bytes(), b"%PDF-a")
+            AttendancePDFGenerator._render_pdf("b", self.target)
+            self.assertEqual(self.target.read_bytes(), b"%PDF-b")
+        self.assertEqual(calls.call_count, 1)
+
+
+class TabularReportTest(TestCase):
+
+    def setUp(self):
+        self.target = temp_dir(self) / "report.pdf"
+        self.company = Company.objects.create(company_name="Test Company", location="Dhaka")
+        self.employee = User.objects.create_user(
+            email="emp@example.com", full_name="Jane Doe", password="pass", company=self.company
+        )
+        start = date(2025, 1, 1)
+        for day in range(60):
+            nfc = day % 2 == 0
+            Attendance.objects.create(
+                user=self.employee, code="NFC" if nfc else "QR", is_nfc=nfc, is_qr=not nfc,
+                date=start + timedelta(days=day),
+            )
+
+    def test_fast_renderer_draws_the_report_without_html(self):
+        with patch("apps.reports.utils.pdf_generator.AttendancePDFGenerator._render_pdf") as html, \
+                self.assertNumQueries(2):
+            AttendanceReportService.generate_company_pdf(self.company, {"renderer": "fast"}, self.target)
+        html.assert_not_called()
+
+        pages = PdfReader(self.target).pages
+        self.assertGreater(len(pages), 1)
+        first, last = pages[0].extract_text(), pages[-1].extract_text()
+        self.assertIn("Test Company", first)
+        self.assertIn("Total Records", first)
+        self.assertIn("Jane Doe", first)
+        self.assertIn(f"ID: {str(self.employee.uid)[-8:].upper()}", first)
+        self.assertIn("2025-03-01", first)  # newest first
+        self.assertIn("60", last)
+        self.assertIn("Generated on", last)
+        self.assertIn(f"Page {len(pages)} of", last)
+
+    def test_fast_employee_report(self):
+        AttendanceReportService.generate_employee_pdf(
+            self.employee, {"start_date": date(2025, 1, 1), "end_date": date(2025, 1, 31), "renderer": "fast"},
+            self.target,
+        )
+        text = PdfReader(self.target).pages[0].extract_text()
+        self.assertIn("First / Last Check-in", text)
+        self.assertIn("January 31, 2025", text)
+        self.assertNotIn("2025-02-01", text)
+
+    def test_empty_report(self):
+        AttendanceReportService.generate_company_pdf(
+            self.company, {"start_date": date(2030, 1, 1), "renderer": "fast"}, self.target
+        )
+        self.assertIn("No attendance records found.", PdfReader(self.target).pages[0].extract_text())
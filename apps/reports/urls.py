@@ -3,10 +3,18 @@ from .views import (
     CompanyAttendancePDFView,
     EmployeeAttendancePDFView,
     MyAttendancePDFView,
+    PDFEngineStatsAPIView,
+    ReportJobDetailAPIView,
+    ReportJobDownloadAPIView,
+    ReportJobListCreateAPIView,
 )
 
 urlpatterns = [
     path("pdf/company/", CompanyAttendancePDFView.as_view()),
     path("pdf/employee/<uuid:employee_id>/", EmployeeAttendancePDFView.as_view()),
     path("pdf/my/", MyAttendancePDFView.as_view()),
+    path("engines/stats/", PDFEngineStatsAPIView.as_view(), name="pdf-engine-stats"),
+    path("jobs/", ReportJobListCreateAPIView.as_view(), name="report-job-list"),
+    path("jobs/<uuid:job_id>/", ReportJobDetailAPIView.as_view(), name="report-job-detail"),
+    path("jobs/<uuid:job_id>/download/", ReportJobDownloadAPIView.as_view(), name="report-job-download"),
 ]
@@ -0,0 +1,118 @@
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+REPORT_TEMPLATE = 'attendances/attendance_report.html'
+# applied by the engines rather than linked from the template, so each
+# render process parses it once instead of on every report
+REPORT_STYLESHEET = 'attendances/attendance_report.css'
+# bytes of fetched assets (fonts, images) a render process keeps in memory
+ASSET_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+WeasyPrintAssets = namedtuple('WeasyPrintAssets', 'font_config stylesheet url_fetcher image_cache')
+
+_lock = threading.Lock()
+_report_css = None
+_xhtml2pdf_css = None
+_weasyprint = None
+
+
+def report_css():
+    """Text of the report stylesheet"""
+    global _report_css
+    if _report_css is None:
+        _report_css = render_to_string(REPORT_STYLESHEET)
+    return _report_css
+
+
+def _caching_url_fetcher(max_bytes):
+    from weasyprint.urls import URLFetcher, URLFetcherResponse
+
+    class CachingURLFetcher(URLFetcher):
+        """Keeps fetched fonts and images in memory for the life of the process"""
+
+        def __init__(self):
+            super().__init__()
+            self.assets = {}
+            self.size = 0
+
+        def fetch(self, url, headers=None):
+            if url not in self.assets:
+                response = super().fetch(url, headers)
+                try:
+                    body = response.read()
+                finally:
+                    response.close()
+                asset = (response.url, body, response.headers, response.status)
+                if self.size + len(body) > max_bytes:
+                    return URLFetcherResponse(*asset)
+                self.assets[url] = asset
+                self.size += len(body)
+            return URLFetcherResponse(*self.assets[url])
+
+    return CachingURLFetcher()
+
+
+def weasyprint_assets():
+    """
+    WeasyPrint's font configuration, the parsed report stylesheet, a caching
+    URL fetcher and an image cache, built on first use and shared by every
+    render in this process.
+    """
+    global _weasyprint
+    if _weasyprint is None:
+        with _lock:
+            if _weasyprint is None:
+                from weasyprint import CSS
+                from weasyprint.text.fonts import FontConfiguration
+                font_config = FontConfiguration()
+                url_fetcher = _caching_url_fetcher(ASSET_CACHE_MAX_BYTES)
+                stylesheet = CSS(
+                    string=report_css(), base_url=str(settings.BASE_DIR),
+                    url_fetcher=url_fetcher, font_config=font_config,
+                )
+                _weasyprint = WeasyPrintAssets(font_config, stylesheet, url_fetcher, {})
+    return _weasyprint
+
+
+def xhtml2pdf_css():
+    """xhtml2pdf's default stylesheet followed by the report's (it parses CSS on every render)"""
+    global _xhtml2pdf_css
+    if _xhtml2pdf_css is None:
+        from xhtml2pdf.default import DEFAULT_CSS
+        _xhtml2pdf_css = DEFAULT_CSS + report_css()
+    return _xhtml2pdf_css
+
+
+def sample_report_html(rows=20):
+    """The report template filled with `rows` made-up attendances, to warm up and time engines with"""
+    now = timezone.now()
+    attendances = [
+        SimpleNamespace(
+            user=SimpleNamespace(full_name=f"Employee {i % 10}", uid=f"00000000-0000-0000-0000-{i % 10:012d}"),
+            code='NFC' if i % 3 else 'QR',
+            date=date.today() - timedelta(days=i % 30),
+            created_at=now,
+        )
+        for i in range(rows)
+    ]
+    return render_to_string(REPORT_TEMPLATE, {
+        'company_name': "Sample Company",
+        'location': "Dhaka",
+        'report_date': datetime.now().strftime('%B %d, %Y'),
+        'generated_at': datetime.now().strftime('%B %d, %Y at %H:%M'),
+        'total_records': rows,
+        'nfc_count': rows - len(range(0, rows, 3)),
+        'qr_count': len(range(0, rows, 3)),
+        'unique_employees': min(rows, 10),
+        'date_range': None,
+        'report_type': 'company',
+        'attendances': attendances,
+        'row_offset': 0,
+        'show_header': True,
+        'show_footer': True,
+    })
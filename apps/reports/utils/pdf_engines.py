@@ -0,0 +1,240 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.signals import setting_changed
+from .pdf_assets import sample_report_html, weasyprint_assets, xhtml2pdf_css
+from .pdf_files import temp_pdf
+from .render_pool import PDFRenderTimeout, PDFRenderTooLarge
+
+logger = logging.getLogger(__name__)
+
+
+def render_weasyprint(html_string, target):
+    from weasyprint import HTML
+    assets = weasyprint_assets()
+    HTML(string=html_string, base_url=str(settings.BASE_DIR), url_fetcher=assets.url_fetcher).write_pdf(
+        str(target), stylesheets=[assets.stylesheet], font_config=assets.font_config, cache=assets.image_cache
+    )
+
+
+def render_xhtml2pdf(html_string, target):
+    from xhtml2pdf import pisa
+    with open(target, "wb") as output:
+        pdf = pisa.CreatePDF(src=html_string, dest=output, encoding="UTF-8", default_css=xhtml2pdf_css())
+    if pdf.err:
+        raise Exception("xhtml2pdf rendering error")
+
+
+# engine name -> function(html_string, target) writing the PDF to the path
+# `target`. Engines apply the report stylesheet (pdf_assets.report_css)
+# themselves.
+ENGINES = {
+    "weasyprint": render_weasyprint,
+    "xhtml2pdf": render_xhtml2pdf,
+}
+def prepare_xhtml2pdf():
+    from xhtml2pdf import pisa  # noqa: F401 -- importing is most of its start-up
+    xhtml2pdf_css()
+
+
+# engine name -> function loading the engine and its per-process assets
+PREPARE = {
+    "weasyprint": weasyprint_assets,
+    "xhtml2pdf": prepare_xhtml2pdf,
+}
+
+
+def register_engine(name, render, prepare=None):
+    """
+    Make `render(html_string, target)` selectable as `name` in
+    PDF_ENGINES["PREFERENCE"]; `prepare()` loads what warm_up should.
+    """
+    ENGINES[name] = render
+    if prepare:
+        PREPARE[name] = prepare
+
+
+class PDFEnginesFailed(Exception):
+    """Every engine tried failed; `attempts` as returned by render_with"""
+
+    def __init__(self, attempts):
+        errors = " | ".join(f"{name} error: {error}" for name, _, _, error in attempts)
+        super().__init__(f"PDF generation failed. {errors}")
+        self.attempts = attempts
+
+    def __reduce__(self):
+        return PDFEnginesFailed, (self.attempts,)
+
+
+def render_with(names, html_string, target):
+    """
+    Lay out `html_string` into the file `target` with the first of the
+    engines `names` that works. Runs wherever rendering happens (a pool
+    process or inline) and returns the attempts, (engine, succeeded,
+    seconds, error) tuples for the caller to feed to EngineSelector.record.
+    Render limits (deadline, memory) are not engine failures and propagate
+    as they are.
+    """
+    attempts = []
+    for name in names:
+        started = time.perf_counter()
+        try:
+            ENGINES[name](html_string, target)
+        except (PDFRenderTimeout, PDFRenderTooLarge, MemoryError):
+            raise
+        except Exception as e:
+            logger.error("%s error: %s", name, e)
+            attempts.append((name, False, time.perf_counter() - started, str(e)))
+            continue
+        attempts.append((name, True, time.perf_counter() - started, None))
+        return attempts
+    raise PDFEnginesFailed(attempts)
+
+
+def warm_up(names=None):
+    """
+    Load the engines (all registered by default) with their assets and
+    render a sample report with each, so the first real report does not pay
+    for imports, font discovery and stylesheet parsing. Returns per-engine
+    timings in milliseconds, or the error of an engine that is unusable.
+    """
+    html = sample_report_html()
+    timings = {}
+    for name in names or list(ENGINES):
+        started = time.perf_counter()
+        try:
+            if name in PREPARE:
+                PREPARE[name]()
+            prepared = time.perf_counter()
+            with temp_pdf() as target:
+                ENGINES[name](html, target)
+        except Exception as e:
+            logger.warning("PDF engine %s failed to warm up: %s", name, e)
+            timings[name] = {"error": str(e)}
+            continue
+        finished = time.perf_counter()
+        timings[name] = {
+            "prepare_ms": round((prepared - started) * 1000, 1),
+            "first_render_ms": round((finished - prepared) * 1000, 1),
+        }
+        logger.info("PDF engine %s warm in %.0f ms", name, (finished - started) * 1000)
+    return timings
+
+
+class EngineHealth:
+    """
+    Circuit breaker and timings of one engine. After `threshold`
+    consecutive failures the circuit opens and the engine is skipped for
+    `cooldown` seconds; the next render then tries it again, closing the
+    circuit on success or reopening it on failure.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.renders = 0
+        self.failures = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self.last_error = None
+
+    def available(self, now):
+        return self.opened_at is None or now - self.opened_at >= self.cooldown
+
+    def record(self, succeeded, seconds, error, now):
+        self.seconds += seconds
+        if succeeded:
+            self.renders += 1
+            self.consecutive_failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.consecutive_failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning("PDF engine circuit opened after %s failures: %s", self.consecutive_failures, error)
+            self.opened_at = now
+
+    def stats(self, now):
+        attempts = self.renders + self.failures
+        return {
+            "circuit": "closed" if self.opened_at is None else ("half-open" if self.available(now) else "open"),
+            "renders": self.renders,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "avg_ms": round(self.seconds * 1000 / attempts, 1) if attempts else None,
+            "last_error": self.last_error,
+        }
+
+
+class EngineSelector:
+    """
+    Orders engines for a report type from PDF_ENGINES["PREFERENCE"], leaving
+    out those whose circuit is open, and keeps per-engine health. State is
+    per process: a broken engine costs each worker one failed attempt per
+    cool-down, not one per report.
+    """
+
+    def __init__(self, preference, threshold, cooldown):
+        self.preference = preference
+        self.health = {name: EngineHealth(threshold, cooldown) for name in ENGINES}
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def _health(self, name):
+        if name not in self.health:
+            self.health[name] = EngineHealth(self.threshold, self.cooldown)
+        return self.health[name]
+
+    def order(self, report_type=None):
+        names = self.preference.get(report_type) or self.preference["default"]
+        now = time.monotonic()
+        with self._lock:
+            available = [name for name in names if self._health(name).available(now)]
+            if not available:
+                # every circuit is open: trying beats failing outright
+                return list(names)
+            for name in names:
+                if name not in available:
+                    self._health(name).skipped += 1
+        return available
+
+    def record(self, attempts):
+        now = time.monotonic()
+        with self._lock:
+            for name, succeeded, seconds, error in attempts:
+                self._health(name).record(succeeded, seconds, error, now)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {name: health.stats(now) for name, health in self.health.items()}
+
+
+_selector = None
+_lock = threading.Lock()
+
+
+def get_engine_selector():
+    """Return this process' engine selector, configured from settings.PDF_ENGINES"""
+    global _selector
+    if _selector is None:
+        with _lock:
+            if _selector is None:
+                config = settings.PDF_ENGINES
+                _selector = EngineSelector(config["PREFERENCE"], config["FAILURE_THRESHOLD"], config["COOLDOWN"])
+    return _selector
+
+
+def _reset_engine_selector(setting, **kwargs):
+    global _selector
+    if setting == "PDF_ENGINES":
+        _selector = None
+
+
+setting_changed.connect(_reset_engine_selector)
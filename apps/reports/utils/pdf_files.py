@@ -0,0 +1,85 @@
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+
+def temp_path(suffix=".pdf"):
+    """A new, unused path in PDF_DELIVERY["TEMP_DIR"]"""
+    directory = Path(settings.PDF_DELIVERY["TEMP_DIR"])
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{uuid.uuid4().hex}{suffix}"
+
+
+@contextmanager
+def temp_pdf():
+    """Path for a PDF that exists only inside the block, whatever happens in it"""
+    path = temp_path()
+    try:
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def open_detached(path):
+    """
+    Open a PDF for reading and delete its name: the data stays readable
+    through the handle and the disk space is released when it is closed.
+    """
+    handle = open(path, "rb")
+    os.unlink(path)
+    return handle
+
+
+def remove_stale_temp_files(older_than):
+    """Delete render leftovers in TEMP_DIR last modified more than `older_than` seconds ago"""
+    directory = Path(settings.PDF_DELIVERY["TEMP_DIR"])
+    if not directory.is_dir():
+        return 0
+    cutoff = time.time() - older_than
+    removed = 0
+    for path in directory.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def _sendfile_header(path):
+    """(header, value) handing `path` to the front proxy, or None to stream it from here"""
+    mode = settings.PDF_DELIVERY["SENDFILE"]
+    if not mode:
+        return None
+    path = Path(path).resolve()
+    if mode == "x-sendfile":
+        return "X-Sendfile", str(path)
+    for directory, location in settings.PDF_DELIVERY["ACCEL_LOCATIONS"].items():
+        directory = Path(directory).resolve()
+        if path.is_relative_to(directory):
+            return "X-Accel-Redirect", location.rstrip("/") + "/" + path.relative_to(directory).as_posix()
+    return None
+
+
+def pdf_file_response(handle, filename, path=None):
+    """
+    Attachment response for an open PDF with its Content-Length. When the
+    PDF has a lasting `path` and PDF_DELIVERY["SENDFILE"] covers it, the
+    front proxy sends the file and the handle is closed here.
+    """
+    header = _sendfile_header(path) if path is not None else None
+    if header is None:
+        return FileResponse(handle, as_attachment=True, filename=filename, content_type="application/pdf")
+    size = os.fstat(handle.fileno()).st_size
+    handle.close()
+    response = HttpResponse(content_type="application/pdf")
+    response[header[0]] = header[1]
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    response["Content-Length"] = size
+    return response
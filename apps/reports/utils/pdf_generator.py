@@ -1,43 +1,173 @@
 from django.template.loader import render_to_string
-from io import BytesIO
 from datetime import datetime
-from django.http import HttpResponse
 from django.conf import settings
+from django.db.models import Count, Q
+from itertools import islice
 import logging
+from apps.attendance.models import Attendance
+from .pdf_assets import REPORT_TEMPLATE
+from .pdf_engines import ENGINES, PDFEnginesFailed, get_engine_selector, render_with
+from .pdf_files import temp_path
+from .pdf_merge import concatenate
+from .render_pool import get_render_pool
+from .tabular_pdf import ROW_FIELDS, write_tabular_report
 
 logger = logging.getLogger(__name__)
+
+# rows fetched per round trip while the template streams the attendance table
+REPORT_CHUNK_SIZE = 2000
+
+
 class AttendancePDFGenerator:
-    """Utility class for generating attendance PDF reports using WeasyPrint"""
+    """Utility class for generating attendance PDF reports with the engines of pdf_engines"""
 
     @staticmethod
-    def _render_pdf_from_html(html_string):
+    def _render_pdf_from_html(html_string, target, engines=None):
+        """
+        Runs in the render process: lay out HTML into the file `target` with
+        the first working of `engines` (all registered engines by default).
+        Returns the attempts.
+        """
+        return render_with(engines or list(ENGINES), html_string, target)
+
+    @staticmethod
+    def _render_pdf(html_string, target, timeout=None, report_type=None):
+        """Lay out the report into `target` in the render pool, off the request worker, with the healthy engines"""
+        selector = get_engine_selector()
+        engines = selector.order(report_type)
+        try:
+            attempts = get_render_pool().run(
+                AttendancePDFGenerator._render_pdf_from_html, html_string, target, engines, timeout=timeout
+            )
+        except PDFEnginesFailed as e:
+            selector.record(e.attempts)
+            raise
+        selector.record(attempts)
+        return target
+
+    @staticmethod
+    def _chunk_html(context, attendances, chunk_rows):
+        """
+        HTML of the report in segments of `chunk_rows` rows: the summary
+        header on the first, absences and footer on the last, row numbers
+        carried across.
+        """
+        rows = attendances.iterator(chunk_size=REPORT_CHUNK_SIZE)
+        chunk = list(islice(rows, chunk_rows))
+        offset = 0
+        while chunk:
+            following = list(islice(rows, chunk_rows))
+            yield render_to_string(REPORT_TEMPLATE, {
+                **context,
+                'attendances': chunk,
+                'row_offset': offset,
+                'show_header': offset == 0,
+                'show_footer': not following,
+            })
+            offset += len(chunk)
+            chunk = following
+
+    @staticmethod
+    def _render_chunked(context, attendances, chunk_rows, target):
+        """
+        Lay out segments in parallel render processes, each into its own
+        temporary file within the CHUNK_TIMEOUT / CHUNK_MEMORY_LIMIT_MB
+        limits, and join them into `target` with continuous page numbers.
+        """
+        config = settings.PDF_RENDERING
+        selector = get_engine_selector()
+        engines = selector.order(context['report_type'])
+        parts = []
+
+        def jobs():
+            for html in AttendancePDFGenerator._chunk_html(context, attendances, chunk_rows):
+                parts.append(temp_path())
+                yield html, parts[-1], engines
+
         try:
-            from weasyprint import HTML
-            pdf_buffer = BytesIO()
-            HTML(string=html_string, base_url=str(settings.BASE_DIR)).write_pdf(pdf_buffer)
-            return pdf_buffer.getvalue()
-        except Exception as weasy_error:
-            logger.error(f"WeasyPrint error: {weasy_error}")
             try:
-                from xhtml2pdf import pisa
-                pdf_buffer = BytesIO()
-                pdf = pisa.CreatePDF(src=html_string, dest=pdf_buffer, encoding="UTF-8")
-                if pdf.err:
-                    raise Exception("xhtml2pdf rendering error")
-                return pdf_buffer.getvalue()
-            except Exception as pisa_error:
-                logger.error(f"xhtml2pdf error: {pisa_error}")
-                raise Exception(
-                    f"PDF generation failed. WeasyPrint error: {weasy_error} | xhtml2pdf error: {pisa_error}"
+                results = get_render_pool().run_all(
+                    AttendancePDFGenerator._render_pdf_from_html,
+                    jobs(),
+                    timeout=config['CHUNK_TIMEOUT'],
+                    memory_limit_mb=config['CHUNK_MEMORY_LIMIT_MB'],
                 )
-                
+            except PDFEnginesFailed as e:
+                selector.record(e.attempts)
+                raise
+            for attempts in results:
+                selector.record(attempts)
+            logger.debug("Rendered report in %s chunks", len(parts))
+            concatenate(parts, target)
+        finally:
+            for part in parts:
+                part.unlink(missing_ok=True)
+        return target
+
     @staticmethod
-    def generate_report(attendances, company, filters=None):
-        """Generate PDF report for company attendance"""
-        total_records = attendances.count()
-        nfc_count = attendances.filter(code='NFC').count()
-        qr_count = attendances.filter(code='QR').count()
-        unique_employees = attendances.values('user').distinct().count()
+    def _write_tabular(context, query, target):
+        """Runs in the render process: stream the rows of an attendance query straight into a tabular PDF"""
+        attendances = Attendance.objects.all()
+        attendances.query = query
+        rows = attendances.values_list(*ROW_FIELDS).iterator(chunk_size=REPORT_CHUNK_SIZE)
+        write_tabular_report(str(target), context, rows)
+
+    @staticmethod
+    def _render_tabular(context, attendances, target, render_timeout=None):
+        """
+        The "fast" renderer: draw the report without HTML layout. The render
+        process runs the query itself (a Query pickles, a QuerySet would be
+        evaluated), so rows stream from the database instead of being copied
+        over.
+        """
+        get_render_pool().run(
+            AttendancePDFGenerator._write_tabular, context, attendances.query, target, timeout=render_timeout
+        )
+        return target
+
+    @staticmethod
+    def _render_report(context, attendances, target, render_timeout=None, renderer='html'):
+        """
+        Render the report into the file `target` with `renderer`: "fast"
+        draws it directly, "html" lays out the template, in one piece or in
+        chunks above PDF_RENDERING["CHUNK_ROWS"] rows.
+        """
+        if renderer == 'fast':
+            return AttendancePDFGenerator._render_tabular(context, attendances, target, render_timeout)
+        chunk_rows = settings.PDF_RENDERING.get('CHUNK_ROWS')
+        if chunk_rows and context['total_records'] > chunk_rows:
+            return AttendancePDFGenerator._render_chunked(context, attendances, chunk_rows, target)
+        html_string = render_to_string(REPORT_TEMPLATE, {
+            **context,
+            'attendances': attendances.iterator(chunk_size=REPORT_CHUNK_SIZE),
+            'row_offset': 0,
+            'show_header': True,
+            'show_footer': True,
+        })
+        return AttendancePDFGenerator._render_pdf(
+            html_string, target, timeout=render_timeout, report_type=context['report_type']
+        )
+
+    @staticmethod
+    def _header_totals(attendances):
+        """All header figures of a report in one conditional-aggregation query"""
+        return attendances.order_by().aggregate(
+            total_records=Count('uid'),
+            nfc_count=Count('uid', filter=Q(code='NFC')),
+            qr_count=Count('uid', filter=Q(code='QR')),
+            unique_employees=Count('user', distinct=True),
+        )
+
+    @staticmethod
+    def generate_report(attendances, company, target, filters=None, absences=None, render_timeout=None,
+                        renderer='html'):
+        """Generate PDF report for company attendance into the file `target`, and return it
+
+        `absences` is an AbsenceService.summary() to print absence totals and
+        the employees with absent days. `render_timeout` overrides the render
+        pool deadline; `renderer` is "html" or "fast" (see _render_report).
+        """
+        totals = AttendancePDFGenerator._header_totals(attendances)
 
         # date range
         date_range = None
@@ -52,30 +182,32 @@ class AttendancePDFGenerator:
                 date_range = f"Until {end_date.strftime('%B %d, %Y')}"
 
         context = {
-            'attendances': attendances,
             'company_name': company.company_name,
             'location': company.location or 'N/A',
             'report_date': datetime.now().strftime('%B %d, %Y'),
             'generated_at': datetime.now().strftime('%B %d, %Y at %H:%M'),
-            'total_records': total_records,
-            'nfc_count': nfc_count,
-            'qr_count': qr_count,
-            'unique_employees': unique_employees,
+            'total_records': totals['total_records'],
+            'nfc_count': totals['nfc_count'],
+            'qr_count': totals['qr_count'],
+            'unique_employees': totals['unique_employees'],
             'date_range': date_range,
+            'absences': absences,
             'report_type': 'company',
         }
-        print("Total employees with attendance:", unique_employees)
+        logger.debug("Total employees with attendance: %s", totals['unique_employees'])
 
-        html_string = render_to_string('attendances/attendance_report.html', context)
-        pdf_file = AttendancePDFGenerator._render_pdf_from_html(html_string)
-        return pdf_file
+        return AttendancePDFGenerator._render_report(context, attendances, target, render_timeout, renderer)
 
     @staticmethod
-    def generate_employee_report(attendances, employee, filters=None):
-        """Generate PDF report for a specific employee"""
-        total_records = attendances.count()
-        nfc_count = attendances.filter(code='NFC').count()
-        qr_count = attendances.filter(code='QR').count()
+    def generate_employee_report(attendances, employee, target, filters=None, totals=None, render_timeout=None,
+                                 renderer='html'):
+        """Generate PDF report for a specific employee into the file `target`, and return it
+
+        `totals` are precomputed header figures (from the monthly summaries);
+        without them the attendance rows are counted.
+        """
+        if totals is None:
+            totals = AttendancePDFGenerator._header_totals(attendances)
 
         # date range
         date_range = None
@@ -90,31 +222,19 @@ class AttendancePDFGenerator:
                 date_range = f"Until {end_date.strftime('%B %d, %Y')}"
 
         context = {
-            'attendances': attendances,
             'company_name': employee.company.company_name if employee.company else 'N/A',
             'location': employee.company.location if employee.company else 'N/A',
             'report_date': datetime.now().strftime('%B %d, %Y'),
             'generated_at': datetime.now().strftime('%B %d, %Y at %H:%M'),
-            'total_records': total_records,
-            'nfc_count': nfc_count,
-            'qr_count': qr_count,
+            'total_records': totals['total_records'],
+            'nfc_count': totals['nfc_count'],
+            'qr_count': totals['qr_count'],
             'unique_employees': 1,
             'date_range': date_range,
+            'first_check_in': totals.get('first_check_in'),
+            'last_check_in': totals.get('last_check_in'),
             'employee_name': employee.full_name,
             'report_type': 'employee',
         }
 
-        html_string = render_to_string('attendances/attendance_report.html', context)
-        pdf_file = AttendancePDFGenerator._render_pdf_from_html(html_string)
-        return pdf_file
-
-    @staticmethod
-    def generate_pdf_response(pdf_content, filename="attendance_report.pdf"):
-        """Create HTTP response with PDF"""
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(pdf_content)
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
-        return response
+        return AttendancePDFGenerator._render_report(context, attendances, target, render_timeout, renderer)
@@ -0,0 +1,33 @@
+from io import BytesIO
+from pypdf import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas
+
+PAGE_NUMBER_FONT = ("Helvetica", 8)
+# baseline of the page number, in points above the bottom edge (inside the 1.5cm page margin)
+PAGE_NUMBER_BOTTOM = 20
+
+
+def _page_number_overlay(sizes):
+    """A PDF with "Page i of n" centred at the bottom of pages of the given (width, height)"""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for number, (width, height) in enumerate(sizes, 1):
+        pdf.setPageSize((width, height))
+        pdf.setFont(*PAGE_NUMBER_FONT)
+        pdf.setFillGray(0.45)
+        pdf.drawCentredString(width / 2, PAGE_NUMBER_BOTTOM, f"Page {number} of {len(sizes)}")
+        pdf.showPage()
+    pdf.save()
+    buffer.seek(0)
+    return PdfReader(buffer)
+
+
+def concatenate(parts, target):
+    """Join PDF files into the file `target`, numbered continuously across the parts"""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(str(part))
+    sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in writer.pages]
+    for page, number in zip(writer.pages, _page_number_overlay(sizes).pages):
+        page.merge_page(number)
+    writer.write(str(target))
@@ -0,0 +1,334 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.signals import setting_changed
+
+logger = logging.getLogger(__name__)
+
+# extra seconds the request waits past TIMEOUT before giving up on a worker
+# that did not honour its own deadline (stuck in C code)
+DEADLINE_GRACE = 5
+# seconds between checks on a waiting job (started yet, still alive)
+WAIT_POLL = 0.5
+
+
+class PDFRenderBusy(Exception):
+    """Every render worker is busy and the queue is full: retry later"""
+
+    def __init__(self, retry_after):
+        super().__init__("Report rendering is busy, please retry shortly")
+        self.retry_after = retry_after
+
+
+class PDFRenderTimeout(Exception):
+    """A render job ran past its deadline and was aborted"""
+
+    def __init__(self, timeout):
+        super().__init__(f"Report rendering exceeded {timeout} seconds, narrow the date range")
+        self.timeout = timeout
+
+    def __reduce__(self):
+        # raised in a pool process and pickled back to the request
+        return PDFRenderTimeout, (self.timeout,)
+
+
+class PDFRenderTooLarge(Exception):
+    """A render job ran out of its memory allowance"""
+
+    def __init__(self, limit_mb):
+        super().__init__(f"Report rendering exceeded {limit_mb} MB, narrow the date range")
+        self.limit_mb = limit_mb
+
+    def __reduce__(self):
+        return PDFRenderTooLarge, (self.limit_mb,)
+
+
+def _warm_engines():
+    """Load the PDF engines and their assets ahead of the first job, with PDF_RENDERING["WARM_UP"]"""
+    if settings.PDF_RENDERING.get("WARM_UP"):
+        from .pdf_engines import warm_up
+        warm_up()
+
+
+# in a pool process: where to announce which job it picked up
+_started = None
+
+
+def _init_worker(started=None):
+    global _started
+    _started = started
+    import django
+    django.setup()
+    _warm_engines()
+
+
+def _run_job(job_id, func, args, timeout, memory_limit_mb=None):
+    """
+    Runs in a pool process: call func(*args), aborted by SIGALRM after
+    `timeout` seconds and, with `memory_limit_mb`, failing once its address
+    space grows past that many megabytes. Tells the parent first, so its
+    own deadline only starts once the job leaves the queue.
+    """
+    if _started is not None:
+        _started.put((job_id, os.getpid()))
+
+    def on_deadline(signum, frame):
+        raise PDFRenderTimeout(timeout)
+
+    previous = signal.signal(signal.SIGALRM, on_deadline)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit if hard == resource.RLIM_INFINITY else min(limit, hard), hard))
+    try:
+        return func(*args)
+    except MemoryError:
+        raise PDFRenderTooLarge(memory_limit_mb)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if memory_limit_mb:
+            resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+class _Job:
+    """A job handed to the pool, as the waiting request thread sees it"""
+
+    def __init__(self, job_id, timeout, pool):
+        self.id = job_id
+        self.timeout = timeout
+        self.pool = pool
+        self.result = None
+        self.process = None
+        self.deadline = None
+        self.started = threading.Event()
+
+    def begin(self, pid):
+        # the pool's own Process, not the raw pid: once the pool reaps a dead
+        # worker its pid can be reused by an unrelated process
+        self.process = next((process for process in list(self.pool._pool) if process.pid == pid), None)
+        self.deadline = time.monotonic() + self.timeout + DEADLINE_GRACE
+        self.started.set()
+
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def kill(self):
+        """Kill the process running this job; the pool replaces it and keeps the other jobs"""
+        if self.alive():
+            self.process.kill()
+
+
+class RenderPool:
+    """
+    Bounded process pool for CPU-bound rendering, so HTML to PDF layout runs
+    outside the request worker and cannot hold the GIL it serves check-ins
+    with.
+
+    At most `workers` jobs run at once and `max_queue` more may wait; beyond
+    that `run` refuses immediately with PDFRenderBusy instead of piling
+    requests up. Each job is aborted `timeout` seconds after it starts
+    (time spent queued does not count); a process that does not stop is
+    killed and replaced without disturbing the other jobs. With zero
+    workers jobs run inline in the calling process.
+    """
+
+    def __init__(self, workers, max_queue, timeout, retry_after, max_tasks_per_child=None, start_method="spawn"):
+        self.workers = workers
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.max_tasks_per_child = max_tasks_per_child
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._pool = None
+        self._started = None
+        self._jobs = {}
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    context = multiprocessing.get_context(self.start_method)
+                    started = context.SimpleQueue()
+                    threading.Thread(
+                        target=self._track_starts, args=(started,), name="pdf-render-starts", daemon=True
+                    ).start()
+                    self._started = started
+                    self._pool = context.Pool(
+                        processes=self.workers,
+                        initializer=_init_worker,
+                        initargs=(started,),
+                        maxtasksperchild=self.max_tasks_per_child,
+                    )
+        return self._pool
+
+    def _track_starts(self, started):
+        """Note which process picked up each job, and when, until the pool is retired"""
+        while True:
+            message = started.get()
+            if message is None:
+                return
+            job_id, pid = message
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.begin(pid)
+
+    @contextmanager
+    def _admitted(self):
+        if not self._slots.acquire(blocking=False):
+            raise PDFRenderBusy(self.retry_after)
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _submit(self, func, args, timeout, memory_limit_mb):
+        pool = self._get_pool()
+        job = _Job(next(self._job_ids), timeout, pool)
+        self._jobs[job.id] = job
+        job.result = pool.apply_async(_run_job, (job.id, func, args, timeout, memory_limit_mb))
+        return job
+
+    def _wait(self, job):
+        """
+        Result of `job`: waits as long as it is queued, then up to its
+        deadline from the moment a process picked it up.
+        """
+        try:
+            while not job.started.wait(WAIT_POLL):
+                if job.result.ready():
+                    break
+            while not job.result.ready():
+                remaining = job.deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error("Render job did not stop after %ss, killing its process", job.timeout)
+                    job.kill()
+                    raise PDFRenderTimeout(job.timeout)
+                job.result.wait(min(remaining, WAIT_POLL))
+                if not job.result.ready() and not job.alive():
+                    # a process recycled right after its last job may still be handing the result over
+                    job.result.wait(WAIT_POLL)
+                    if not job.result.ready():
+                        logger.error("Render worker died")
+                        raise BrokenProcessPool("A render process died in the middle of a job")
+            return job.result.get()
+        finally:
+            self._jobs.pop(job.id, None)
+
+    def _abandon(self, job):
+        """Stop a job whose result is no longer wanted, if it is running"""
+        self._jobs.pop(job.id, None)
+        if job.started.is_set() and not job.result.ready():
+            job.kill()
+
+    def run(self, func, *args, timeout=None, memory_limit_mb=None):
+        """
+        Run func(*args) in a pool process and return its result. `timeout`
+        overrides the pool's deadline, e.g. for background report jobs.
+        """
+        if not self.workers:
+            return func(*args)
+        timeout = timeout or self.timeout
+        with self._admitted():
+            return self._wait(self._submit(func, args, timeout, memory_limit_mb))
+
+    def run_all(self, func, arg_tuples, timeout=None, memory_limit_mb=None):
+        """
+        Run func(*args) for every tuple of `arg_tuples` in parallel and return
+        the results in order, each job with its own deadline and memory
+        limit. The batch takes a single admission slot and keeps at most
+        `workers` jobs in flight: `arg_tuples` is consumed lazily, the next
+        tuple only once an earlier job is done, so a large batch neither
+        floods the pool nor holds all its arguments in memory.
+        """
+        if not self.workers:
+            return [func(*args) for args in arg_tuples]
+        timeout = timeout or self.timeout
+        with self._admitted():
+            results = []
+            in_flight = deque()
+            arg_tuples = iter(arg_tuples)
+            try:
+                while True:
+                    if len(in_flight) == self.workers:
+                        results.append(self._wait(in_flight.popleft()))
+                    args = next(arg_tuples, None)
+                    if args is None:
+                        break
+                    in_flight.append(self._submit(func, args, timeout, memory_limit_mb))
+                while in_flight:
+                    results.append(self._wait(in_flight.popleft()))
+                return results
+            finally:
+                for job in in_flight:
+                    self._abandon(job)
+
+    def start(self):
+        """
+        Bring every render process up now instead of on the first jobs, e.g.
+        from gunicorn's post_worker_init; each warms its engines as it starts.
+        Without workers the calling process is warmed instead.
+        """
+        if not self.workers:
+            _warm_engines()
+            return
+        self.run_all(os.getpid, [()] * self.workers)
+
+    def shutdown(self):
+        """Stop taking jobs; the processes exit once the queued ones are done"""
+        with self._lock:
+            pool, started = self._pool, self._started
+            self._pool = self._started = None
+        if pool is not None:
+            pool.close()
+            threading.Thread(target=self._retire, args=(pool, started), daemon=True).start()
+
+    @staticmethod
+    def _retire(pool, started):
+        pool.join()
+        started.put(None)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Return this process' render pool, configured from settings.PDF_RENDERING"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = settings.PDF_RENDERING
+                _pool = RenderPool(
+                    workers=config["WORKERS"],
+                    max_queue=config["MAX_QUEUE"],
+                    timeout=config["TIMEOUT"],
+                    retry_after=config["RETRY_AFTER"],
+                    max_tasks_per_child=config.get("MAX_TASKS_PER_CHILD"),
+                    start_method=config.get("START_METHOD", "spawn"),
+                )
+    return _pool
+
+
+def _reset_render_pool(setting, **kwargs):
+    global _pool
+    if setting == "PDF_RENDERING" and _pool is not None:
+        with _pool_lock:
+            pool, _pool = _pool, None
+        pool.shutdown()
+
+
+setting_changed.connect(_reset_render_pool)
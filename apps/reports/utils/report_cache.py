@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from django.conf import settings
+
+
+class ReportCache:
+    """
+    Generated PDFs on disk, named by the sha256 of everything they depend
+    on, so a key can never serve stale content: a changed input is a
+    different file. Reads refresh the file's mtime and writes evict the
+    least recently used files beyond `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(**parts):
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key):
+        return self.directory / f"{key}.pdf"
+
+    def open(self, key):
+        """Open a cached PDF for reading, or None on a miss"""
+        path = self.path(key)
+        try:
+            handle = path.open("rb")
+        except FileNotFoundError:
+            return None
+        # the open handle survives a concurrent eviction
+        os.utime(path)
+        return handle
+
+    def put(self, key, write):
+        """
+        Store the PDF that `write(path)` renders into the given file under
+        `key` and return it opened for reading.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        partial = self.directory / f"{key}.{uuid.uuid4().hex}.part"
+        try:
+            write(partial)
+            os.replace(partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        handle = path.open("rb")
+        self.evict()
+        return handle
+
+    def evict(self):
+        """Delete least recently used PDFs until the cache fits in max_bytes"""
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def get_report_cache():
+    """The report cache configured in settings.REPORT_CACHE, or None when disabled"""
+    config = settings.REPORT_CACHE
+    if not config["ENABLED"]:
+        return None
+    return ReportCache(config["DIR"], config["MAX_BYTES"])
@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobRunner(threading.Thread):
+    """
+    Background thread that calls `process` to work through pending report
+    jobs. It wakes up at least every `poll_interval` seconds (jobs submitted
+    to other workers, or left over from a restart) and immediately when this
+    process submits one. `cleanup` runs every `cleanup_interval` seconds.
+    """
+
+    def __init__(self, process, cleanup, poll_interval, cleanup_interval):
+        super().__init__(name="report-job-runner", daemon=True)
+        self.process = process
+        self.cleanup = cleanup
+        self.poll_interval = poll_interval
+        self.cleanup_interval = cleanup_interval
+        self.wakeup = threading.Event()
+        self.last_cleanup = 0.0
+
+    def notify(self):
+        self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+            close_old_connections()
+            try:
+                while self.process():
+                    pass
+                if time.monotonic() - self.last_cleanup >= self.cleanup_interval:
+                    self.last_cleanup = time.monotonic()
+                    self.cleanup()
+            except Exception:
+                logger.exception("Report job runner failed")
+
+
+class Heartbeat(threading.Thread):
+    """Calls `beat` every `interval` seconds until stopped"""
+
+    def __init__(self, beat, interval):
+        super().__init__(name="report-job-heartbeat", daemon=True)
+        self.beat = beat
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    self.beat()
+                except Exception:
+                    logger.exception("Report job heartbeat failed")
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+
+_runner = None
+_lock = threading.Lock()
+
+
+def get_job_runner(process, cleanup):
+    """Return this process' report job runner, starting it on first use"""
+    global _runner
+    if _runner is None:
+        with _lock:
+            if _runner is None:
+                config = settings.REPORT_JOBS
+                _runner = ReportJobRunner(process, cleanup, config["POLL_INTERVAL"], config["CLEANUP_INTERVAL"])
+                _runner.start()
+    return _runner
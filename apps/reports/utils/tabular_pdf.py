@@ -0,0 +1,283 @@
+from reportlab.lib.colors import HexColor, white
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from django.utils import timezone
+
+# same page and palette as templates/attendances/attendance_report.html
+PAGE_SIZE = A4
+MARGIN = 1.5 * cm
+INK = HexColor("#2c3e50")
+MUTED = HexColor("#7f8c8d")
+LABEL = HexColor("#6c757d")
+RULE = HexColor("#dddddd")
+METHOD_COLORS = {"NFC": HexColor("#3498db"), "QR": HexColor("#27ae60")}
+ATTENDANCE_COLUMNS = (("#", 0.1), ("Employee", 0.4), ("Method", 0.15), ("Date & Time", 0.35))
+ABSENCE_COLUMNS = (("#", 0.1), ("Absent Employee", 0.4), ("Days Absent", 0.25), ("Days Expected", 0.25))
+HEADING_HEIGHT = 20
+ROW_HEIGHT = 28
+CELL_PADDING = 6
+# baseline of the page number, in points above the bottom edge
+PAGE_NUMBER_BOTTOM = 20
+PAGE_COUNT_FORM = "page_count"
+
+# attendance fields a row is made of, in order; see TabularReportWriter.write
+ROW_FIELDS = ("user__full_name", "user__uid", "code", "date", "created_at")
+
+
+def _short_id(uid):
+    return str(uid)[-8:].upper()
+
+
+class TabularReportWriter:
+    """
+    Draws the attendance report straight onto PDF pages with reportlab,
+    without an HTML layout pass: the same header, statistics and table as
+    the template, one row at a time. Only the page being drawn is held
+    uncompressed, so memory does not grow with the row count beyond the
+    compressed pages. "Page i of n" refers to a form filled in once the
+    number of pages is known.
+    """
+
+    def __init__(self, output, context):
+        self.context = context
+        self.pdf = canvas.Canvas(output, pagesize=PAGE_SIZE, pageCompression=1)
+        self.pdf.setTitle("Attendance Report")
+        self.width, self.height = PAGE_SIZE
+        self.content_width = self.width - 2 * MARGIN
+        self.bottom = MARGIN
+        self.pages = 0
+        self.y = None
+        # all text of a page goes into one text object, drawn when the page
+        # is finished; _state is its current font and colour
+        self._texts = None
+        self._state = None
+
+    def write(self, rows):
+        """
+        Draw the report and finish the document. `rows` are
+        (full_name, user_uid, code, date, created_at) tuples, see ROW_FIELDS.
+        """
+        self._start_page()
+        self._header()
+        columns = ATTENDANCE_COLUMNS
+        self._table_heading(columns)
+        number = 0
+        for number, (full_name, uid, code, day, created_at) in enumerate(rows, 1):
+            if self.y - ROW_HEIGHT < self.bottom:
+                self._next_page(columns)
+            self._attendance_row(number, full_name, uid, code, day, created_at)
+        if not number:
+            self.y -= 16
+            self._text(MARGIN, self.y, "No attendance records found.", size=10, color=MUTED)
+            self.y -= 8
+
+        if self.context.get("absences"):
+            self._absences(self.context["absences"])
+        self._footer()
+        self._finish_page()
+        self.pdf.beginForm(PAGE_COUNT_FORM)
+        self._text(0, 0, str(self.pages), size=8, color=MUTED)
+        self._flush_text()
+        self.pdf.endForm()
+        self.pdf.save()
+
+    # pages
+
+    def _start_page(self):
+        self.pages += 1
+        self.y = self.height - MARGIN
+
+    def _finish_page(self):
+        label = f"Page {self.pages} of "
+        centre = self.width / 2
+        self._text(centre - stringWidth(label, "Helvetica", 8) / 2 - 4, PAGE_NUMBER_BOTTOM, label, size=8, color=MUTED)
+        self._flush_text()
+        self.pdf.saveState()
+        self.pdf.translate(centre + stringWidth(label, "Helvetica", 8) / 2 - 4, PAGE_NUMBER_BOTTOM)
+        self.pdf.doForm(PAGE_COUNT_FORM)
+        self.pdf.restoreState()
+        self.pdf.showPage()
+
+    def _next_page(self, columns):
+        self._finish_page()
+        self._start_page()
+        self._table_heading(columns)
+
+    def _ensure_room(self, height):
+        if self.y - height < self.bottom:
+            self._finish_page()
+            self._start_page()
+
+    # drawing helpers
+
+    def _text(self, x, y, text, size=10, bold=False, color=INK, align="left", max_width=None):
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        text = str(text)
+        # no glyph is wider than the font size, so short text needs no measuring
+        if max_width and len(text) * size > max_width and stringWidth(text, font, size) > max_width:
+            while text and stringWidth(text + "…", font, size) > max_width:
+                text = text[:-1]
+            text += "…"
+        if align == "center":
+            x -= stringWidth(text, font, size) / 2
+        if self._texts is None:
+            self._texts = self.pdf.beginText()
+            self._state = None
+        if self._state != (font, size, color):
+            self._texts.setFont(font, size)
+            self._texts.setFillColor(color)
+            self._state = (font, size, color)
+        self._texts.setTextOrigin(x, y)
+        self._texts.textOut(text)
+
+    def _flush_text(self):
+        """Draw the text collected since the last flush, above the shapes drawn so far"""
+        if self._texts is not None:
+            self.pdf.drawText(self._texts)
+            self._texts = None
+
+    def _rule(self, y, color=RULE, width=1, x=MARGIN, length=None):
+        self.pdf.setStrokeColor(color)
+        self.pdf.setLineWidth(width)
+        self.pdf.line(x, y, x + (length or self.content_width), y)
+
+    def _boxes(self, cells, height, draw):
+        """A row of equal bordered cells; draw(cell, x, width) fills one in"""
+        width = self.content_width / len(cells)
+        self.pdf.setStrokeColor(RULE)
+        self.pdf.setLineWidth(1)
+        for i, cell in enumerate(cells):
+            x = MARGIN + i * width
+            self.pdf.rect(x, self.y - height, width, height, stroke=1, fill=0)
+            draw(cell, x, width)
+        self.y -= height
+
+    # sections
+
+    def _header(self):
+        context = self.context
+        centre = self.width / 2
+        self._text(centre, self.y - 22, "Attendance Report", size=22, bold=True, align="center")
+        self._text(centre, self.y - 38, context["report_date"], size=11, color=MUTED, align="center")
+        self.y -= 48
+        self._rule(self.y, color=INK, width=2)
+        self.y -= 15
+
+        info = [("Company", context["company_name"]), ("Location", context["location"])]
+        if context.get("date_range"):
+            info.append(("Period", context["date_range"]))
+        if context.get("first_check_in"):
+            first = timezone.localtime(context["first_check_in"])
+            last = timezone.localtime(context["last_check_in"])
+            info.append(("First / Last Check-in", f"{first:%b %d, %Y %H:%M} / {last:%b %d, %Y %H:%M}"))
+
+        # values wrap onto a second line rather than being cut
+        value_width = self.content_width / len(info) - 2 * CELL_PADDING
+        info = [(label, simpleSplit(str(value), "Helvetica-Bold", 11, value_width)[:2]) for label, value in info]
+
+        def draw_info(cell, x, width):
+            label, lines = cell
+            self._text(x + CELL_PADDING, self.y - 14, label, size=10, color=LABEL)
+            for i, line in enumerate(lines):
+                self._text(x + CELL_PADDING, self.y - 28 - 13 * i, line, size=11, bold=True, max_width=value_width)
+
+        self._boxes(info, 36 + 13 * (max(len(lines) for _, lines in info) - 1), draw_info)
+        self.y -= 15
+
+        stats = [
+            (context["total_records"], "Total Records"),
+            (context["nfc_count"], "NFC"),
+            (context["qr_count"], "QR"),
+            (context["unique_employees"], "Employees"),
+        ]
+        if context.get("absences"):
+            stats.append((context["absences"]["totals"]["absent"], "Absences"))
+
+        def draw_stat(cell, x, width):
+            number, text = cell
+            self._text(x + width / 2, self.y - 26, number, size=18, bold=True, align="center")
+            self._text(x + width / 2, self.y - 42, text, size=10, color=LABEL, align="center")
+
+        self._boxes(stats, 52, draw_stat)
+
+    def _table_heading(self, columns):
+        self.y -= 10
+        self.pdf.setFillColor(INK)
+        self.pdf.rect(MARGIN, self.y - HEADING_HEIGHT, self.content_width, HEADING_HEIGHT, stroke=0, fill=1)
+        x = MARGIN
+        for title, share in columns:
+            self._text(x + CELL_PADDING, self.y - 13.5, title, size=10, bold=True, color=white)
+            x += share * self.content_width
+        self.y -= HEADING_HEIGHT
+
+    def _cells(self, columns, values):
+        """
+        Draw one table row. Values are (first line, second line) pairs,
+        single values, or callables drawing themselves at (x, top).
+        """
+        top = self.y
+        cells = []
+        x = MARGIN
+        for (_, share), value in zip(columns, values):
+            width = share * self.content_width
+            if callable(value):
+                value(x + CELL_PADDING, top)
+            else:
+                lines = value if isinstance(value, tuple) else (value, None)
+                cells.append((x + CELL_PADDING, width - 2 * CELL_PADDING, lines))
+            x += width
+        # all first lines, then all second lines: one font and colour change each
+        for x, width, (first, _) in cells:
+            self._text(x, top - 12, first, max_width=width)
+        for x, width, (_, second) in cells:
+            if second is not None:
+                self._text(x, top - 23, second, color=MUTED, max_width=width)
+        self.y -= ROW_HEIGHT
+        self._rule(self.y)
+
+    def _badge(self, code):
+        def draw(x, top):
+            label = "NFC" if code == "NFC" else "QR"
+            width = stringWidth(label, "Helvetica", 9) + 12
+            self.pdf.setFillColor(METHOD_COLORS[label])
+            self.pdf.rect(x, top - 18, width, 13, stroke=0, fill=1)
+            self._text(x + 6, top - 14.5, label, size=9, color=white)
+        return draw
+
+    def _attendance_row(self, number, full_name, uid, code, day, created_at):
+        self._cells(ATTENDANCE_COLUMNS, (
+            number,
+            (full_name, f"ID: {_short_id(uid)}"),
+            self._badge(code),
+            (f"{day:%Y-%m-%d}", f"{timezone.localtime(created_at):%H:%M}"),
+        ))
+
+    def _absences(self, absences):
+        self._ensure_room(10 + HEADING_HEIGHT + ROW_HEIGHT)
+        self._table_heading(ABSENCE_COLUMNS)
+        absent = [employee for employee in absences["employees"] if employee["absent_days"]]
+        for number, employee in enumerate(absent, 1):
+            if self.y - ROW_HEIGHT < self.bottom:
+                self._next_page(ABSENCE_COLUMNS)
+            self._cells(ABSENCE_COLUMNS, (
+                number,
+                (employee["full_name"], f"ID: {_short_id(employee['uid'])}"),
+                employee["absent_days"],
+                employee["expected_days"],
+            ))
+
+    def _footer(self):
+        self._ensure_room(36)
+        self.y -= 20
+        self._rule(self.y)
+        self._text(self.width / 2, self.y - 14, f"Generated on {self.context['generated_at']}", size=9,
+                   color=LABEL, align="center")
+        self.y -= 16
+
+
+def write_tabular_report(output, context, rows):
+    """Write the report of `context` and `rows` (see ROW_FIELDS) as PDF to `output`, a path or binary file"""
+    TabularReportWriter(output, context).write(rows)
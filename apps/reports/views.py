@@ -1,12 +1,55 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
 from datetime import datetime
-from common.utils.permissions import IsAdministrator
+from common.utils.permissions import IsAdmin, IsAdministrator
 from .serializers.reports import AttendanceReportSerializer
+from .serializers.report_jobs import ReportJobCreateSerializer, ReportJobSerializer
 from .services.attendance_report_service import AttendanceReportService
-from common.utils.response import error_response
+from .services.report_job_service import ReportJobService
+from .models import ReportJob
+from .utils.pdf_files import open_detached, pdf_file_response, temp_pdf
+from .utils.render_pool import PDFRenderBusy, PDFRenderTimeout, PDFRenderTooLarge
+from common.utils.response import error_response, success_response
+
+# most recent jobs listed by ReportJobListCreateAPIView
+JOB_LIST_LIMIT = 50
+
+
+def render_unavailable(error):
+    """503 for a report the render pool refused, or gave up on past its time or memory limit"""
+    response = error_response(str(error), status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if isinstance(error, PDFRenderBusy):
+        response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def pdf_response(request, key, generate, filename):
+    """
+    Serve a report PDF. Cacheable reports (`key` from
+    AttendanceReportService.report_key) come from the disk cache with the
+    key as ETag, answering 304 when the client already has them; others are
+    generated for the request into a temporary file. Either way the PDF is
+    streamed from disk (or handed to the front proxy, see PDF_DELIVERY)
+    rather than read into memory.
+    """
+    if key is None:
+        with temp_pdf() as path:
+            generate(path)
+            handle = open_detached(path)
+        return pdf_file_response(handle, filename)
+
+    etag = f'"{key}"'
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        handle = AttendanceReportService.cached_pdf(key, generate)
+        response = pdf_file_response(handle, filename, path=handle.name)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
 
 
 class CompanyAttendancePDFView(APIView):
@@ -21,15 +64,19 @@ class CompanyAttendancePDFView(APIView):
         serializer = AttendanceReportSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
-        pdf = AttendanceReportService.generate_company_pdf(
-            company=company,
-            filters=serializer.validated_data
-        )
-
+        filters = serializer.validated_data
         filename = f"attendance_report_{datetime.now():%Y%m%d_%H%M%S}.pdf"
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+        try:
+            return pdf_response(
+                request,
+                AttendanceReportService.report_key("company", company, filters),
+                lambda target: AttendanceReportService.generate_company_pdf(
+                    company=company, filters=filters, target=target
+                ),
+                filename,
+            )
+        except (PDFRenderBusy, PDFRenderTimeout, PDFRenderTooLarge) as e:
+            return render_unavailable(e)
 
 
 
@@ -53,15 +100,19 @@ class EmployeeAttendancePDFView(APIView):
         except Exception:
             return error_response("Employee not found", status=status.HTTP_404_NOT_FOUND)
 
-        pdf = AttendanceReportService.generate_employee_pdf(
-            employee=employee,
-            filters=serializer.validated_data
-        )
-
+        filters = serializer.validated_data
         filename = f"attendance_{employee.full_name.replace(' ', '_')}_{datetime.now():%Y%m%d_%H%M%S}.pdf"
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+        try:
+            return pdf_response(
+                request,
+                AttendanceReportService.report_key("employee", employee, filters),
+                lambda target: AttendanceReportService.generate_employee_pdf(
+                    employee=employee, filters=filters, target=target
+                ),
+                filename,
+            )
+        except (PDFRenderBusy, PDFRenderTimeout, PDFRenderTooLarge) as e:
+            return render_unavailable(e)
 
 
 
@@ -73,12 +124,115 @@ class MyAttendancePDFView(APIView):
         serializer = AttendanceReportSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
-        pdf = AttendanceReportService.generate_employee_pdf(
-            employee=request.user,
-            filters=serializer.validated_data
+        filters = serializer.validated_data
+        filename = f"my_attendance_{datetime.now():%Y%m%d_%H%M%S}.pdf"
+        try:
+            return pdf_response(
+                request,
+                AttendanceReportService.report_key("employee", request.user, filters),
+                lambda target: AttendanceReportService.generate_employee_pdf(
+                    employee=request.user, filters=filters, target=target
+                ),
+                filename,
+            )
+        except (PDFRenderBusy, PDFRenderTimeout, PDFRenderTooLarge) as e:
+            return render_unavailable(e)
+
+
+
+class PDFEngineStatsAPIView(APIView):
+    """Circuit state, render counts and average timings per PDF engine (main admin only)"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return success_response(
+            "PDF engine stats fetched successfully",
+            AttendanceReportService.engine_stats(),
+            status=status.HTTP_200_OK,
         )
 
-        filename = f"my_attendance_{datetime.now():%Y%m%d_%H%M%S}.pdf"
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+
+class ReportJobListCreateAPIView(APIView):
+    """
+    Submit a report to be generated in the background (POST), or list the
+    caller's recent report jobs (GET). Company and employee reports need an
+    Administrator; anyone may queue their own ("my") report.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ReportJobService.wake_runner()
+        jobs = ReportJobService.get_jobs(request.user)[:JOB_LIST_LIMIT]
+        return success_response(
+            "Report jobs fetched successfully",
+            ReportJobSerializer(jobs, many=True, context={"request": request}).data,
+            status=status.HTTP_200_OK,
+        )
+
+    def post(self, request):
+        serializer = ReportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        report_type = data["report_type"]
+
+        company, employee = None, request.user
+        if report_type != "my":
+            if not IsAdministrator().has_permission(request, self):
+                return error_response("Only administrators can queue company or employee reports", status=status.HTTP_403_FORBIDDEN)
+            company = request.user.company
+            if not company:
+                return error_response("Company not found", status=status.HTTP_404_NOT_FOUND)
+        if report_type == "employee":
+            try:
+                employee = AttendanceReportService.get_employee(employee_id=data["employee"], company=company)
+            except Exception:
+                return error_response("Employee not found", status=status.HTTP_404_NOT_FOUND)
+
+        job = ReportJobService.submit(
+            requested_by=request.user,
+            report_type=ReportJob.TYPE_COMPANY if report_type == "company" else ReportJob.TYPE_EMPLOYEE,
+            filters=data,
+            company=company if report_type == "company" else None,
+            employee=None if report_type == "company" else employee,
+        )
+        return success_response(
+            "Report job queued",
+            ReportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ReportJobDetailAPIView(APIView):
+    """Status and progress of one of the caller's report jobs"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        try:
+            job = ReportJobService.get_job(job_id, request.user)
+        except ValueError as e:
+            return error_response(str(e), status=status.HTTP_404_NOT_FOUND)
+        if job.status == ReportJob.STATUS_PENDING:
+            ReportJobService.wake_runner()
+        return success_response(
+            "Report job fetched successfully",
+            ReportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReportJobDownloadAPIView(APIView):
+    """The PDF of a finished report job"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        try:
+            job = ReportJobService.get_job(job_id, request.user)
+        except ValueError as e:
+            return error_response(str(e), status=status.HTTP_404_NOT_FOUND)
+        try:
+            path = ReportJobService.get_file(job)
+        except ValueError as e:
+            return error_response(str(e), status=status.HTTP_409_CONFLICT)
+        except FileNotFoundError as e:
+            return error_response(str(e), status=status.HTTP_410_GONE)
+        return pdf_file_response(path.open("rb"), job.file_name, path=path)
@@ -5,6 +5,13 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 class BaseListAPIView(generics.ListAPIView):
     pagination_class = None
+    # Opt-in keyset pagination: clients send ?pagination=cursor (or a cursor)
+    # and the view is paged by `cursor_ordering` instead of page numbers
+    cursor_pagination_class = None
+    cursor_ordering = None
+    # Optional read-optimized path: a common.api.values.ValuesSerializer that
+    # shapes .values() rows directly instead of serializing model instances
+    values_serializer_class = None
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -12,9 +19,30 @@ class BaseListAPIView(generics.ListAPIView):
     ]
     permission_classes = [permissions.AllowAny]
 
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if self.cursor_pagination_class is not None and (
+                params.get("pagination") == "cursor" or "cursor" in params
+            ):
+                self._paginator = self.cursor_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_list_serializer(self, rows):
+        if self.values_serializer_class is not None:
+            return self.values_serializer_class(rows, many=True, context=self.get_serializer_context())
+        return self.get_serializer(rows, many=True)
+
     def list(self, request, *args, **kwargs):
         # Get filtered queryset
         queryset = self.filter_queryset(self.get_queryset())
+        if self.values_serializer_class is not None:
+            queryset = self.values_serializer_class.get_queryset(queryset)
 
         # Generate message
         model_name = queryset.model.__name__
@@ -24,15 +52,15 @@ class BaseListAPIView(generics.ListAPIView):
         request.list_message = success_message
 
         # Check if pagination is enabled
-        if self.pagination_class is not None:
+        if self.paginator is not None:
             # Paginate the queryset
             page = self.paginate_queryset(queryset)
             if page is not None:
-                serializer = self.get_serializer(page, many=True)
+                serializer = self.get_list_serializer(page)
                 return self.get_paginated_response(serializer.data)
 
         # No pagination - return all data
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_list_serializer(queryset)
         return Response(
             {
                 "success": True,
@@ -0,0 +1,49 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer built on orjson.
+
+    UUIDs, dates and datetimes are encoded natively (datetimes like DRF's
+    DateTimeField: ISO 8601 with "Z" for UTC); anything else orjson does not
+    know (Decimal, lazy translations, querysets, ...) goes through DRF's own
+    JSONEncoder.default. Pretty-printed or ASCII-only output (`indent`, the
+    browsable API, UNICODE_JSON/COMPACT_JSON off) and payloads orjson rejects
+    are rendered by the stock renderer, as is everything when orjson is not
+    installed.
+    """
+
+    options = orjson.OPT_UTC_Z if orjson else 0
+
+    def use_orjson(self, accepted_media_type, renderer_context):
+        # orjson only writes compact UTF-8, i.e. DRF's default UNICODE_JSON/COMPACT_JSON
+        return (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if not self.use_orjson(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=encoders.JSONEncoder().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as the stock renderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
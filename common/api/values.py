@@ -0,0 +1,29 @@
+class ValuesSerializer:
+    """
+    Read-only list serializer over rows fetched with QuerySet.values().
+
+    Subclasses list the columns they need in `values` and shape one row dict
+    in `to_representation`. No model instances and no per-field DRF machinery
+    are involved, so it is meant for hot list endpoints whose output must stay
+    identical to the regular ModelSerializer of the same view.
+    """
+
+    values = ()
+
+    def __init__(self, instance=None, many=True, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @classmethod
+    def get_queryset(cls, queryset):
+        return queryset.values(*cls.values)
+
+    def to_representation(self, row):
+        raise NotImplementedError("`to_representation()` must be implemented.")
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
@@ -0,0 +1,19 @@
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_delete, post_save
+
+
+class CommonConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'common'
+
+    def ready(self):
+        from .pagination.counting import counted_models, invalidate_counts_on_write
+
+        for label in counted_models():
+            model = apps.get_model(label)
+            post_save.connect(
+                invalidate_counts_on_write, sender=model, dispatch_uid=f"common.invalidate_counts.save.{label}"
+            )
+            post_delete.connect(
+                invalidate_counts_on_write, sender=model, dispatch_uid=f"common.invalidate_counts.delete.{label}"
+            )
@@ -0,0 +1,16 @@
+from django.middleware.gzip import GZipMiddleware
+
+# formats that are compressed already; gzipping them again costs CPU for no gain
+COMPRESSED_CONTENT_TYPES = ("application/pdf",)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that passes already compressed downloads through, so
+    streamed report PDFs keep their Content-Length (and range support).
+    """
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith(COMPRESSED_CONTENT_TYPES):
+            return response
+        return super().process_response(request, response)
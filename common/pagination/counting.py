@@ -0,0 +1,82 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.query import QuerySet
+from common.utils.cache import is_shared_cache
+from .get_fast_count import get_fast_count
+
+EXACT = "exact"
+CACHED = "cached"
+ESTIMATED = "estimated"
+
+
+def _cache():
+    """The count cache, or None when the configured backend is not shared between workers"""
+    cache = caches[settings.PAGINATION_COUNTS["CACHE_ALIAS"]]
+    # a count cached per process would outlive writes made by the other workers
+    return cache if is_shared_cache(cache) else None
+
+
+def counted_models():
+    """Labels of the models whose list counts are cached (and invalidated on writes)"""
+    return settings.PAGINATION_COUNTS["MODELS"]
+
+
+def _version_key(model):
+    return f"pagination:count-version:{model._meta.label_lower}"
+
+
+def invalidate_counts(model):
+    """Forget every cached count of `model`; called on writes to its table"""
+    cache = _cache()
+    if cache:
+        cache.set(_version_key(model), time.time_ns(), None)
+
+
+def invalidate_counts_on_write(sender, **kwargs):
+    """post_save/post_delete receiver; bulk and raw SQL writes call invalidate_counts() themselves"""
+    invalidate_counts(sender)
+
+
+def _count_key(cache, queryset):
+    model = queryset.model
+    version = cache.get(_version_key(model), 0)
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{sql}|{params!r}".encode("utf-8")).hexdigest()
+    return f"pagination:count:{model._meta.label_lower}:{version}:{digest}"
+
+
+def _is_whole_table(queryset):
+    query = queryset.query
+    return not query.where and not query.distinct and not query.is_sliced and not query.combinator
+
+
+def resolve_count(object_list):
+    """
+    Return (strategy, count) for a list page:
+    - cached: an earlier exact count for the same filters, still valid
+    - estimated: planner estimate for a very large, unfiltered table
+    - exact: COUNT(*); large results of the counted models are cached
+      until the next write, when the cache is shared
+    """
+    if not isinstance(object_list, QuerySet):
+        return EXACT, len(object_list)
+
+    config = settings.PAGINATION_COUNTS
+    cache = _cache() if object_list.model._meta.label in counted_models() else None
+    if cache:
+        key = _count_key(cache, object_list)
+        count = cache.get(key)
+        if count is not None:
+            return CACHED, count
+
+    if _is_whole_table(object_list):
+        estimate = get_fast_count(object_list.model._meta.db_table)
+        if estimate is not None and estimate >= config["ESTIMATE_THRESHOLD"]:
+            return ESTIMATED, estimate
+
+    count = object_list.count()
+    if cache and count >= config["CACHE_THRESHOLD"]:
+        cache.set(key, count, config["CACHE_TIMEOUT"])
+    return EXACT, count
@@ -1,10 +1,13 @@
 from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
 class FastPaginator(Paginator):
-  def _get_count(self):
-    if not hasattr(self, '_fast_count'):
-      from common.pagination.get_fast_count import get_fast_count
-      self._fast_count = get_fast_count(self.object_list.modele._meta.db_table)
-    return self._fast_count
+  """Paginator whose total comes from the counting strategies in common.pagination.counting"""
 
-  count = property(_get_count)
\ No newline at end of file
+  count_strategy = None
+
+  @cached_property
+  def count(self):
+    from common.pagination.counting import resolve_count
+    self.count_strategy, count = resolve_count(self.object_list)
+    return count
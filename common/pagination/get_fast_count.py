@@ -1,6 +1,23 @@
 from django.db import connection
 
 def get_fast_count(table_name):
+    """
+    Planner/statistics row estimate for a whole table, or None when the
+    backend has no estimate for it (e.g. never analyzed).
+    """
     with connection.cursor() as cursor:
-        cursor.execute(f"SELECT reltuples::bigint FROM pg_class WHERE relname = '{table_name}';")
-        return int(cursor.fetchone()[0])
\ No newline at end of file
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table_name])
+        elif connection.vendor == "sqlite":
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # first number of `stat` is the table's row count at the last ANALYZE
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table_name])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
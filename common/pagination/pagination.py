@@ -1,10 +1,12 @@
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from .fast_paginator import FastPaginator
 
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "limit"
     max_page_size = 100
+    django_paginator_class = FastPaginator
 
     def get_paginated_response(self, data):
         return Response({
@@ -15,6 +17,7 @@ class CustomPagination(PageNumberPagination):
                 "limit": self.page.paginator.per_page,
                 "total": self.page.paginator.count,
                 "totalPage": self.page.paginator.num_pages,
+                "countStrategy": self.page.paginator.count_strategy,
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
             },
@@ -0,0 +1,10 @@
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# backends private to one process: state kept there is invisible to the other workers
+LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared_cache(cache):
+    """Whether `cache` is seen by every worker (Redis, Memcached, file or database cache)"""
+    return not isinstance(cache, LOCAL_BACKENDS)
@@ -51,7 +51,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
-    "django.middleware.gzip.GZipMiddleware",
+    "common.middleware.SelectiveGZipMiddleware",  # gzip, except PDF downloads
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -125,6 +125,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "EXCEPTION_HANDLER": "common.utils.custom_exception.custom_exception_handler",
+    "DEFAULT_RENDERER_CLASSES": [
+        "common.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
@@ -175,6 +179,117 @@ PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
 
+# List totals reported in CustomPagination's meta. Exact COUNT(*)s of at least
+# CACHE_THRESHOLD rows of MODELS are cached per filter set until the model is
+# written to, only when CACHES[CACHE_ALIAS] is shared between workers (not
+# LocMem); unfiltered tables above ESTIMATE_THRESHOLD rows report the planner
+# estimate.
+PAGINATION_COUNTS = {
+    "CACHE_ALIAS": "default",
+    "MODELS": ["attendance.Attendance", "auths.User"],
+    "CACHE_THRESHOLD": 1000,
+    "CACHE_TIMEOUT": 300,
+    "ESTIMATE_THRESHOLD": 100000,
+}
+
+# Attendance
+ATTENDANCE_BULK_MAX_ITEMS = 5000  # check-ins accepted per bulk upload
+ATTENDANCE_BULK_BATCH_SIZE = 500  # rows per INSERT statement
+ATTENDANCE_EXPORT_CHUNK_SIZE = 2000  # rows fetched per cursor round trip when streaming exports
+ATTENDANCE_MATRIX_MAX_DAYS = 92  # longest range of the employees x days matrix (a quarter)
+ATTENDANCE_ABSENCE_MAX_DAYS = 366  # longest range of absence summaries
+# "Already checked in today" index consulted before writing a check-in.
+# "cache" stores it in CACHES[CACHE_ALIAS] so all gunicorn workers share it;
+# it is disabled while that cache is per-process (LocMem), leaving duplicates
+# to the insert. "local" keeps a per-process set, for single-process
+# deployments only: deletes and edits do not reach the other workers' sets.
+# Set BACKEND to None to disable.
+ATTENDANCE_CHECKIN_INDEX = {
+    "BACKEND": "cache",
+    "CACHE_ALIAS": "default",
+}
+# Write-behind check-ins: when enabled, POST /attendance/create/ answers 202
+# after appending to a local SQLite journal, and a per-worker flusher thread
+# persists queued check-ins in batches within MAX_FLUSH_LATENCY seconds.
+# `manage.py flush_checkin_journal` drains whatever is left after a crash.
+ATTENDANCE_WRITE_BEHIND = {
+    "ENABLED": os.environ.get("ATTENDANCE_WRITE_BEHIND", "false").lower() == "true",
+    "JOURNAL_PATH": BASE_DIR / "var" / "checkin_journal.sqlite3",
+    "BATCH_SIZE": 500,
+    "MAX_FLUSH_LATENCY": 1.0,
+}
+
+# PDF reports are laid out in a pool of WORKERS processes per gunicorn worker.
+# Up to MAX_QUEUE more reports wait for a free process; beyond that report
+# views answer 503 with Retry-After: RETRY_AFTER. A render running longer than
+# TIMEOUT seconds is aborted. WORKERS = 0 renders inline in the request.
+PDF_RENDERING = {
+    "WORKERS": int(os.environ.get("PDF_RENDER_WORKERS", 2)),
+    "MAX_QUEUE": 4,
+    "TIMEOUT": 120,
+    "RETRY_AFTER": 30,
+    "MAX_TASKS_PER_CHILD": 50,  # recycle render processes to return layout memory
+    "START_METHOD": "spawn",
+    # load engines, fonts and the report stylesheet as each render process
+    # starts (see RenderPool.start / gunicorn.conf.py) rather than on its first report
+    "WARM_UP": True,
+    # Reports with more rows are laid out in CHUNK_ROWS-row segments rendered
+    # in parallel and joined with continuous page numbers; each segment gets
+    # CHUNK_TIMEOUT seconds and CHUNK_MEMORY_LIMIT_MB of address space.
+    "CHUNK_ROWS": 2000,
+    "CHUNK_TIMEOUT": 120,
+    "CHUNK_MEMORY_LIMIT_MB": 2048,
+}
+# HTML to PDF engines tried in order per report type ("default" for the
+# rest). An engine that fails FAILURE_THRESHOLD times in a row is skipped
+# for COOLDOWN seconds before it is tried again.
+PDF_ENGINES = {
+    "PREFERENCE": {
+        "default": ["weasyprint", "xhtml2pdf"],
+        "company": ["weasyprint", "xhtml2pdf"],
+        "employee": ["weasyprint", "xhtml2pdf"],
+    },
+    "FAILURE_THRESHOLD": 1,
+    "COOLDOWN": 300,
+}
+# Background report jobs (POST /reports/jobs/). With IN_PROCESS_RUNNER each
+# worker claims pending jobs in a background thread; set it to False when a
+# dedicated `manage.py run_report_jobs` process does the work. Jobs without a
+# heartbeat for STALE_AFTER seconds are requeued; jobs and their PDFs are
+# deleted RETENTION_HOURS after submission.
+REPORT_JOBS = {
+    "IN_PROCESS_RUNNER": True,
+    "STORAGE_DIR": BASE_DIR / "var" / "reports",
+    "POLL_INTERVAL": 5.0,
+    "HEARTBEAT_INTERVAL": 30,
+    "STALE_AFTER": 300,
+    "RENDER_TIMEOUT": 900,
+    "RETENTION_HOURS": 24,
+    "CLEANUP_INTERVAL": 3600,
+}
+# Generated PDFs cached on disk under a hash of (report type, subject,
+# filters, attendance version), evicting least recently used files beyond
+# MAX_BYTES. Bump FORMAT_VERSION when the report template changes.
+REPORT_CACHE = {
+    "ENABLED": True,
+    "DIR": BASE_DIR / "var" / "report_cache",
+    "MAX_BYTES": 512 * 1024 * 1024,
+    "FORMAT_VERSION": 1,
+}
+# Report PDFs are written to files, never held whole in memory: uncached
+# reports go to TEMP_DIR and are streamed from there. With SENDFILE set to
+# "x-sendfile" (Apache, lighttpd) or "x-accel-redirect" (nginx), files in the
+# cache and job storage are handed to the front proxy instead; nginx needs
+# each directory mapped to an internal location in ACCEL_LOCATIONS.
+PDF_DELIVERY = {
+    "TEMP_DIR": BASE_DIR / "var" / "report_tmp",
+    "SENDFILE": os.environ.get("PDF_SENDFILE") or None,
+    "ACCEL_LOCATIONS": {
+        REPORT_CACHE["DIR"]: "/protected/report_cache/",
+        REPORT_JOBS["STORAGE_DIR"]: "/protected/reports/",
+    },
+}
+
 SESSION_CACHE_ALIAS = "default"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATIC_URL = "/static/"
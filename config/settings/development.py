@@ -12,5 +12,8 @@ CSRF_COOKIE_SECURE = False
 SESSION_COOKIE_SECURE = False
 ALLOWED_HOSTS = ['*']
 
+# render reports inline under runserver unless a pool is asked for
+PDF_RENDERING = {**PDF_RENDERING, "WORKERS": int(os.environ.get("PDF_RENDER_WORKERS", 0))}
+
 
 print("🧑‍💻Development settings loaded")
@@ -38,7 +38,7 @@ REST_FRAMEWORK.update(
             "anon": "100/hour", 
         },
         "DEFAULT_RENDERER_CLASSES": [
-            "rest_framework.renderers.JSONRenderer",
+            "common.api.renderers.ORJSONRenderer",
         ],
     }
 )
@@ -0,0 +1,11 @@
+import threading
+
+
+def post_worker_init(worker):
+    """
+    Start this worker's PDF render processes, warming their engines, in the
+    background so the first report does not wait for them.
+    """
+    from apps.reports.utils.render_pool import get_render_pool
+
+    threading.Thread(target=get_render_pool().start, name="pdf-warm-up", daemon=True).start()
@@ -0,0 +1,59 @@
+import timeit
+import uuid
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from common.api.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer with ORJSONRenderer on attendance list pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10, 100])
+        parser.add_argument("--iterations", type=int, default=1000)
+
+    def page(self, rows, raw):
+        """An admin attendance list page; `raw` keeps UUID/date objects as service payloads do"""
+        today = date.today()
+        data = []
+        for i in range(rows):
+            uid, employee_uid, day = uuid.uuid4(), uuid.uuid4(), today - timedelta(days=i % 30)
+            data.append({
+                "uid": uid if raw else str(uid),
+                "is_nfc": bool(i % 2),
+                "is_qr": not i % 2,
+                "date": day if raw else day.isoformat(),
+                "employee": {
+                    "uid": employee_uid if raw else str(employee_uid),
+                    "full_name": f"Employee {i}",
+                },
+            })
+        return {
+            "success": True,
+            "message": "All data retrieved successfully",
+            "meta": {
+                "page": 1, "limit": rows, "total": rows * 10, "totalPage": 10,
+                "countStrategy": "exact", "next": None, "previous": None,
+            },
+            "data": data,
+        }
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        stock, fast = JSONRenderer(), ORJSONRenderer()
+
+        for rows in options["rows"]:
+            for raw in (False, True):
+                payload = self.page(rows, raw)
+                stock_time = timeit.timeit(lambda: stock.render(payload), number=iterations)
+                fast_time = timeit.timeit(lambda: fast.render(payload), number=iterations)
+                label = "uuid/date objects" if raw else "serialized strings"
+                self.stdout.write(
+                    f"{rows:>5} rows, {label:<18} "
+                    f"JSONRenderer {stock_time / iterations * 1e6:9.1f} us  "
+                    f"ORJSONRenderer {fast_time / iterations * 1e6:9.1f} us  "
+                    f"x{stock_time / fast_time:.1f}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered each page {iterations} times per renderer."))
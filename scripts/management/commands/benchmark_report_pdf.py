@@ -0,0 +1,87 @@
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils import timezone
+from apps.reports.utils.pdf_engines import get_engine_selector, render_with
+from apps.reports.utils.pdf_files import temp_pdf
+from apps.reports.utils.pdf_generator import REPORT_TEMPLATE
+from apps.reports.utils.tabular_pdf import write_tabular_report
+
+
+class Command(BaseCommand):
+    help = "Compare the HTML (template + engine) and fast tabular report renderers on synthetic rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+        parser.add_argument("--renderers", nargs="+", choices=["html", "fast"], default=["html", "fast"])
+        parser.add_argument(
+            "--html-max-rows", type=int, default=None,
+            help="Skip the HTML renderer above this many rows (it lays out the whole table in one process)",
+        )
+
+    def rows(self, count):
+        """(full_name, user_uid, code, date, created_at) rows of 50 employees over the last 30 days"""
+        employees = [(f"Employee {i}", uuid.uuid4()) for i in range(50)]
+        now = timezone.now()
+        for i in range(count):
+            full_name, uid = employees[i % len(employees)]
+            yield full_name, uid, "NFC" if i % 3 else "QR", date.today() - timedelta(days=i % 30), now
+
+    def context(self, count):
+        return {
+            'company_name': "Benchmark Company",
+            'location': "Dhaka",
+            'report_date': datetime.now().strftime('%B %d, %Y'),
+            'generated_at': datetime.now().strftime('%B %d, %Y at %H:%M'),
+            'total_records': count,
+            'nfc_count': count - count // 3,
+            'qr_count': count // 3,
+            'unique_employees': min(count, 50),
+            'date_range': None,
+            'absences': None,
+            'report_type': 'company',
+        }
+
+    def render_html(self, count, target):
+        attendances = (
+            SimpleNamespace(user=SimpleNamespace(full_name=name, uid=str(uid)), code=code, date=day, created_at=created)
+            for name, uid, code, day, created in self.rows(count)
+        )
+        html = render_to_string(REPORT_TEMPLATE, {
+            **self.context(count),
+            'attendances': attendances,
+            'row_offset': 0,
+            'show_header': True,
+            'show_footer': True,
+        })
+        attempts = render_with(get_engine_selector().order('company'), html, target)
+        return attempts[-1][0]
+
+    def render_fast(self, count, target):
+        write_tabular_report(str(target), self.context(count), self.rows(count))
+        return "reportlab"
+
+    def handle(self, *args, **options):
+        html_max_rows = options["html_max_rows"]
+        for count in options["rows"]:
+            timings = {}
+            for renderer in options["renderers"]:
+                if renderer == "html" and html_max_rows is not None and count > html_max_rows:
+                    self.stdout.write(f"{count:>7} rows  html  skipped (--html-max-rows {html_max_rows})")
+                    continue
+                with temp_pdf() as target:
+                    started = time.perf_counter()
+                    engine = getattr(self, f"render_{renderer}")(count, target)
+                    timings[renderer] = elapsed = time.perf_counter() - started
+                    size = target.stat().st_size
+                self.stdout.write(
+                    f"{count:>7} rows  {renderer:<4}  {elapsed:8.2f} s  {count / elapsed:9.0f} rows/s  "
+                    f"{size / 1024:9.0f} KB  ({engine})"
+                )
+            if len(timings) == 2:
+                self.stdout.write(f"{count:>7} rows  fast is x{timings['html'] / timings['fast']:.1f}")
+
+        self.stdout.write(self.style.SUCCESS("Rendered in this process, without the render pool or chunking."))
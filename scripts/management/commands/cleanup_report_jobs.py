@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.reports.services.report_job_service import ReportJobService
+
+
+class Command(BaseCommand):
+    help = "Delete report jobs past REPORT_JOBS['RETENTION_HOURS'] and their PDFs"
+
+    def handle(self, *args, **options):
+        deleted = ReportJobService.cleanup()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired report jobs."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.attendance.services.attendance_service import AttendanceService
+from apps.attendance.utils.checkin_journal import get_journal
+
+
+class Command(BaseCommand):
+    help = "Persist check-ins left in the write-behind journal (e.g. after a crash or restart)"
+
+    def handle(self, *args, **options):
+        journal = get_journal()
+        pending = journal.pending_count()
+        flushed = AttendanceService.flush_journal()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} of {pending} queued check-ins."))
+        dead_letters = journal.dead_letter_count()
+        if dead_letters:
+            self.stdout.write(self.style.WARNING(
+                f"{dead_letters} check-in(s) were refused by the database and kept in the journal's dead_letter table."
+            ))
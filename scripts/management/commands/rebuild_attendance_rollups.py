@@ -0,0 +1,25 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.attendance.repositories.rollup_repository import DailyRollupRepository
+from apps.companies.models import Company
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-company daily attendance rollups from attendance rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from-date", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--to-date", type=date.fromisoformat, help="Last day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--company", help="Only rebuild this company (uid)")
+
+    def handle(self, *args, **options):
+        company = None
+        if options["company"]:
+            company = Company.objects.filter(uid=options["company"]).first()
+            if company is None:
+                raise CommandError(f"Company {options['company']} not found")
+
+        written = DailyRollupRepository.rebuild(
+            start=options["from_date"], end=options["to_date"], company=company
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily rollups."))
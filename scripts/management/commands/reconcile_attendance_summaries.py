@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.attendance.repositories.summary_repository import MonthlySummaryRepository
+from apps.attendance.utils.dates import month_start
+
+
+def parse_month(value):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite per-employee monthly attendance summaries from attendance rows. "
+        "Run nightly; defaults to the current and previous month. Edits and deletes "
+        "recount their months as they happen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", type=parse_month, action="append", help="Month to reconcile (YYYY-MM), repeatable")
+        parser.add_argument("--all", action="store_true", help="Reconcile every month with attendance or summaries")
+
+    def handle(self, *args, **options):
+        months = options["month"]
+        if options["all"]:
+            months = MonthlySummaryRepository.months()
+        elif not months:
+            current = month_start(timezone.localdate())
+            months = [month_start(current - timedelta(days=1)), current]
+
+        for month in months:
+            written = MonthlySummaryRepository.reconcile(month)
+            self.stdout.write(f"{month:%Y-%m}: {written} summaries")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(months)} month(s)."))
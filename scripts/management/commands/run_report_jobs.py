@@ -0,0 +1,26 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.reports.services.report_job_service import ReportJobService
+
+
+class Command(BaseCommand):
+    help = "Process queued background report jobs (use with REPORT_JOBS['IN_PROCESS_RUNNER'] = False)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling")
+
+    def handle(self, *args, **options):
+        interval = settings.REPORT_JOBS["POLL_INTERVAL"]
+        processed = 0
+        while True:
+            close_old_connections()
+            while (job := ReportJobService.process_next()) is not None:
+                processed += 1
+                job.refresh_from_db()
+                self.stdout.write(f"Report job {job.uid}: {job.status}")
+            if options["once"]:
+                break
+            time.sleep(interval)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} report jobs."))
@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.reports.utils.pdf_assets import sample_report_html
+from apps.reports.utils.pdf_engines import ENGINES, warm_up
+from apps.reports.utils.pdf_files import temp_pdf
+
+
+class Command(BaseCommand):
+    help = "Warm the PDF engines in this process and compare first (cold) and steady-state render times"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=None)
+        parser.add_argument("--renders", type=int, default=5, help="Renders per engine once warm")
+        parser.add_argument("--rows", type=int, default=20, help="Rows of the sample report")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        timings = warm_up(options["engines"])
+        self.stdout.write(f"Warm-up took {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        html = sample_report_html(options["rows"])
+        renders = options["renders"]
+        for name, timing in timings.items():
+            if "error" in timing:
+                self.stdout.write(self.style.WARNING(f"{name:<11} unavailable: {timing['error']}"))
+                continue
+            with temp_pdf() as target:
+                started = time.perf_counter()
+                for _ in range(renders):
+                    ENGINES[name](html, target)
+            steady = (time.perf_counter() - started) * 1000 / renders
+            self.stdout.write(
+                f"{name:<11} load {timing['prepare_ms']:8.1f} ms  "
+                f"first render {timing['first_render_ms']:8.1f} ms  "
+                f"steady render {steady:8.1f} ms  ({options['rows']} rows)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered the sample report {renders} times per engine once warm."))